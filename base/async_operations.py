@@ -0,0 +1,134 @@
+"""graph2nosql asyncio base class for required database operations"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Iterable, List
+
+from base.operations import GraphRecordsMixin, batched
+from datamodel.data_model import NodeData, EdgeData, BatchWriteResult, BatchReadResult
+
+
+class AsyncNoSQLKnowledgeGraph(GraphRecordsMixin, ABC):
+    """
+    Asyncio twin of NoSQLKnowledgeGraph for node and edge CRUD operations and batch reads.
+
+    Implementations run on the native async client of their database, so a single
+    instance can keep many operations in flight concurrently. Writes maintain the
+    same updated_at watermarks and tombstones as the synchronous implementations,
+    so both can be used on the same database.
+    """
+
+    @abstractmethod
+    async def add_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Adds an node to the knowledge graph."""
+
+    async def add_nodes(self, nodes: Iterable[NodeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many nodes to the knowledge graph and reports success per node_uid.
+
+        This generic implementation falls back to one add_node call per node.
+        Backends override it with their native bulk write mechanism.
+        """
+        result = BatchWriteResult()
+        for chunk in batched(nodes, batch_size):
+            for node_data in chunk:
+                try:
+                    await self.add_node(node_uid=node_data.node_uid, node_data=node_data)
+                except Exception as e:
+                    result.failed[node_data.node_uid] = str(e)
+                else:
+                    result.succeeded.append(node_data.node_uid)
+        return result
+
+    @abstractmethod
+    async def get_node(self, node_uid: str) -> NodeData:
+        """Retrieves an node from the knowledge graph."""
+
+    async def get_nodes(self, node_uids: List[str], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many nodes from the knowledge graph.
+
+        Returns the found NodeData keyed by node_uid and the node_uids that do not exist.
+        This generic implementation runs the get_node calls of a chunk concurrently.
+        Backends override it to fetch chunk_size nodes per round trip.
+        """
+        result = BatchReadResult()
+        for chunk in batched(dict.fromkeys(node_uids), chunk_size):
+            nodes = await asyncio.gather(*(self.get_node(node_uid) for node_uid in chunk),
+                                         return_exceptions=True)
+            for node_uid, node_data in zip(chunk, nodes):
+                if isinstance(node_data, KeyError):
+                    result.missing.append(node_uid)
+                elif isinstance(node_data, BaseException):
+                    raise node_data
+                else:
+                    result.found[node_uid] = node_data
+        return result
+
+    @abstractmethod
+    async def update_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Updates an existing node in the knowledge graph."""
+
+    @abstractmethod
+    async def remove_node(self, node_uid: str) -> None:
+        """Removes an node from the knowledge graph."""
+
+    @abstractmethod
+    async def add_edge(self, edge_data: EdgeData) -> None:
+        """Adds an edge (relationship) between two entities in the knowledge graph."""
+
+    async def add_edges(self, edges: Iterable[EdgeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many edges to the knowledge graph and reports success per edge_uid.
+
+        This generic implementation falls back to one add_edge call per edge.
+        Backends override it to merge the adjacency updates of a batch per node.
+        """
+        result = BatchWriteResult()
+        for chunk in batched(edges, batch_size):
+            for edge_data in chunk:
+                edge_uid = self._generate_edge_uid(
+                    source_uid=edge_data.source_uid, target_uid=edge_data.target_uid)
+                try:
+                    await self.add_edge(edge_data=edge_data)
+                except Exception as e:
+                    result.failed[edge_uid] = str(e)
+                else:
+                    result.succeeded.append(edge_uid)
+        return result
+
+    @abstractmethod
+    async def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
+        """Retrieves an edge between two entities."""
+
+    @abstractmethod
+    async def update_edge(self, edge_data: EdgeData) -> None:
+        """Updates an existing edge in the knowledge graph."""
+
+    @abstractmethod
+    async def remove_edge(self, source_uid: str, target_uid: str) -> None:
+        """Removes an edge between two entities."""
+
+    @abstractmethod
+    def _generate_edge_uid(self, source_uid: str, target_uid: str) -> str:
+        """Generates Edge uid for the network based on source and target nod uid"""
+        return ""
+
+    @abstractmethod
+    async def edge_exist(self, source_uid: str, target_uid: str) -> bool:
+        """Checks for edge existence and returns boolean"""
+
+    @abstractmethod
+    async def node_exist(self, node_uid: str) -> bool:
+        """Checks for node existence and returns boolean"""
+
+    @abstractmethod
+    async def flush_kg(self) -> None:
+        """Method to wipe the complete datastore of the knowledge graph"""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Closes the async database client of this knowledge graph."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
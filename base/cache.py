@@ -0,0 +1,397 @@
+"""graph2nosql read-through cache for knowledge graph implementations"""
+
+import dataclasses
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, List
+
+import numpy as np
+
+from base.operations import NoSQLKnowledgeGraph
+from datamodel.data_model import NodeData, EdgeData, CommunityData, BatchWriteResult, BatchReadResult, GraphChanges, NeighborhoodData, NeighborData, NeighborBatchData, CommunityNeighborData, CacheStats
+
+
+def _estimate_size(record: Any) -> int:
+    """Approximates the memory footprint of a dataclass record in bytes, including its list and array fields."""
+    size = sys.getsizeof(record)
+    for value in vars(record).values():
+        size += sys.getsizeof(value)
+        if isinstance(value, (list, tuple, set)):
+            size += sum(sys.getsizeof(item) for item in value)
+        elif isinstance(value, np.ndarray) and value.base is not None:
+            # getsizeof of a view, such as a decoded embedding, excludes the buffer it shares
+            size += value.nbytes
+    return size
+
+
+def _copy(record: Any) -> Any:
+    """Copies a dataclass record and its list and writeable array fields, so callers cannot mutate cached entries."""
+    return dataclasses.replace(record, **{name: value.copy() for name, value in vars(record).items()
+                                          if isinstance(value, list) or (
+                                              isinstance(value, np.ndarray) and value.flags.writeable)})
+
+
+class LRUCache:
+    """
+    Least recently used cache bounded by entry count and, optionally, by approximate size in bytes.
+
+    Entries expire ttl seconds after they were stored, if ttl is set.
+
+    Readers take generation() before reading a record from the database and pass it
+    to put, which skips the record if its key was invalidated in the meantime, so a
+    read racing a write cannot cache the record the write replaced.
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int | None = None,
+                 ttl: float | None = None) -> None:
+        if max_entries < 1:
+            raise ValueError(f"Error: max_entries must be a positive integer, not {max_entries}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self.size_bytes = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, float | None, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # counts invalidations
+        self._invalidated_at: dict[Hashable, int] = {}  # generation of the latest invalidation per key
+        self._cleared_at = 0  # generation of the latest invalidation of every key
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Returns the value stored under key and marks it as recently used, None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                self._drop(key)
+                self.stats.evictions += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+    def generation(self) -> int:
+        """Returns the current invalidation generation, taken by readers before they read a record."""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        """Stores value under key and evicts the least recently used entries beyond the bounds.
+
+        If generation is given, value is not stored if key was invalidated after it was taken.
+        """
+        size = _estimate_size(value)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generation is not None and max(self._cleared_at, self._invalidated_at.get(key, 0)) > generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, expires_at, size)
+            self.size_bytes += size
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self.size_bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Drops the entries stored under keys."""
+        with self._lock:
+            self._generation += 1
+            if len(self._invalidated_at) >= self.max_entries:
+                # bound the tracked keys, in-flight reads of any key are skipped instead
+                self._invalidated_at.clear()
+                self._cleared_at = self._generation
+            for key in keys:
+                self._invalidated_at[key] = self._generation
+                if key in self._entries:
+                    self._drop(key)
+                    self.stats.invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        """Drops all entries for which predicate(key, value) is true, and skips all in-flight reads."""
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at.clear()
+            self._cleared_at = self._generation
+            for key in [key for key, (value, _, _) in self._entries.items() if predicate(key, value)]:
+                self._drop(key)
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Drops all entries."""
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at.clear()
+            self._cleared_at = self._generation
+            self.stats.invalidations += len(self._entries)
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        self.size_bytes -= self._entries.pop(key)[2]
+
+
+class CachedKG(NoSQLKnowledgeGraph):
+    """
+    Read-through cache around any NoSQLKnowledgeGraph implementation.
+
+    get_node, get_nodes and get_edge keep the decoded NodeData / EdgeData in an LRU
+    cache. Writes through this object invalidate the entries they affect after the
+    write returned or failed. Reads that started before such an invalidation do not
+    cache what they read, so a read racing a write cannot leave the replaced record
+    cached. Writes made directly to the database are only picked up once entries
+    expire after ttl.
+    """
+
+    def __init__(self, kg: NoSQLKnowledgeGraph, max_entries: int = 10_000,
+                 max_bytes: int | None = None, ttl: float | None = None) -> None:
+        """
+        Args:
+            kg (NoSQLKnowledgeGraph): the knowledge graph to cache reads of.
+            max_entries (int): maximum number of cached nodes and edges.
+            max_bytes (int | None): maximum approximate size of the cached records in bytes.
+            ttl (float | None): seconds after which a cached record is read again.
+        """
+        super().__init__()
+        self.kg = kg
+        self.cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit, miss, eviction and invalidation counters of the cache."""
+        return self.cache.stats
+
+    def _invalidate_edges(self, edges: Iterable[tuple[str, str]]) -> None:
+        """Drops the cached edges in both directions and the cached nodes at their ends."""
+        keys = []
+        for source_uid, target_uid in edges:
+            keys += [("node", source_uid), ("node", target_uid),
+                     ("edge", source_uid, target_uid), ("edge", target_uid, source_uid)]
+        self.cache.invalidate(keys)
+
+    def add_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Adds an node to the knowledge graph."""
+        try:
+            self.kg.add_node(node_uid=node_uid, node_data=node_data)
+        finally:
+            self.cache.invalidate([("node", node_uid)])
+
+    def add_nodes(self, nodes: Iterable[NodeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many nodes to the knowledge graph and reports success per node_uid."""
+        nodes = list(nodes)
+        try:
+            return self.kg.add_nodes(nodes, batch_size=batch_size)
+        finally:
+            self.cache.invalidate([("node", n.node_uid) for n in nodes if isinstance(n, NodeData)])
+
+    def get_node(self, node_uid: str) -> NodeData:
+        """Retrieves an node from the cache or, on a miss, from the knowledge graph."""
+        node_data = self.cache.get(("node", node_uid))
+        if node_data is None:
+            generation = self.cache.generation()
+            node_data = self.kg.get_node(node_uid)
+            self.cache.put(("node", node_uid), node_data, generation)
+        return _copy(node_data)
+
+    def get_nodes(self, node_uids: List[str], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many nodes, only the node_uids missing from the cache are read in batch."""
+        cached = {}
+        for node_uid in dict.fromkeys(node_uids):
+            node_data = self.cache.get(("node", node_uid))
+            if node_data is not None:
+                cached[node_uid] = node_data
+
+        generation = self.cache.generation()
+        fetched = self.kg.get_nodes([uid for uid in dict.fromkeys(node_uids) if uid not in cached],
+                                    chunk_size=chunk_size)
+        for node_uid, node_data in fetched.found.items():
+            self.cache.put(("node", node_uid), node_data, generation)
+
+        result = BatchReadResult(missing=fetched.missing)
+        for node_uid in dict.fromkeys(node_uids):
+            if node_uid in cached:
+                result.found[node_uid] = _copy(cached[node_uid])
+            elif node_uid in fetched.found:
+                result.found[node_uid] = _copy(fetched.found[node_uid])
+        return result
+
+    def get_k_hop_neighborhood(self, node_uid: str, k: int, direction: str = "both",
+                               limit: int | None = None, return_uids: bool = False,
+                               **options) -> NeighborhoodData:
+        """Runs the traversal of the wrapped knowledge graph, which may be native to its database."""
+        return self.kg.get_k_hop_neighborhood(node_uid=node_uid, k=k, direction=direction,
+                                              limit=limit, return_uids=return_uids, **options)
+
+    def update_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Updates an existing node in the knowledge graph."""
+        try:
+            self.kg.update_node(node_uid=node_uid, node_data=node_data)
+        finally:
+            self.cache.invalidate([("node", node_uid)])
+
+    def remove_node(self, node_uid: str) -> None:
+        """Removes an node and drops it, its edges and its neighbors from the cache."""
+        try:
+            self.kg.remove_node(node_uid=node_uid)
+        finally:
+            self.cache.invalidate_where(lambda key, value: node_uid in key[1:] or (
+                key[0] == "node" and (node_uid in value.edges_to or node_uid in value.edges_from)))
+
+    def add_edge(self, edge_data: EdgeData) -> None:
+        """Adds an edge (relationship) between two entities in the knowledge graph."""
+        try:
+            self.kg.add_edge(edge_data=edge_data)
+        finally:
+            self._invalidate_edges([(edge_data.source_uid, edge_data.target_uid)])
+
+    def add_edges(self, edges: Iterable[EdgeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many edges to the knowledge graph and reports success per edge_uid."""
+        edges = list(edges)
+        try:
+            return self.kg.add_edges(edges, batch_size=batch_size)
+        finally:
+            self._invalidate_edges([(e.source_uid, e.target_uid) for e in edges if isinstance(e, EdgeData)])
+
+    def _commit_session(self, nodes: list[NodeData], updates: dict[str, NodeData],
+                        edges: list[EdgeData]) -> None:
+        """Commits the buffered writes of a KGSession with the wrapped knowledge graph."""
+        try:
+            self.kg._commit_session(nodes, updates, edges)
+        finally:
+            self.cache.invalidate([("node", node_uid) for node_uid in [n.node_uid for n in nodes] + list(updates)])
+            self._invalidate_edges([(e.source_uid, e.target_uid) for e in edges])
+
+    def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
+        """Retrieves an edge from the cache or, on a miss, from the knowledge graph."""
+        edge_data = self.cache.get(("edge", source_uid, target_uid))
+        if edge_data is None:
+            generation = self.cache.generation()
+            edge_data = self.kg.get_edge(source_uid=source_uid, target_uid=target_uid)
+            self.cache.put(("edge", source_uid, target_uid), edge_data, generation)
+        return _copy(edge_data)
+
+    def get_edges(self, edges: List[tuple[str, str]], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many edges, only the edges missing from the cache are read in batch."""
+        cached = {}
+        for source_uid, target_uid in dict.fromkeys(edges):
+            edge_data = self.cache.get(("edge", source_uid, target_uid))
+            if edge_data is not None:
+                cached[(source_uid, target_uid)] = edge_data
+
+        generation = self.cache.generation()
+        fetched = self.kg.get_edges([pair for pair in dict.fromkeys(edges) if pair not in cached],
+                                    chunk_size=chunk_size)
+        for edge_data in fetched.found.values():
+            self.cache.put(("edge", edge_data.source_uid, edge_data.target_uid), edge_data, generation)
+
+        result = BatchReadResult(missing=fetched.missing)
+        for source_uid, target_uid in dict.fromkeys(edges):
+            edge_uid = self._generate_edge_uid(source_uid, target_uid)
+            if (source_uid, target_uid) in cached:
+                result.found[edge_uid] = _copy(cached[(source_uid, target_uid)])
+            elif edge_uid in fetched.found:
+                result.found[edge_uid] = _copy(fetched.found[edge_uid])
+        return result
+
+    def update_edge(self, edge_data: EdgeData) -> None:
+        """Updates an existing edge in the knowledge graph."""
+        try:
+            self.kg.update_edge(edge_data=edge_data)
+        finally:
+            self._invalidate_edges([(edge_data.source_uid, edge_data.target_uid)])
+
+    def _delete_from_edge_coll(self, edge_uid: str) -> None:
+        """Method to delete record from edge collection of given kg store"""
+        try:
+            self.kg._delete_from_edge_coll(edge_uid)
+        finally:
+            self.cache.invalidate_where(lambda key, value: key[0] == "edge" and (
+                self._generate_edge_uid(key[1], key[2]) == edge_uid))
+
+    def remove_edge(self, source_uid: str, target_uid: str) -> None:
+        """Removes an edge between two entities."""
+        try:
+            self.kg.remove_edge(source_uid=source_uid, target_uid=target_uid)
+        finally:
+            self._invalidate_edges([(source_uid, target_uid)])
+
+    def build_networkx(self, attributes: List[str] | None = None) -> None:
+        """Builds the NetworkX representation of the full graph with the wrapped knowledge graph."""
+        self.kg.build_networkx(attributes=attributes)
+        self.networkx = self.kg.networkx
+        self.networkx_attributes = self.kg.networkx_attributes
+
+    def _get_changes_since(self, since: float, node_fields: List[str]) -> GraphChanges:
+        return self.kg._get_changes_since(since, node_fields)
+
+    def _scan_nodes(self, node_fields: List[str]) -> List[dict]:
+        return self.kg._scan_nodes(node_fields)
+
+    def store_community(self, community: CommunityData) -> None:
+        """Takes valid graph community data and upserts the database with it."""
+        self.kg.store_community(community)
+
+    def _generate_edge_uid(self, source_uid: str, target_uid: str) -> str:
+        return self.kg._generate_edge_uid(source_uid, target_uid)
+
+    def get_nearest_neighbors(self, query_vec, k: int = 10, distance: str | None = None,
+                              fields: List[str] | None = None,
+                              pre_filter: dict | None = None) -> List[NeighborData]:
+        """Implements nearest neighbor search based on nosql db index."""
+        return self.kg.get_nearest_neighbors(query_vec, k=k, distance=distance, fields=fields,
+                                             pre_filter=pre_filter)
+
+    def get_nearest_neighbors_batch(self, queries, k: int = 10, distance: str | None = None,
+                                    pre_filter: dict | None = None) -> NeighborBatchData:
+        """Implements batched nearest neighbor search based on nosql db index."""
+        return self.kg.get_nearest_neighbors_batch(queries, k=k, distance=distance, pre_filter=pre_filter)
+
+    def get_nearest_communities(self, query_vec, k: int = 10, distance: str = "euclidean",
+                                min_rating: int | None = None) -> List[CommunityNeighborData]:
+        """Implements community vector search of the wrapped graph."""
+        return self.kg.get_nearest_communities(query_vec, k=k, distance=distance, min_rating=min_rating)
+
+    def get_community(self, community_id: str) -> CommunityData:
+        """Retrieves the community report for a given community id."""
+        return self.kg.get_community(community_id)
+
+    def list_communities(self) -> List[CommunityData]:
+        """Lists all stored communities for the given network."""
+        return self.kg.list_communities()
+
+    def clean_zerodegree_nodes(self) -> None:
+        """Removes all nodes with degree 0."""
+        try:
+            self.kg.clean_zerodegree_nodes()
+        finally:
+            self.cache.clear()
+
+    def edge_exist(self, source_uid: str, target_uid: str) -> bool:
+        """Checks for edge existence and returns boolean"""
+        if self.cache.get(("edge", source_uid, target_uid)) is not None:
+            return True
+        return self.kg.edge_exist(source_uid, target_uid)
+
+    def node_exist(self, node_uid: str) -> bool:
+        """Checks for node existence and returns boolean"""
+        if self.cache.get(("node", node_uid)) is not None:
+            return True
+        return self.kg.node_exist(node_uid)
+
+    def flush_kg(self) -> None:
+        """Method to wipe the complete datastore of the knowledge graph"""
+        try:
+            self.kg.flush_kg()
+        finally:
+            self.cache.clear()
+        self.networkx_synced_at = None
@@ -0,0 +1,41 @@
+"""graph2nosql binary storage codec for node embeddings"""
+
+from typing import List
+
+import numpy as np
+
+
+CODEC_DTYPES = ("float32", "float16")  # storage precisions of EmbeddingCodec
+
+
+class EmbeddingCodec:
+    """
+    Stores node embeddings as packed little-endian float32 or float16 bytes instead of float lists.
+
+    Opt in by setting embedding_codec on a knowledge graph object. Stored embeddings
+    take 4 or 2 bytes per dimension, and are decoded on read into np.ndarray
+    views over the fetched bytes without converting every value to a Python float.
+    Embeddings stored as lists are still read as lists, so existing data stays readable.
+    """
+
+    def __init__(self, dtype: str = "float32") -> None:
+        """
+        Initializes the EmbeddingCodec object.
+
+        Args:
+            dtype (str): "float32" or "float16". float16 halves the storage again at about 3 significant digits.
+        """
+        if dtype not in CODEC_DTYPES:
+            raise ValueError(f"Error: dtype must be one of {CODEC_DTYPES}, not '{dtype}'")
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+
+    def encode(self, embedding: np.ndarray | List[float]) -> bytes:
+        """Packs an embedding into bytes of the codec dtype."""
+        return np.asarray(embedding, dtype=self.dtype).tobytes()
+
+    def decode(self, value: bytes | bytearray | memoryview) -> np.ndarray:
+        """Returns the embedding packed in value as view sharing the memory of value."""
+        return np.frombuffer(value, dtype=self.dtype)
+
+    def __repr__(self) -> str:
+        return f"EmbeddingCodec(dtype='{self.dtype.name}')"
@@ -1,33 +1,443 @@
 """graph2nosql base class for required database operations"""
 
 from abc import ABC, abstractmethod
-
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable, Iterator, List, TypeVar
+import dataclasses
 import datetime
+import itertools
+import time
 
+import numpy as np
 import networkx as nx  # type: ignore
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
 import graspologic as gc
 
-from datamodel.data_model import NodeData, EdgeData, CommunityData, NodeEmbeddings
+from base.codec import EmbeddingCodec
+from datamodel.data_model import NodeData, EdgeData, CommunityData, NodeEmbeddings, BatchWriteResult, BatchReadResult, GraphChanges, NeighborhoodData, NeighborData, NeighborBatchData, CommunityNeighborData, ContextData
+
+if TYPE_CHECKING:
+    from base.vectors import VectorIndex
+
+METRICS = ("cosine", "dot", "euclidean")  # distances of nearest neighbor search
+NN_PRE_FILTER_FIELDS = ("node_type", "document_id", "community_id")  # NodeData fields nearest neighbor search can filter on
+
+
+T = TypeVar("T")
+
+_FLOAT32_CODEC = EmbeddingCodec("float32")
 
 
-class NoSQLKnowledgeGraph(ABC):
+def batched(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Splits an iterable into consecutive lists of at most size items."""
+    if size < 1:
+        raise ValueError(f"Error: batch size must be at least 1, got {size}")
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class GraphRecordsMixin:
+    """
+    Backend independent helpers validating and building the records stored for nodes and edges.
+    Shared by the synchronous and asynchronous knowledge graph base classes.
+    """
+
+    embedding_codec: EmbeddingCodec | None = None  # opt-in binary storage of node embeddings
+
+    @staticmethod
+    def _validate_bulk_nodes(nodes: list[NodeData], seen_uids: set[str],
+                             result: BatchWriteResult) -> list[NodeData]:
+        """Rejects nodes that add_node would reject as well as node_uids repeated within one bulk call."""
+        valid_nodes = []
+        for node_data in nodes:
+            if node_data.node_uid in seen_uids:
+                result.failed[node_data.node_uid] = (
+                    f"Error: Node with node_uid '{node_data.node_uid}' appears more than once in the batch.")
+            elif node_data.edges_to or node_data.edges_from:
+                result.failed[node_data.node_uid] = (
+                    "Error: NodeData cannot be initiated with edges_to or edges_from. Please add edges separately.")
+            else:
+                valid_nodes.append(node_data)
+            seen_uids.add(node_data.node_uid)
+        return valid_nodes
+
+    def _validate_bulk_edges(self, edges: list[EdgeData], existing_node_uids: set[str],
+                             result: BatchWriteResult) -> list[EdgeData]:
+        """Rejects edges that add_edge would reject given the set of existing endpoint node_uids."""
+        valid_edges = []
+        for edge_data in edges:
+            if not isinstance(edge_data, EdgeData):
+                result.failed[str(edge_data)] = (
+                    f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+                continue
+            edge_uid = self._generate_edge_uid(
+                source_uid=edge_data.source_uid, target_uid=edge_data.target_uid)
+            if edge_data.source_uid not in existing_node_uids:
+                result.failed[edge_uid] = (
+                    f"Error: Source node with node_uid '{edge_data.source_uid}' does not exist.")
+            elif edge_data.target_uid not in existing_node_uids:
+                result.failed[edge_uid] = (
+                    f"Error: Target node with node_uid '{edge_data.target_uid}' does not exist.")
+            else:
+                valid_edges.append(edge_data)
+        return valid_edges
+
+    @staticmethod
+    def _adjacency_deltas(edges: list[EdgeData]) -> dict[str, dict[str, set[str]]]:
+        """Merges the edges_to / edges_from additions of a batch of edges into one delta per node.
+
+        Sample Output:
+        {"node_1": {"edges_to": {"node_2"}, "edges_from": set()},
+         "node_2": {"edges_to": set(), "edges_from": {"node_1"}}}
+        """
+        deltas: dict[str, dict[str, set[str]]] = {}
+
+        def _delta(node_uid: str) -> dict[str, set[str]]:
+            return deltas.setdefault(node_uid, {"edges_to": set(), "edges_from": set()})
+
+        for edge_data in edges:
+            _delta(edge_data.source_uid)["edges_to"].add(edge_data.target_uid)
+            _delta(edge_data.target_uid)["edges_from"].add(edge_data.source_uid)
+            if not edge_data.directed:
+                _delta(edge_data.target_uid)["edges_to"].add(edge_data.source_uid)
+                _delta(edge_data.source_uid)["edges_from"].add(edge_data.target_uid)
+        return deltas
+
+    def _edge_records(self, edge_data: EdgeData) -> list[dict]:
+        """Returns the edge collection records of an edge, including the reverse record of undirected edges."""
+        records = [self._stamped({
+            "edge_uid": self._generate_edge_uid(
+                source_uid=edge_data.source_uid, target_uid=edge_data.target_uid),
+            "source_uid": edge_data.source_uid,
+            "target_uid": edge_data.target_uid,
+            "description": edge_data.description,
+            "directed": edge_data.directed
+        })]
+        if not edge_data.directed:
+            records.append(self._stamped({
+                "edge_uid": self._generate_edge_uid(
+                    source_uid=edge_data.target_uid, target_uid=edge_data.source_uid),
+                "source_uid": edge_data.target_uid,
+                "target_uid": edge_data.source_uid,
+                "description": edge_data.description,
+                "directed": edge_data.directed
+            }))
+        return records
+
+    def _node_record(self, node_data: NodeData) -> dict:
+        """Returns the stored record of a node, with the embedding packed by the embedding_codec if one is set."""
+        record = dict(node_data.__dict__)
+        if self.embedding_codec is not None:
+            record["embedding"] = self._encode_embedding(node_data.embedding)
+        return record
+
+    def _encode_embedding(self, embedding):
+        """Packs an embedding with the embedding_codec, backends wrap it in their native binary type."""
+        return self.embedding_codec.encode(embedding)  # type: ignore
+
+    def _decode_embedding(self, value):
+        """Decodes a stored binary embedding into an np.ndarray view, embeddings stored as lists are returned as is.
+
+        Binary embeddings are read as float32 if no embedding_codec is set.
+        """
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return (self.embedding_codec or _FLOAT32_CODEC).decode(value)
+        return value
+
+    def _node_from_record(self, record: dict) -> NodeData:
+        """Converts a stored node record to NodeData, decoding a binary embedding."""
+        node_data = NodeData.__from_dict__(record)
+        node_data.embedding = self._decode_embedding(node_data.embedding)
+        return node_data
+
+    def _decoded_nodes(self, records: Iterable[dict]) -> Iterator[dict]:
+        """Yields node dicts read by _get_changes_since with binary embeddings decoded."""
+        for record in records:
+            if "embedding" in record:
+                record = {**record, "embedding": self._decode_embedding(record["embedding"])}
+            yield record
+
+    @staticmethod
+    def _stamped(record: dict) -> dict:
+        """Returns a copy of a record to store with its updated_at write watermark set to now."""
+        return {**record, "updated_at": time.time()}
+
+    def _tombstone_records(self, node_uids: Iterable[str] = (),
+                           edges: Iterable[tuple[str, str]] = ()) -> list[dict]:
+        """Returns the tombstone records marking removed nodes and (source_uid, target_uid) edges.
+
+        Tombstones carry an updated_at watermark so refresh_networkx can pick up removals.
+        One tombstone is kept per removed uid and overwritten if it is removed again.
+        """
+        records = [self._stamped({"tombstone_uid": f"node:{node_uid}", "kind": "node", "uid": node_uid})
+                   for node_uid in node_uids]
+        records += [self._stamped({"tombstone_uid": f"edge:{self._generate_edge_uid(source_uid, target_uid)}",
+                                   "kind": "edge", "source_uid": source_uid, "target_uid": target_uid})
+                    for source_uid, target_uid in edges]
+        return records
+
+    def _coalesce_session(self, nodes: list[NodeData], updates: dict[str, NodeData],
+                          edges: list[EdgeData]) -> tuple[list[dict], dict[str, dict], dict[str, dict[str, set[str]]], list[dict]]:
+        """Merges the buffered writes of a KGSession into one write per document.
+
+        The adjacency changes of edges are folded into the records of nodes created or
+        updated in the same session. Returns the records of created nodes, the records of
+        updated nodes by node_uid, the adjacency deltas of all other nodes and the edge records.
+        """
+        deltas = self._adjacency_deltas(edges)
+
+        def _record(node_uid: str, node_data: NodeData) -> dict:
+            record = self._stamped(self._node_record(node_data))
+            delta = deltas.pop(node_uid, None)
+            if delta:
+                record["edges_to"] = list(dict.fromkeys(record["edges_to"] + sorted(delta["edges_to"])))
+                record["edges_from"] = list(dict.fromkeys(record["edges_from"] + sorted(delta["edges_from"])))
+            return record
+
+        created = [_record(node_data.node_uid, node_data) for node_data in nodes]
+        updated = {node_uid: _record(node_uid, node_data) for node_uid, node_data in updates.items()}
+        edge_records = [record for edge_data in edges for record in self._edge_records(edge_data)]
+        return created, updated, deltas, edge_records
+
+    @staticmethod
+    def _add_tombstones(changes: GraphChanges, tombstones: Iterable[dict]) -> GraphChanges:
+        """Adds stored tombstone records to the removals of a GraphChanges."""
+        for tombstone in tombstones:
+            if tombstone["kind"] == "node":
+                changes.removed_nodes.append(tombstone["uid"])
+            else:
+                changes.removed_edges.append((tombstone["source_uid"], tombstone["target_uid"]))
+        return changes
+
+
+class NoSQLKnowledgeGraph(GraphRecordsMixin, ABC):
     """
     Base Class for storing and interacting with the KG and manages data model.
     """
     networkx: nx.Graph | nx.DiGraph = nx.Graph(
     )  # networkx representation of graph in nosqldb
+    networkx_synced_at: float | None = None  # updated_at watermark of the last networkx sync
+    networkx_attributes: list[str] = ["node_uid", "node_type"]  # NodeData fields loaded into networkx nodes
+    watermark_skew: float = 5.0  # seconds re-read before the watermark to tolerate clock skew between writers
+    vector_index: "VectorIndex | None" = None  # local vector search engine over node embeddings
 
     @abstractmethod
     def add_node(self, node_uid: str, node_data: NodeData) -> None:
         """Adds an node to the knowledge graph."""
 
+    def add_nodes(self, nodes: Iterable[NodeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many nodes to the knowledge graph and reports success per node_uid.
+
+        This generic implementation falls back to one add_node call per node.
+        Backends override it with their native bulk write mechanism.
+        """
+        result = BatchWriteResult()
+        for chunk in batched(nodes, batch_size):
+            for node_data in chunk:
+                try:
+                    self.add_node(node_uid=node_data.node_uid, node_data=node_data)
+                except Exception as e:
+                    result.failed[node_data.node_uid] = str(e)
+                else:
+                    result.succeeded.append(node_data.node_uid)
+        return result
+
     @abstractmethod
     def get_node(self, node_uid: str) -> NodeData:
         """Retrieves an node from the knowledge graph."""
 
+    def get_nodes(self, node_uids: List[str], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many nodes from the knowledge graph.
+
+        Returns the found NodeData keyed by node_uid and the node_uids that do not exist.
+        This generic implementation falls back to one get_node call per node.
+        Backends override it to fetch chunk_size nodes per round trip.
+        """
+        result = BatchReadResult()
+        for node_uid in dict.fromkeys(node_uids):
+            try:
+                result.found[node_uid] = self.get_node(node_uid)
+            except KeyError:
+                result.missing.append(node_uid)
+        return result
+
+    def get_k_hop_neighborhood(self, node_uid: str, k: int, direction: str = "both",
+                               limit: int | None = None, return_uids: bool = False) -> NeighborhoodData:
+        """Returns the nodes reachable from node_uid in 1 to k hops, counted per hop.
+
+        The breadth-first search expands one frontier per hop with a single batched
+        read of the adjacency lists of all frontier nodes. Nodes are only counted at
+        the hop they are first reached.
+
+        Args:
+            node_uid (str): uid of the start node.
+            k (int): maximum number of hops.
+            direction (str): "out" follows edges_to, "in" follows edges_from, "both" follows both.
+            limit (int | None): maximum number of nodes to reach, the search stops once it is hit.
+            return_uids (bool): also return the node_uids per hop instead of counts only.
+        """
+        self._validate_traversal(k, direction, limit)
+
+        visited = {node_uid}
+        frontier = [node_uid]
+        hops: list[list[str]] = []
+        truncated = False
+
+        while frontier and len(hops) < k and not truncated:
+            adjacency = self._get_adjacency(frontier)
+            if not hops and node_uid not in adjacency:
+                raise KeyError(f"Error: No node found with node_uid: {node_uid}")
+
+            next_frontier: list[str] = []
+            for frontier_uid in frontier:
+                edges_to, edges_from = adjacency.get(frontier_uid, ([], []))
+                neighbors = (edges_to if direction != "in" else []) + (edges_from if direction != "out" else [])
+                for neighbor_uid in neighbors:
+                    if neighbor_uid in visited:
+                        continue
+                    if limit is not None and len(visited) > limit:
+                        truncated = True
+                        break
+                    visited.add(neighbor_uid)
+                    next_frontier.append(neighbor_uid)
+                if truncated:
+                    break
+            if next_frontier:
+                hops.append(next_frontier)
+            frontier = next_frontier
+
+        return NeighborhoodData(node_uid=node_uid,
+                                hop_counts=[len(hop) for hop in hops],
+                                hop_uids=hops if return_uids else None,
+                                truncated=truncated)
+
+    def retrieve_context(self, query_vec, k_seeds: int = 10, hops: int = 1, max_nodes: int = 100,
+                         distance: str | None = None, direction: str = "both",
+                         pre_filter: dict | None = None, max_workers: int = 4) -> ContextData:
+        """Retrieves the subgraph around the nearest neighbors of query_vec for local search.
+
+        The k_seeds nearest nodes are expanded breadth-first for up to hops hops. Every hop
+        costs one get_nodes call for the whole frontier, whose adjacency lists give the next
+        frontier. The edges between the retrieved nodes are read with one get_edges call per
+        hop, which runs concurrently with the node reads of the following hop.
+
+        Args:
+            query_vec: query embedding of the nearest neighbor search.
+            k_seeds (int): number of nearest neighbors to start from.
+            hops (int): maximum number of hops from the seeds, 0 retrieves the seeds only.
+            max_nodes (int): maximum number of nodes to retrieve, seeds included.
+            distance (str): distance of the nearest neighbor search, see get_nearest_neighbors.
+            direction (str): "out" follows edges_to, "in" follows edges_from, "both" follows both.
+            pre_filter (dict | None): restricts the seeds, see get_nearest_neighbors.
+            max_workers (int): maximum number of concurrent edge reads.
+        """
+        if not isinstance(hops, int) or hops < 0:
+            raise ValueError(f"Error: hops must be a non-negative integer, not {hops}")
+        if max_nodes < 1:
+            raise ValueError(f"Error: max_nodes must be a positive integer, not {max_nodes}")
+        self._validate_traversal(1, direction, None)
+
+        seeds = self.get_nearest_neighbors(query_vec, k=k_seeds, distance=distance, pre_filter=pre_filter)
+        context = ContextData(seeds=seeds, truncated=len(seeds) > max_nodes)
+        frontier = [seed.node_uid for seed in seeds[:max_nodes]]
+        visited = set(frontier)
+        edge_reads = []
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for hop in range(hops + 1):
+                found = self.get_nodes(frontier).found
+                connecting = []
+                for node_uid in frontier:
+                    if node_uid not in found:
+                        continue
+                    node_data = context.nodes[node_uid] = found[node_uid]
+                    # each edge is collected once, when the second of its nodes is retrieved
+                    connecting += [(node_uid, target_uid) for target_uid in node_data.edges_to
+                                   if target_uid in context.nodes]
+                    connecting += [(source_uid, node_uid) for source_uid in node_data.edges_from
+                                   if source_uid in context.nodes and source_uid != node_uid]
+                if connecting:
+                    edge_reads.append(executor.submit(self.get_edges, connecting))
+
+                if hop == hops or context.truncated:
+                    break
+                next_frontier: list[str] = []
+                for node_uid in frontier:
+                    node_data = context.nodes.get(node_uid)
+                    if node_data is None:
+                        continue
+                    neighbors = ((node_data.edges_to if direction != "in" else [])
+                                 + (node_data.edges_from if direction != "out" else []))
+                    for neighbor_uid in neighbors:
+                        if neighbor_uid in visited:
+                            continue
+                        if len(visited) >= max_nodes:
+                            context.truncated = True
+                            break
+                        visited.add(neighbor_uid)
+                        next_frontier.append(neighbor_uid)
+                    if context.truncated:
+                        break
+                if not next_frontier:
+                    break
+                context.hop_uids.append(next_frontier)
+                frontier = next_frontier
+
+            undirected = set()
+            for edge_read in edge_reads:
+                for edge_data in edge_read.result().found.values():
+                    # undirected edges are stored in both directions, keep one
+                    if not edge_data.directed:
+                        pair = frozenset((edge_data.source_uid, edge_data.target_uid))
+                        if pair in undirected:
+                            continue
+                        undirected.add(pair)
+                    context.edges.append(edge_data)
+        return context
+
+    @staticmethod
+    def _validate_traversal(k: int, direction: str, limit: int | None) -> None:
+        """Validates the arguments of get_k_hop_neighborhood."""
+        if not isinstance(k, int) or k < 1:
+            raise ValueError(f"Error: k must be a positive integer, not {k}")
+        if direction not in ("out", "in", "both"):
+            raise ValueError(
+                f"Error: direction must be one of 'out', 'in' or 'both', not '{direction}'")
+        if limit is not None and limit < 1:
+            raise ValueError(f"Error: limit must be a positive integer, not {limit}")
+
+    @staticmethod
+    def _neighborhood_from_hops(node_uid: str, hops: list[dict], limit: int | None,
+                                return_uids: bool) -> NeighborhoodData:
+        """Builds NeighborhoodData from per hop {"count", "node_uids"} rows ordered by hop.
+
+        Server side traversals fetch up to limit + 1 nodes, the node past limit only
+        signals that the neighborhood was truncated and is dropped.
+        """
+        truncated = limit is not None and sum(hop["count"] for hop in hops) > limit
+        if truncated:
+            hops[-1]["count"] -= 1
+            if return_uids:
+                hops[-1]["node_uids"].pop()
+            if hops[-1]["count"] == 0:
+                hops.pop()
+
+        return NeighborhoodData(node_uid=node_uid,
+                                hop_counts=[hop["count"] for hop in hops],
+                                hop_uids=[hop["node_uids"] for hop in hops] if return_uids else None,
+                                truncated=truncated)
+
+    def _get_adjacency(self, node_uids: List[str]) -> dict[str, tuple[list[str], list[str]]]:
+        """Returns (edges_to, edges_from) keyed by node_uid for the existing nodes of node_uids.
+
+        This generic implementation reads the full nodes with get_nodes.
+        Backends override it to only read the adjacency lists.
+        """
+        return {uid: (node_data.edges_to, node_data.edges_from)
+                for uid, node_data in self.get_nodes(node_uids).found.items()}
+
     @abstractmethod
     def update_node(self, node_uid: str, node_data: NodeData) -> None:
         """Updates an existing node in the knowledge graph."""
@@ -40,10 +450,45 @@ class NoSQLKnowledgeGraph(ABC):
     def add_edge(self, edge_data: EdgeData) -> None:
         """Adds an edge (relationship) between two entities in the knowledge graph."""
 
+    def add_edges(self, edges: Iterable[EdgeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many edges to the knowledge graph and reports success per edge_uid.
+
+        This generic implementation falls back to one add_edge call per edge.
+        Backends override it to merge the adjacency updates of a batch per node
+        and flush them together with the edge records in native batches.
+        """
+        result = BatchWriteResult()
+        for chunk in batched(edges, batch_size):
+            for edge_data in chunk:
+                edge_uid = self._generate_edge_uid(
+                    source_uid=edge_data.source_uid, target_uid=edge_data.target_uid)
+                try:
+                    self.add_edge(edge_data=edge_data)
+                except Exception as e:
+                    result.failed[edge_uid] = str(e)
+                else:
+                    result.succeeded.append(edge_uid)
+        return result
+
     @abstractmethod
     def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
         """Retrieves an edge between two entities."""
 
+    def get_edges(self, edges: List[tuple[str, str]], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many edges by (source_uid, target_uid).
+
+        Returns the found EdgeData keyed by edge_uid and the edge_uids that do not exist.
+        This generic implementation falls back to one get_edge call per edge.
+        Backends override it to fetch chunk_size edges per round trip.
+        """
+        result = BatchReadResult()
+        for source_uid, target_uid in dict.fromkeys(edges):
+            try:
+                result.found[self._generate_edge_uid(source_uid, target_uid)] = self.get_edge(source_uid, target_uid)
+            except KeyError:
+                result.missing.append(self._generate_edge_uid(source_uid, target_uid))
+        return result
+
     @abstractmethod
     def update_edge(self, edge_data: EdgeData) -> None:
         """Updates an existing edge in the knowledge graph."""
@@ -57,11 +502,106 @@ class NoSQLKnowledgeGraph(ABC):
         """Removes an edge between two entities."""
 
     @abstractmethod
-    def build_networkx(self) -> None:
+    def build_networkx(self, attributes: List[str] | None = None) -> None:
         """Builds the NetworkX representation of the full graph.
         https://networkx.org/documentation/stable/index.html
+
+        Only the topology is loaded by default: nodes carry node_uid and node_type,
+        edges only connect source_uid and target_uid. Further NodeData fields such
+        as node_description or embedding are loaded if listed in attributes.
         """
 
+    @staticmethod
+    def _networkx_node_fields(attributes: Iterable[str] | None = None) -> list[str]:
+        """Returns the NodeData fields to load into networkx nodes for the requested attributes."""
+        attributes = list(attributes or [])
+        node_data_fields = {f.name for f in dataclasses.fields(NodeData)}
+        unknown = [a for a in attributes if a not in node_data_fields]
+        if unknown:
+            raise ValueError(
+                f"Error: Unknown NodeData attributes requested for networkx: {unknown}")
+        return list(dict.fromkeys(["node_uid", "node_type"] + attributes))
+
+    def _get_changes_since(self, since: float, node_fields: List[str]) -> GraphChanges:
+        """Returns the nodes and edges written or removed at or after the updated_at watermark since.
+
+        Changed nodes are returned with the given node_fields only.
+        Backends without change tracking keep this default and refresh_networkx
+        falls back to a full build_networkx.
+        """
+        raise NotImplementedError(
+            f"Change tracking is not implemented for {type(self).__name__}.")
+
+    def _scan_nodes(self, node_fields: List[str]) -> List[dict]:
+        """Returns the given node_fields of all nodes, whether they carry an updated_at watermark or not.
+
+        The default reads them through _get_changes_since, backends that may hold nodes
+        written before change tracking override it with an unfiltered scan.
+        """
+        return self._get_changes_since(0.0, node_fields).nodes
+
+    def refresh_networkx(self, attributes: List[str] | None = None) -> None:
+        """Brings the NetworkX representation up to date with the database.
+
+        The first call builds the full graph. Later calls only read the documents
+        written or removed since the previous sync and patch the existing graph.
+        The graph is rebuilt if it lacks node attributes requested in attributes.
+        """
+        sync_started_at = time.time()
+        node_fields = self._networkx_node_fields(attributes)
+        if self.networkx_synced_at is None or not set(node_fields) <= set(self.networkx_attributes):
+            self.build_networkx(attributes=attributes)
+        else:
+            try:
+                changes = self._get_changes_since(
+                    self.networkx_synced_at - self.watermark_skew, self.networkx_attributes)
+            except NotImplementedError:
+                self.build_networkx(attributes=self.networkx_attributes)
+            else:
+                self._apply_changes(changes)
+        self.networkx_synced_at = sync_started_at
+
+    def _apply_changes(self, changes: GraphChanges) -> None:
+        """Patches the NetworkX representation with changes read from the database."""
+        graph = self.networkx
+
+        # Removals first, anything removed and re-added within the window is restored below
+        for node_uid in changes.removed_nodes:
+            if graph.has_node(node_uid):
+                graph.remove_node(node_uid)
+        for source_uid, target_uid in changes.removed_edges:
+            # Both directions share one networkx edge, keep it while the opposite edge exists
+            if graph.has_edge(source_uid, target_uid) and not self.edge_exist(target_uid, source_uid):
+                graph.remove_edge(source_uid, target_uid)
+
+        for node_attributes in self._decoded_nodes(changes.nodes):
+            graph.add_node(node_attributes["node_uid"], **node_attributes)
+        graph.add_edges_from(changes.edges)
+
+    def session(self) -> "KGSession":
+        """Returns a unit of work that buffers node and edge writes until it is committed.
+
+        Used as context manager, the buffered writes are committed when the block exits
+        and discarded if it raises.
+        """
+        return KGSession(self)
+
+    def _commit_session(self, nodes: list[NodeData], updates: dict[str, NodeData],
+                        edges: list[EdgeData]) -> None:
+        """Commits the buffered writes of a KGSession.
+
+        This generic implementation runs add_nodes, update_node and add_edges in turn
+        and is not atomic. Backends override it to commit one batch or transaction.
+        """
+        result = self.add_nodes([dataclasses.replace(node_data, edges_to=[], edges_from=[])
+                                 for node_data in nodes])
+        for node_uid, node_data in updates.items():
+            self.update_node(node_uid=node_uid, node_data=node_data)
+        edge_result = self.add_edges(edges)
+        failed = {**result.failed, **edge_result.failed}
+        if failed:
+            raise Exception(f"Error: Session commit failed for {list(failed)}. Details: {failed}")
+
     @abstractmethod
     def store_community(self, community: CommunityData) -> None:
         """Takes valid graph community data and upserts the database with it.
@@ -74,8 +614,188 @@ class NoSQLKnowledgeGraph(ABC):
         return ""
 
     @abstractmethod
-    def get_nearest_neighbors(self, query_vec) -> List[str]:
-        """Implements nearest neighbor search based on nosql db index."""
+    def get_nearest_neighbors(self, query_vec, k: int = 10, distance: str | None = None,
+                              fields: List[str] | None = None,
+                              pre_filter: dict | None = None) -> List[NeighborData]:
+        """Returns the k nodes with the embeddings nearest to query_vec, nearest first.
+
+        distance is one of "cosine", "dot" or "euclidean", it defaults to the metric of the
+        attached vector_index, or "euclidean" without one. Neighbors carry their node_uid
+        and distance only, unless NodeData fields are requested in fields. pre_filter
+        restricts the search to nodes with equal node_type, document_id or community_id,
+        e.g. {"node_type": "Person"}.
+        """
+
+    def get_nearest_neighbors_batch(self, queries: np.ndarray, k: int = 10, distance: str | None = None,
+                                    pre_filter: dict | None = None) -> NeighborBatchData:
+        """Returns the k nearest nodes of every row of the (n_queries, dim) array queries.
+
+        Searches through the attached vector_index with blocked matrix products if one is
+        attached. The default otherwise runs get_nearest_neighbors once per query.
+        """
+        distance = self._resolve_distance(distance)
+        self._validate_nn_query(k, distance, None, pre_filter)
+        queries = np.asarray(queries, dtype=np.float32)
+        if self.vector_index is not None:
+            return self._index_nearest_neighbors_batch(queries, k=k, distance=distance, pre_filter=pre_filter)
+        return self._pack_neighbors(
+            [self.get_nearest_neighbors(query, k=k, distance=distance, pre_filter=pre_filter) for query in queries], k)
+
+    @staticmethod
+    def _pack_neighbors(neighbors: List[List[NeighborData]], k: int) -> NeighborBatchData:
+        """Packs per query NeighborData lists into (n_queries, k) arrays."""
+        batch = NeighborBatchData(node_uids=np.full((len(neighbors), k), None, dtype=object),
+                                  distances=np.full((len(neighbors), k), np.inf, dtype=np.float32))
+        for i, query_neighbors in enumerate(neighbors):
+            for j, neighbor in enumerate(query_neighbors[:k]):
+                batch.node_uids[i, j] = neighbor.node_uid
+                batch.distances[i, j] = neighbor.distance
+        return batch
+
+    def _resolve_distance(self, distance: str | None) -> str:
+        """Returns distance, or the metric of the attached vector_index if None, else "euclidean"."""
+        if distance is not None:
+            return distance
+        return self.vector_index.metric if self.vector_index is not None else "euclidean"
+
+    @staticmethod
+    def _validate_nn_query(k: int, distance: str, fields: List[str] | None,
+                           pre_filter: dict | None) -> None:
+        """Raises ValueError for invalid nearest neighbor search parameters."""
+        if k < 1:
+            raise ValueError(f"Error: k must be a positive integer, not {k}")
+        if distance not in METRICS:
+            raise ValueError(f"Error: distance must be one of {METRICS}, not '{distance}'")
+        node_data_fields = {f.name for f in dataclasses.fields(NodeData)}
+        unknown = [f for f in fields or [] if f not in node_data_fields]
+        if unknown:
+            raise ValueError(f"Error: Unknown NodeData fields requested: {unknown}")
+        unknown = [f for f in pre_filter or {} if f not in NN_PRE_FILTER_FIELDS]
+        if unknown:
+            raise ValueError(
+                f"Error: pre_filter fields must be in {NN_PRE_FILTER_FIELDS}, not {unknown}")
+
+    def _filter_node_uids(self, pre_filter: dict) -> List[str]:
+        """Returns the node_uids of the nodes matching the equality filters of pre_filter.
+
+        The default scans all nodes through _scan_nodes, backends override it with an indexed query.
+        """
+        return [node["node_uid"] for node in self._scan_nodes(["node_uid", *pre_filter])
+                if all(node.get(field) == value for field, value in pre_filter.items())]
+
+    def _get_node_fields(self, node_uids: List[str], fields: List[str]) -> dict[str, dict]:
+        """Returns the requested NodeData fields of the existing node_uids, defaults to get_nodes."""
+        found = self.get_nodes(node_uids).found
+        return {node_uid: {field: getattr(node_data, field) for field in fields}
+                for node_uid, node_data in found.items()}
+
+    def _neighbors(self, nearest: List[tuple[str, float]], fields: List[str] | None) -> List[NeighborData]:
+        """Converts (node_uid, distance) pairs to NeighborData, reading the requested fields in one batch.
+
+        Neighbors that no longer exist are dropped when fields are read.
+        """
+        if not fields:
+            return [NeighborData(node_uid=node_uid, distance=dist) for node_uid, dist in nearest]
+        node_fields = self._get_node_fields([node_uid for node_uid, _ in nearest], fields)
+        if "embedding" in fields:
+            for node_field_values in node_fields.values():
+                node_field_values["embedding"] = self._decode_embedding(node_field_values["embedding"])
+        return [NeighborData(node_uid=node_uid, distance=dist, fields=node_fields[node_uid])
+                for node_uid, dist in nearest if node_uid in node_fields]
+
+    def _index_nodes(self, nodes: Iterable[NodeData]) -> None:
+        """Upserts the embeddings of written nodes into the attached vector_index, once it is built."""
+        if self.vector_index is not None and self.vector_index.is_built:
+            self.vector_index._apply_nodes({"node_uid": n.node_uid, "embedding": n.embedding} for n in nodes)
+
+    def _unindex_nodes(self, node_uids: Iterable[str]) -> None:
+        """Removes the embeddings of removed nodes from the attached vector_index, once it is built."""
+        if self.vector_index is not None and self.vector_index.is_built:
+            self.vector_index.remove(node_uids)
+
+    def _clear_index(self) -> None:
+        """Drops the attached vector_index after the graph was flushed."""
+        if self.vector_index is not None:
+            self.vector_index.clear()
+
+    def _index_nearest_neighbors(self, query_vec, k: int = 10, distance: str | None = None,
+                                 fields: List[str] | None = None, pre_filter: dict | None = None,
+                                 **search_params) -> List[NeighborData]:
+        """Nearest neighbor search through the attached local vector_index.
+
+        The index is built from the stored embeddings on first use, and refreshed if it was
+        reopened with unsaved changes. Writes through this object keep it current, writes
+        of other processes are read by vector_index.refresh.
+        With a pre_filter, the embeddings of the matching nodes are scored exactly.
+        search_params such as nprobe are passed to the index.
+        """
+        distance = self._resolve_distance(distance)
+        self._validate_nn_query(k, distance, fields, pre_filter)
+        if self.vector_index is None:
+            raise ValueError(
+                f"Error: {type(self).__name__} has no vector_index attached for nearest neighbor search.")
+        if not self.vector_index.is_built:
+            self.vector_index.build(self)
+        elif self.vector_index.is_stale:
+            # writes applied to the index by an earlier process were not saved
+            self.vector_index.refresh(self)
+        node_uids = self._filter_node_uids(pre_filter) if pre_filter else None
+        nearest = self.vector_index.search(query_vec, k=k, metric=distance, node_uids=node_uids, kg=self,
+                                           **search_params)
+        return self._neighbors(nearest, fields)
+
+    def _index_nearest_neighbors_batch(self, queries: np.ndarray, k: int = 10, distance: str | None = None,
+                                       pre_filter: dict | None = None, **search_params) -> NeighborBatchData:
+        """Batched nearest neighbor search through the attached local vector_index, see _index_nearest_neighbors."""
+        distance = self._resolve_distance(distance)
+        self._validate_nn_query(k, distance, None, pre_filter)
+        if self.vector_index is None:
+            raise ValueError(
+                f"Error: {type(self).__name__} has no vector_index attached for nearest neighbor search.")
+        if not self.vector_index.is_built:
+            self.vector_index.build(self)
+        elif self.vector_index.is_stale:
+            # writes applied to the index by an earlier process were not saved
+            self.vector_index.refresh(self)
+        node_uids = self._filter_node_uids(pre_filter) if pre_filter else None
+        uids, dists = self.vector_index.search_batch(queries, k=k, metric=distance, node_uids=node_uids,
+                                                     kg=self, **search_params)
+        return NeighborBatchData(node_uids=uids, distances=dists)
+
+    def get_nearest_communities(self, query_vec, k: int = 10, distance: str = "euclidean",
+                                min_rating: int | None = None) -> List[CommunityNeighborData]:
+        """Returns the k communities with the community_embedding nearest to query_vec, nearest first.
+
+        Results carry the title, summary, rating and community_uid of the community, so
+        no get_community call is needed per result. min_rating skips communities rated
+        lower or not rated at all. Communities without an embedding of the query
+        dimension are skipped. The default scores the community embeddings locally.
+        """
+        from base.vectors import nearest
+
+        self._validate_nn_query(k, distance, None, None)
+        query_vec = np.asarray(query_vec, dtype=np.float32)
+        records = {record["title"]: record for record in self._community_records(min_rating)
+                   if len(record.get("community_embedding") or ()) == len(query_vec)}
+        if not records:
+            return []
+        matrix = np.array([record["community_embedding"] for record in records.values()], dtype=np.float32)
+        return [self._community_neighbor(records[title], dist)
+                for title, dist in nearest(list(records), matrix, query_vec, k, distance)]
+
+    def _community_records(self, min_rating: int | None) -> List[dict]:
+        """Returns title, summary, rating, community_uid and community_embedding of the communities rated at least min_rating.
+
+        The default reads list_communities, backends override it with a projected query.
+        """
+        return [community.__to_dict__() for community in self.list_communities()
+                if min_rating is None or (community.rating is not None and community.rating >= min_rating)]
+
+    @staticmethod
+    def _community_neighbor(record: dict, dist: float) -> CommunityNeighborData:
+        """Builds the CommunityNeighborData of a community record."""
+        return CommunityNeighborData(title=record["title"], distance=dist, summary=record.get("summary"),
+                                     rating=record.get("rating"), community_uid=record.get("community_uid"))
 
     @abstractmethod
     def get_community(self, community_id: str) -> CommunityData:
@@ -107,7 +827,7 @@ class NoSQLKnowledgeGraph(ABC):
         Args:
             graph (nx.Graph): The graph to visualize.
         """
-        self.build_networkx()
+        self.refresh_networkx()
 
         if self.networkx is not None:
             # Create a larger figure for better visualization
@@ -169,7 +889,7 @@ class NoSQLKnowledgeGraph(ABC):
         {'"ANDREI SAKHAROV"'}]
         """
         # 1. Build (or update) the NetworkX graph
-        self.build_networkx()
+        self.refresh_networkx()
 
         # 2. Apply Louvain algorithm
         if self.networkx is not None:
@@ -191,7 +911,7 @@ class NoSQLKnowledgeGraph(ABC):
         """Generate node embeddings using Node2Vec."""
 
         # update networkx representation of graph
-        self.build_networkx()
+        self.refresh_networkx()
 
         # generate embedding
         lcc_tensors = gc.embed.node2vec_embed(  # type: ignore
@@ -206,5 +926,100 @@ class NoSQLKnowledgeGraph(ABC):
         return NodeEmbeddings(embeddings=lcc_tensors[0], nodes=lcc_tensors[1])
 
 
+class KGSession:
+    """
+    Unit of work for multi-step graph mutations, created with NoSQLKnowledgeGraph.session().
+
+    Node and edge writes are buffered and repeated writes to the same node or edge are
+    merged. commit() writes everything at once, as a single batch or transaction where
+    the backend supports it. Firestore batches are limited to 500 writes, larger sessions
+    are committed atomically per 500 writes. Reads see the buffered writes of the session.
+    """
+
+    def __init__(self, kg: NoSQLKnowledgeGraph) -> None:
+        self.kg = kg
+        self._nodes: dict[str, NodeData] = {}  # nodes added in this session
+        self._updates: dict[str, NodeData] = {}  # existing nodes updated in this session
+        self._edges: dict[tuple[str, str], EdgeData] = {}  # edges added in this session
+        self._reads: dict[str, NodeData] = {}  # existing nodes read in this session
+
+    def __enter__(self) -> "KGSession":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def add_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Buffers adding a node."""
+        if node_data.edges_to or node_data.edges_from:
+            raise ValueError(
+                f"""Error: NodeData cannot be initiated with edges_to or edges_from. Please add edges separately.""")
+        if node_uid in self._nodes or node_uid in self._updates or node_uid in self._reads:
+            raise ValueError(f"Error: Node with node_uid '{node_uid}' already exists.")
+        self._nodes[node_uid] = dataclasses.replace(node_data)
+
+    def update_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Buffers updating a node, replacing earlier updates of the same node."""
+        if node_uid in self._nodes:
+            self._nodes[node_uid] = dataclasses.replace(node_data)
+        else:
+            self._updates[node_uid] = dataclasses.replace(node_data)
+
+    def add_edge(self, edge_data: EdgeData) -> None:
+        """Buffers adding an edge, replacing earlier writes of the same edge."""
+        if not isinstance(edge_data, EdgeData):
+            raise TypeError(
+                f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+        self._edges[(edge_data.source_uid, edge_data.target_uid)] = edge_data
+
+    def get_node(self, node_uid: str) -> NodeData:
+        """Retrieves a node including the buffered writes of this session.
+
+        Nodes read from the database are kept for the rest of the session.
+        """
+        node_data = self._nodes.get(node_uid) or self._updates.get(node_uid)
+        if node_data is None:
+            if node_uid not in self._reads:
+                self._reads[node_uid] = self.kg.get_node(node_uid)
+            node_data = self._reads[node_uid]
+
+        delta = self.kg._adjacency_deltas(list(self._edges.values())).get(node_uid)
+        edges_to, edges_from = list(node_data.edges_to), list(node_data.edges_from)
+        if delta:
+            edges_to += [uid for uid in sorted(delta["edges_to"]) if uid not in edges_to]
+            edges_from += [uid for uid in sorted(delta["edges_from"]) if uid not in edges_from]
+        return dataclasses.replace(node_data, edges_to=edges_to, edges_from=edges_from)
+
+    def commit(self) -> None:
+        """Writes the buffered writes to the knowledge graph and clears the session.
+
+        Updated nodes and edge endpoints that were not read or added in this session
+        are checked for existence with one batched read first.
+        """
+        if not (self._nodes or self._updates or self._edges):
+            return
+
+        endpoint_uids = {uid for source_uid, target_uid in self._edges for uid in (source_uid, target_uid)}
+        unverified = (endpoint_uids | set(self._updates)) - set(self._nodes) - set(self._reads)
+        if unverified:
+            missing = unverified - set(self.kg._get_adjacency(list(unverified)))
+            if missing:
+                raise KeyError(f"Error: Nodes with node_uid {sorted(missing)} do not exist.")
+
+        self.kg._commit_session(list(self._nodes.values()), dict(self._updates), list(self._edges.values()))
+        self.kg._index_nodes([*self._nodes.values(), *self._updates.values()])
+        self.rollback()
+
+    def rollback(self) -> None:
+        """Discards the buffered writes and reads of the session."""
+        self._nodes.clear()
+        self._updates.clear()
+        self._edges.clear()
+        self._reads.clear()
+
+
 if __name__ == "__main__":
     print("Hello World!")
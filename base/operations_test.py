@@ -1,19 +1,31 @@
 """graph2nosql database operations unittests"""
 
+import dataclasses
 import unittest
 from abc import ABC, abstractmethod
 
 import os
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import dotenv
 from dotenv import dotenv_values
 
+import numpy as np
 import networkx as nx  # type: ignore
+from google.cloud.firestore_v1.vector import Vector
 
 from base.operations import NoSQLKnowledgeGraph
+from base.cache import CachedKG, LRUCache
+from base.codec import EmbeddingCodec
+from base.vectors import VectorIndex, IVFIndex, nearest_batch
+from base.quantization import QuantizedIndex
 from databases.firestore_kg import FirestoreKG
 from databases.n4j import AuraKG
 from databases.mdb import MongoKG
-from datamodel.data_model import NodeData, EdgeData
+from databases.inmemory_kg import InMemoryKG
+from databases.sqlite_kg import SQLiteKG
+from datamodel.data_model import NodeData, EdgeData, CommunityData
 
 
 class _NoSQLKnowledgeGraphTests(ABC):
@@ -59,6 +71,193 @@ class _NoSQLKnowledgeGraphTests(ABC):
         with self.assertRaises(KeyError):  # type: ignore
             self.kg.get_node(node_uid="added_test_node_1")
 
+    def test_add_nodes(self):
+        """Test adding nodes in bulk with per node results"""
+        nodes = [
+            NodeData(
+                node_uid=f"test_bulk_node_{i}",
+                node_title=f"Test Node {i}",
+                node_type="Person",
+                node_description="This is a bulk test node",
+                node_degree=0,
+                document_id="doc_1",
+                edges_to=[],
+                edges_from=[],
+                embedding=[0.1, 0.2, 0.3],
+            ) for i in range(5)
+        ]
+        invalid_node = NodeData(
+            node_uid="test_bulk_node_invalid",
+            node_title="Invalid Test Node",
+            node_type="Person",
+            node_description="This node comes with edges",
+            node_degree=0,
+            document_id="doc_1",
+            edges_to=["test_bulk_node_0"],
+            edges_from=[],
+            embedding=[0.1, 0.2, 0.3],
+        )
+
+        result = self.kg.add_nodes(nodes + [invalid_node], batch_size=2)
+
+        self.assertEqual(sorted(result.succeeded),  # type: ignore
+                         sorted(n.node_uid for n in nodes))
+        self.assertIn("test_bulk_node_invalid", result.failed)  # type: ignore
+        for node_data in nodes:
+            self.assertEqual(self.kg.get_node(node_data.node_uid), node_data)  # type: ignore
+
+        # Adding the same nodes again reports every node as failed
+        result = self.kg.add_nodes(nodes[:2])
+        self.assertEqual(result.succeeded, [])  # type: ignore
+        self.assertEqual(sorted(result.failed),  # type: ignore
+                         ["test_bulk_node_0", "test_bulk_node_1"])
+
+        # Clean up
+        for node_data in nodes:
+            self.kg.remove_node(node_uid=node_data.node_uid)
+
+    def test_get_nodes(self):
+        """Test retrieving nodes in batch with separate reporting of missing uids"""
+        nodes = [
+            NodeData(
+                node_uid=f"test_batch_get_node_{i}",
+                node_title=f"Test Node {i}",
+                node_type="Person",
+                node_description="This is a batch get test node",
+                node_degree=0,
+                document_id="doc_1",
+                edges_to=[],
+                edges_from=[],
+                embedding=[0.1, 0.2, 0.3],
+            ) for i in range(3)
+        ]
+        for node_data in nodes:
+            self.kg.add_node(node_uid=node_data.node_uid, node_data=node_data)
+
+        requested = [n.node_uid for n in nodes] + ["test_batch_get_node_missing"]
+        result = self.kg.get_nodes(requested, chunk_size=2)
+
+        self.assertEqual(list(result.found), [n.node_uid for n in nodes])  # type: ignore
+        for node_data in nodes:
+            self.assertEqual(result.found[node_data.node_uid], node_data)  # type: ignore
+        self.assertEqual(result.missing, ["test_batch_get_node_missing"])  # type: ignore
+
+        # Clean up
+        for node_data in nodes:
+            self.kg.remove_node(node_uid=node_data.node_uid)
+
+    def test_get_k_hop_neighborhood(self):
+        """Test k-hop traversal counts and uids per hop, direction and limit"""
+        # a -> b -> c -> d, b <-> e undirected
+        node_uids = [f"test_k_hop_node_{c}" for c in "abcde"]
+        for node_uid in node_uids:
+            self.kg.add_node(node_uid=node_uid, node_data=NodeData(
+                node_uid=node_uid,
+                node_title="Test Node",
+                node_type="Person",
+                node_description="This is a k-hop test node",
+                node_degree=0,
+                document_id="doc_1",
+                edges_to=[],
+                edges_from=[],
+                embedding=[0.1, 0.2, 0.3],
+            ))
+        a, b, c, d, e = node_uids
+        self.kg.add_edges([
+            EdgeData(source_uid=a, target_uid=b, description="test edge"),
+            EdgeData(source_uid=b, target_uid=c, description="test edge"),
+            EdgeData(source_uid=c, target_uid=d, description="test edge"),
+            EdgeData(source_uid=b, target_uid=e, description="test edge", directed=False),
+        ])
+
+        result = self.kg.get_k_hop_neighborhood(a, k=3, direction="out", return_uids=True)
+        self.assertEqual(result.hop_counts, [1, 2, 1])  # type: ignore
+        self.assertEqual([sorted(hop) for hop in result.hop_uids], [[b], [c, e], [d]])  # type: ignore
+        self.assertFalse(result.truncated)  # type: ignore
+
+        result = self.kg.get_k_hop_neighborhood(a, k=2, direction="out")
+        self.assertEqual(result.hop_counts, [1, 2])  # type: ignore
+        self.assertIsNone(result.hop_uids)  # type: ignore
+
+        result = self.kg.get_k_hop_neighborhood(d, k=3, direction="in", return_uids=True)
+        self.assertEqual([sorted(hop) for hop in result.hop_uids], [[c], [b], [a, e]])  # type: ignore
+
+        result = self.kg.get_k_hop_neighborhood(c, k=1, direction="both", return_uids=True)
+        self.assertEqual(sorted(result.hop_uids[0]), [b, d])  # type: ignore
+
+        result = self.kg.get_k_hop_neighborhood(a, k=3, direction="out", limit=2)
+        self.assertEqual(sum(result.hop_counts), 2)  # type: ignore
+        self.assertTrue(result.truncated)  # type: ignore
+
+        with self.assertRaises(KeyError):  # type: ignore
+            self.kg.get_k_hop_neighborhood("test_k_hop_node_missing", k=2)
+        with self.assertRaises(ValueError):  # type: ignore
+            self.kg.get_k_hop_neighborhood(a, k=2, direction="sideways")
+
+        # Clean up
+        for node_uid in node_uids:
+            self.kg.remove_node(node_uid=node_uid)
+
+    def test_session(self):
+        """Test that a session buffers and merges writes and commits them at exit"""
+        node_uids = [f"test_session_node_{i}" for i in range(3)]
+        self.kg.add_node(node_uid=node_uids[0], node_data=NodeData(
+            node_uid=node_uids[0],
+            node_title="Test Node 0",
+            node_type="Person",
+            node_description="This is a session test node",
+            node_degree=0,
+            document_id="doc_1",
+        ))
+
+        with self.kg.session() as session:
+            for node_uid in node_uids[1:]:
+                session.add_node(node_uid=node_uid, node_data=NodeData(
+                    node_uid=node_uid,
+                    node_title="Test Node",
+                    node_type="Person",
+                    node_description="This is a session test node",
+                    node_degree=0,
+                    document_id="doc_1",
+                ))
+            session.add_edge(EdgeData(source_uid=node_uids[0], target_uid=node_uids[1],
+                                      description="test edge"))
+            session.add_edge(EdgeData(source_uid=node_uids[1], target_uid=node_uids[2],
+                                      description="test edge", directed=False))
+
+            # reads see the buffered writes, the database does not
+            node_data = session.get_node(node_uids[0])
+            self.assertEqual(node_data.edges_to, [node_uids[1]])  # type: ignore
+            self.assertFalse(self.kg.node_exist(node_uids[1]))  # type: ignore
+
+            node_data.node_description = "First update"
+            session.update_node(node_uids[0], node_data)
+            node_data.node_description = "Second update"
+            session.update_node(node_uids[0], node_data)
+
+        self.assertEqual(self.kg.get_node(node_uids[0]).node_description, "Second update")  # type: ignore
+        self.assertEqual(self.kg.get_node(node_uids[0]).edges_to, [node_uids[1]])  # type: ignore
+        self.assertEqual(sorted(self.kg.get_node(node_uids[1]).edges_to), [node_uids[2]])  # type: ignore
+        self.assertEqual(sorted(self.kg.get_node(node_uids[1]).edges_from), [node_uids[0], node_uids[2]])  # type: ignore
+        self.assertTrue(self.kg.edge_exist(node_uids[2], node_uids[1]))  # type: ignore
+
+        # a failing block discards the buffered writes
+        with self.assertRaises(RuntimeError):  # type: ignore
+            with self.kg.session() as session:
+                session.add_edge(EdgeData(source_uid=node_uids[2], target_uid=node_uids[0],
+                                          description="test edge"))
+                raise RuntimeError("abort")
+        self.assertFalse(self.kg.edge_exist(node_uids[2], node_uids[0]))  # type: ignore
+
+        with self.assertRaises(KeyError):  # type: ignore
+            with self.kg.session() as session:
+                session.add_edge(EdgeData(source_uid=node_uids[0], target_uid="test_session_node_missing",
+                                          description="test edge"))
+
+        # Clean up
+        for node_uid in node_uids:
+            self.kg.remove_node(node_uid=node_uid)
+
     def test_update_node(self):
         """Add a node"""
         node_data = NodeData(
@@ -309,6 +508,62 @@ class _NoSQLKnowledgeGraphTests(ABC):
         self.kg.remove_node(node_uid="test_undirected_node_1")
         self.kg.remove_node(node_uid="test_undirected_node_2")
 
+    def test_add_edges(self):
+        """Test adding edges in bulk with per edge results."""
+        for i in range(1, 4):
+            self.kg.add_node(node_uid=f"test_bulkedge_node_{i}", node_data=NodeData(
+                node_uid=f"test_bulkedge_node_{i}",
+                node_title=f"Test Node {i}",
+                node_type="Person",
+                node_description="This is a test node",
+                node_degree=0,
+                document_id="doc_1",
+                edges_to=[],
+                edges_from=[],
+                embedding=[0.1, 0.2, 0.3],
+            ))
+
+        edges = [
+            EdgeData(source_uid="test_bulkedge_node_1",
+                     target_uid="test_bulkedge_node_2",
+                     description="This is a directed test egde",
+                     directed=True),
+            EdgeData(source_uid="test_bulkedge_node_3",
+                     target_uid="test_bulkedge_node_2",
+                     description="This is an undirected test egde",
+                     directed=False),
+            EdgeData(source_uid="test_bulkedge_node_1",
+                     target_uid="test_bulkedge_fake_node",
+                     description="This egde points to a missing node",
+                     directed=True),
+        ]
+        result = self.kg.add_edges(edges, batch_size=2)
+
+        self.assertEqual(sorted(result.succeeded), sorted([  # type: ignore
+            self.kg._generate_edge_uid("test_bulkedge_node_1", "test_bulkedge_node_2"),
+            self.kg._generate_edge_uid("test_bulkedge_node_3", "test_bulkedge_node_2")]))
+        self.assertEqual(list(result.failed), [  # type: ignore
+            self.kg._generate_edge_uid("test_bulkedge_node_1", "test_bulkedge_fake_node")])
+
+        node1 = self.kg.get_node("test_bulkedge_node_1")
+        node2 = self.kg.get_node("test_bulkedge_node_2")
+        node3 = self.kg.get_node("test_bulkedge_node_3")
+        self.assertEqual(node1.edges_to, ["test_bulkedge_node_2"])  # type: ignore
+        self.assertEqual(sorted(node2.edges_from), [  # type: ignore
+            "test_bulkedge_node_1", "test_bulkedge_node_3"])
+        self.assertEqual(node2.edges_to, ["test_bulkedge_node_3"])  # type: ignore
+        self.assertEqual(node3.edges_from, ["test_bulkedge_node_2"])  # type: ignore
+        self.assertEqual(self.kg.get_edge("test_bulkedge_node_3", "test_bulkedge_node_2").description,  # type: ignore
+                         "This is an undirected test egde")
+
+        # Clean up
+        self.kg.remove_edge(source_uid="test_bulkedge_node_1",
+                            target_uid="test_bulkedge_node_2")
+        self.kg.remove_edge(source_uid="test_bulkedge_node_3",
+                            target_uid="test_bulkedge_node_2")
+        for i in range(1, 4):
+            self.kg.remove_node(node_uid=f"test_bulkedge_node_{i}")
+
     def test_get_edge(self):
         """Test retrieving an existing edge."""
         # 1. Add nodes (required for edges)
@@ -571,6 +826,97 @@ class _NoSQLKnowledgeGraphTests(ABC):
         self.kg.remove_node(node_uid="test_getnx_node_1")
         self.kg.remove_node(node_uid="test_getnx_node_2")
 
+    def test_build_networkx_attributes(self):
+        """Test loading topology only by default and further node attributes on request."""
+        node_data = NodeData(
+            node_uid="test_nxattr_node_1",
+            node_title="Test Node 1",
+            node_type="Person",
+            node_description="This is a test node",
+            node_degree=0,
+            document_id="doc_1",
+            edges_to=[],
+            edges_from=[],
+            embedding=[0.1, 0.2, 0.3],
+        )
+        self.kg.add_node(node_uid="test_nxattr_node_1", node_data=node_data)
+
+        # 1. Topology only by default
+        self.kg.build_networkx()
+        self.assertEqual(self.kg.networkx.nodes["test_nxattr_node_1"],  # type: ignore
+                         {"node_uid": "test_nxattr_node_1", "node_type": "Person"})
+
+        # 2. Requested attributes are loaded on top
+        self.kg.build_networkx(attributes=["node_description"])
+        self.assertEqual(self.kg.networkx.nodes["test_nxattr_node_1"],  # type: ignore
+                         {"node_uid": "test_nxattr_node_1", "node_type": "Person",
+                          "node_description": "This is a test node"})
+
+        # 3. Unknown attributes are rejected
+        with self.assertRaises(ValueError):  # type: ignore
+            self.kg.build_networkx(attributes=["not_a_node_field"])
+
+        # Clean up
+        self.kg.remove_node(node_uid="test_nxattr_node_1")
+
+    def test_refresh_networkx(self):
+        """Test patching the networkx graph with changes since the last sync."""
+        def _node(node_uid: str) -> NodeData:
+            return NodeData(
+                node_uid=node_uid,
+                node_title="Test Node",
+                node_type="Person",
+                node_description="This is a refresh test node",
+                node_degree=0,
+                document_id="doc_1",
+                edges_to=[],
+                edges_from=[],
+                embedding=[0.1, 0.2, 0.3],
+            )
+
+        self.kg.add_node(node_uid="test_refreshnx_node_1", node_data=_node("test_refreshnx_node_1"))
+        self.kg.add_node(node_uid="test_refreshnx_node_2", node_data=_node("test_refreshnx_node_2"))
+
+        # 1. The first refresh builds the full graph
+        self.kg.refresh_networkx()
+        self.assertTrue(self.kg.networkx.has_node("test_refreshnx_node_1"))  # type: ignore
+        self.assertIsNotNone(self.kg.networkx_synced_at)  # type: ignore
+
+        # 2. Added nodes and edges are patched in
+        self.kg.add_node(node_uid="test_refreshnx_node_3", node_data=_node("test_refreshnx_node_3"))
+        self.kg.add_edge(edge_data=EdgeData(source_uid="test_refreshnx_node_1",
+                                            target_uid="test_refreshnx_node_3",
+                                            description="Test Edge Description"))
+        self.kg.add_edge(edge_data=EdgeData(source_uid="test_refreshnx_node_1",
+                                            target_uid="test_refreshnx_node_2",
+                                            description="Test Edge Description",
+                                            directed=False))
+        self.kg.refresh_networkx()
+        self.assertTrue(self.kg.networkx.has_node("test_refreshnx_node_3"))  # type: ignore
+        self.assertTrue(self.kg.networkx.has_edge(
+            "test_refreshnx_node_1", "test_refreshnx_node_3"))  # type: ignore
+        self.assertTrue(self.kg.networkx.has_edge(
+            "test_refreshnx_node_1", "test_refreshnx_node_2"))  # type: ignore
+
+        # 3. Removed edges and nodes are patched out
+        self.kg.remove_edge(source_uid="test_refreshnx_node_1", target_uid="test_refreshnx_node_2")
+        self.kg.remove_node(node_uid="test_refreshnx_node_3")
+        self.kg.refresh_networkx()
+        self.assertFalse(self.kg.networkx.has_edge(
+            "test_refreshnx_node_1", "test_refreshnx_node_2"))  # type: ignore
+        self.assertFalse(self.kg.networkx.has_node("test_refreshnx_node_3"))  # type: ignore
+
+        # 4. The patched graph matches a full rebuild
+        patched = self.kg.networkx
+        self.kg.build_networkx()
+        self.assertEqual(set(patched.nodes), set(self.kg.networkx.nodes))  # type: ignore
+        self.assertEqual({frozenset(e) for e in patched.edges},  # type: ignore
+                         {frozenset(e) for e in self.kg.networkx.edges})
+
+        # Clean up
+        self.kg.remove_node(node_uid="test_refreshnx_node_1")
+        self.kg.remove_node(node_uid="test_refreshnx_node_2")
+
     def test_get_louvain_communities(self):
         """Test getting Louvain communities."""
         # 1. Add nodes
@@ -770,6 +1116,31 @@ class FirestoreKGTests(_NoSQLKnowledgeGraphTests, unittest.TestCase):
         fskg.flush_kg()
         return fskg
 
+    def test_embedding_codec(self):
+        """Test that float32 embeddings are stored as Vector and float16 embeddings as bytes."""
+        self.kg.embedding_codec = EmbeddingCodec("float32")
+        self.kg.add_node(node_uid="test_codec_node_1", node_data=NodeData(
+            node_uid="test_codec_node_1",
+            node_title="Test Node 1",
+            node_type="Person",
+            node_description="This is a codec test node",
+            node_degree=0,
+            document_id="doc_1",
+            embedding=[0.1, 0.2, 0.3],
+        ))
+
+        node_coll = self.kg.db.collection(self.kg.node_coll_id)  # type: ignore
+        self.assertIsInstance(node_coll.document("test_codec_node_1").get().get("embedding"), Vector)
+        embedding = self.kg.get_node("test_codec_node_1").embedding
+        self.assertIsInstance(embedding, np.ndarray)
+        np.testing.assert_array_equal(embedding, np.array([0.1, 0.2, 0.3], dtype=np.float32))
+
+        self.kg.embedding_codec = EmbeddingCodec("float16")
+        self.kg.update_node("test_codec_node_1", dataclasses.replace(
+            self.kg.get_node("test_codec_node_1"), embedding=[0.5, 0.25]))
+        self.assertIsInstance(node_coll.document("test_codec_node_1").get().get("embedding"), bytes)
+        np.testing.assert_array_equal(self.kg.get_node("test_codec_node_1").embedding, [0.5, 0.25])
+
 
 class AuraKGTest(_NoSQLKnowledgeGraphTests, unittest.TestCase):
     """
@@ -797,6 +1168,33 @@ class AuraKGTest(_NoSQLKnowledgeGraphTests, unittest.TestCase):
         # aura.flush_kg()
         return aura
 
+    def test_k_hop_relationship_types(self):
+        """Test that the traversal can be restricted to one relationship type"""
+        node_uids = [f"test_k_hop_type_node_{i}" for i in range(3)]
+        for node_uid in node_uids:
+            self.kg.add_node(node_uid=node_uid, node_data=NodeData(
+                node_uid=node_uid,
+                node_title="Test Node",
+                node_type="Person",
+                node_description="This is a k-hop test node",
+                node_degree=0,
+                document_id="doc_1",
+            ))
+        self.kg.add_edge(EdgeData(source_uid=node_uids[0], target_uid=node_uids[1],
+                                  description="test edge"))
+        self.kg.add_edge(EdgeData(source_uid=node_uids[1], target_uid=node_uids[2],
+                                  description="test edge", directed=False))
+
+        result = self.kg.get_k_hop_neighborhood(  # type: ignore
+            node_uids[0], k=2, direction="out", relationship_types=["DIRECTED"])
+        self.assertEqual(result.hop_counts, [1])  # type: ignore
+        with self.assertRaises(ValueError):  # type: ignore
+            self.kg.get_k_hop_neighborhood(node_uids[0], k=2, relationship_types=["KNOWS"])  # type: ignore
+
+        # Clean up
+        for node_uid in node_uids:
+            self.kg.remove_node(node_uid=node_uid)
+
 
 class MongoKGTest(_NoSQLKnowledgeGraphTests, unittest.TestCase):
     """
@@ -832,6 +1230,673 @@ class MongoKGTest(_NoSQLKnowledgeGraphTests, unittest.TestCase):
         mkg.flush_kg()
         return mkg
 
+    def test_ensure_indexes(self):
+        """Test that the lookup indexes exist and that ensuring them again is a no-op."""
+        self.assertEqual(self.kg.ensure_indexes(), [])  # type: ignore
+
+        node_indexes = self.kg.mdb_node_coll.index_information().values()  # type: ignore
+        self.assertIn(([("node_uid", 1)], True),  # type: ignore
+                      [(info["key"], info.get("unique", False)) for info in node_indexes])
+        edge_indexes = self.kg.mdbe_edges_coll.index_information().values()  # type: ignore
+        self.assertIn(([("edge_uid", 1)], True),  # type: ignore
+                      [(info["key"], info.get("unique", False)) for info in edge_indexes])
+
+    def test_vector_index_unstamped_node(self):
+        """Test that nodes written without an updated_at watermark are indexed and pre-filtered."""
+        self.kg.add_node(node_uid="test_vec_node_1", node_data=NodeData(
+            node_uid="test_vec_node_1",
+            node_title="Test Node",
+            node_type="Person",
+            node_description="This is a vector index test node",
+            node_degree=0,
+            document_id="doc_1",
+            embedding=[1.0, 1.0],
+        ))
+        # a node stored before change tracking was introduced
+        self.kg.mdb_node_coll.insert_one(dataclasses.asdict(NodeData(  # type: ignore
+            node_uid="test_vec_node_2",
+            node_title="Test Node",
+            node_type="Person",
+            node_description="This is an unstamped vector index test node",
+            node_degree=0,
+            document_id="doc_1",
+            embedding=[2.0, 1.0],
+        )))
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.kg.vector_index = VectorIndex(directory)
+            neighbors = self.kg.get_nearest_neighbors([2.0, 1.0], k=2)
+            self.assertEqual([n.node_uid for n in neighbors], ["test_vec_node_2", "test_vec_node_1"])
+            self.assertIn("test_vec_node_2", self.kg.vector_index)
+
+            neighbors = self.kg.get_nearest_neighbors([2.0, 1.0], k=2, pre_filter={"document_id": "doc_1"})
+            self.assertEqual([n.node_uid for n in neighbors], ["test_vec_node_2", "test_vec_node_1"])
+
+    def test_session_without_transactions(self):
+        """Test that sessions commit with plain bulk writes on deployments without transactions."""
+        self.kg._transactions = False  # type: ignore
+        self.test_session()
+
+    def test_ensure_indexes_not_unique(self):
+        """Test that add_nodes still rejects existing node_uids if the node_uid index is not unique."""
+        self.kg.mdb_node_coll.drop_indexes()  # type: ignore
+        self.kg.mdb_node_coll.create_index([("node_uid", 1)])  # type: ignore
+        self.kg.ensure_indexes()  # type: ignore
+
+        node_data = NodeData(
+            node_uid="test_node_1",
+            node_title="Test Node 1",
+            node_type="Person",
+            node_description="This is a test node",
+            node_degree=0,
+            document_id="doc_1",
+        )
+        self.kg.add_node(node_uid="test_node_1", node_data=node_data)
+        result = self.kg.add_nodes([node_data])
+
+        self.assertEqual(result.succeeded, [])
+        self.assertIn("test_node_1", result.failed)
+        self.assertEqual(self.kg.mdb_node_coll.count_documents({"node_uid": "test_node_1"}), 1)  # type: ignore
+
+
+    def test_embedding_codec(self):
+        """Test that embeddings are stored as BSON Binary vectors and read back as float32 arrays."""
+        self.kg.embedding_codec = EmbeddingCodec("float32")
+        self.kg.add_node(node_uid="test_codec_node_1", node_data=NodeData(
+            node_uid="test_codec_node_1",
+            node_title="Test Node 1",
+            node_type="Person",
+            node_description="This is a codec test node",
+            node_degree=0,
+            document_id="doc_1",
+            embedding=[0.1, 0.2, 0.3],
+        ))
+
+        stored = self.kg.mdb_node_coll.find_one({"node_uid": "test_codec_node_1"})  # type: ignore
+        self.assertEqual(len(stored["embedding"]), 2 + 3 * 4)  # vector header and packed float32
+        embedding = self.kg.get_node("test_codec_node_1").embedding
+        self.assertIsInstance(embedding, np.ndarray)
+        np.testing.assert_array_equal(embedding, np.array([0.1, 0.2, 0.3], dtype=np.float32))
+
+        self.kg.embedding_codec = EmbeddingCodec("float16")
+        self.kg.update_node("test_codec_node_1", dataclasses.replace(
+            self.kg.get_node("test_codec_node_1"), embedding=[0.5, 0.25]))
+        embedding = self.kg.get_nodes(["test_codec_node_1"]).found["test_codec_node_1"].embedding
+        self.assertEqual(embedding.dtype, np.float16)
+        np.testing.assert_array_equal(embedding, [0.5, 0.25])
+
+
+class CachedKGTest(_NoSQLKnowledgeGraphTests, unittest.TestCase):
+    """
+    Test cases for the CachedKG read-through cache around the MongoDB implementation.
+
+    Runs the common test cases through the cache to check that writes invalidate cached reads.
+    """
+
+    def create_kg_instance(self) -> NoSQLKnowledgeGraph:
+        return CachedKG(MongoKGTest.create_kg_instance(self), max_entries=100)  # type: ignore
+
+    def test_cache_hits_and_invalidation(self):
+        """Test that repeated reads are cached and updates invalidate them."""
+        node_data = NodeData(
+            node_uid="test_cache_node_1",
+            node_title="Test Node 1",
+            node_type="Person",
+            node_description="This is a test node",
+            node_degree=0,
+            document_id="doc_1",
+        )
+        self.kg.add_node(node_uid="test_cache_node_1", node_data=node_data)
+
+        self.kg.get_node(node_uid="test_cache_node_1")
+        retrieved_node_data = self.kg.get_node(node_uid="test_cache_node_1")
+        self.assertEqual(retrieved_node_data, node_data)
+        self.assertEqual((self.kg.stats.hits, self.kg.stats.misses), (1, 1))  # type: ignore
+
+        # mutating a returned node does not change the cached node
+        retrieved_node_data.node_description = "This is a mutated test node"
+        self.assertEqual(self.kg.get_node(node_uid="test_cache_node_1"), node_data)
+
+        node_data.node_description = "This is an updated test node"
+        self.kg.update_node(node_uid="test_cache_node_1", node_data=node_data)
+        self.assertEqual(self.kg.get_node(node_uid="test_cache_node_1").node_description,
+                         "This is an updated test node")
+
+        # Clean up
+        self.kg.remove_node(node_uid="test_cache_node_1")
+        with self.assertRaises(KeyError):
+            self.kg.get_node(node_uid="test_cache_node_1")
+
+    def test_invalidation_after_write(self):
+        """Test that a read caching the old node while an update is in flight does not stay cached."""
+        node_data = NodeData(
+            node_uid="test_cache_node_1",
+            node_title="Test Node 1",
+            node_type="Person",
+            node_description="This is a test node",
+            node_degree=0,
+            document_id="doc_1",
+        )
+        self.kg.add_node(node_uid="test_cache_node_1", node_data=node_data)
+
+        wrapped_kg = self.kg.kg  # type: ignore
+        update_node = wrapped_kg.update_node
+
+        def update_node_with_concurrent_read(node_uid, node_data):
+            # a concurrent reader misses the cache and caches the node before the update is applied
+            self.kg.get_node(node_uid=node_uid)
+            update_node(node_uid=node_uid, node_data=node_data)
+
+        wrapped_kg.update_node = update_node_with_concurrent_read
+        self.kg.update_node(node_uid="test_cache_node_1", node_data=dataclasses.replace(
+            node_data, node_description="This is an updated test node"))
+        self.assertEqual(self.kg.get_node(node_uid="test_cache_node_1").node_description,
+                         "This is an updated test node")
+
+    def test_read_racing_write(self):
+        """Test that a read fetching the old node before a concurrent update does not cache it."""
+        node_data = NodeData(
+            node_uid="test_cache_node_1",
+            node_title="Test Node 1",
+            node_type="Person",
+            node_description="This is a test node",
+            node_degree=0,
+            document_id="doc_1",
+        )
+        self.kg.add_node(node_uid="test_cache_node_1", node_data=node_data)
+
+        wrapped_kg = self.kg.kg  # type: ignore
+        get_node = wrapped_kg.get_node
+
+        def get_node_with_concurrent_update(node_uid):
+            # the old node is read, then a concurrent writer updates and invalidates it before the read caches it
+            old_node_data = get_node(node_uid)
+            wrapped_kg.get_node = get_node
+            self.kg.update_node(node_uid=node_uid, node_data=dataclasses.replace(
+                node_data, node_description="This is an updated test node"))
+            return old_node_data
+
+        wrapped_kg.get_node = get_node_with_concurrent_update
+        self.assertEqual(self.kg.get_node(node_uid="test_cache_node_1").node_description, "This is a test node")
+        self.assertEqual(self.kg.get_node(node_uid="test_cache_node_1").node_description,
+                         "This is an updated test node")
+
+    def test_put_generation(self):
+        """Test that put skips values read before their key was invalidated, and drops oversize values."""
+        cache = LRUCache(max_entries=10, max_bytes=4096)
+        edge_data = EdgeData(source_uid="source", target_uid="target", description="test edge")
+        generation = cache.generation()
+        cache.invalidate(["edge"])
+        cache.put("edge", edge_data, generation)
+        self.assertIsNone(cache.get("edge"))
+        cache.put("edge", edge_data, cache.generation())
+        self.assertIsNotNone(cache.get("edge"))
+
+        # an oversize value replacing a cached one drops the cached one
+        cache.put("edge", dataclasses.replace(edge_data, description="x" * 8192))
+        self.assertIsNone(cache.get("edge"))
+
+    def test_size_of_decoded_embeddings(self):
+        """Test that max_bytes accounts for embeddings decoded as views over the fetched bytes."""
+        cache = LRUCache(max_entries=10, max_bytes=4096)
+        for i in range(2):
+            cache.put(i, NodeData(
+                node_uid=f"test_cache_node_{i}",
+                node_title="Test Node",
+                node_type="Person",
+                node_description="This is a test node",
+                node_degree=0,
+                document_id="doc_1",
+                embedding=EmbeddingCodec("float32").decode(np.ones(768, dtype=np.float32).tobytes()),
+            ))
+        self.assertGreater(cache.size_bytes, 768 * 4)
+        self.assertIsNone(cache.get(0))
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries are evicted beyond max_entries."""
+        cache = LRUCache(max_entries=2, ttl=60)
+        for i in range(3):
+            cache.put(i, EdgeData(source_uid=str(i), target_uid="target", description="test edge"))
+        self.assertIsNone(cache.get(0))
+        self.assertIsNotNone(cache.get(2))
+        self.assertEqual(cache.stats.evictions, 1)
+
+
+class InMemoryKGTest(_NoSQLKnowledgeGraphTests, unittest.TestCase):
+    """
+    Test cases for the InMemoryKG implementation of NoSQLKnowledgeGraph.
+
+    Runs the common test cases without a database connection.
+    """
+
+    def create_kg_instance(self) -> NoSQLKnowledgeGraph:
+        return InMemoryKG()
+
+    def test_communities(self):
+        """Test storing, retrieving and listing communities."""
+        community = CommunityData(title="test_community_1",
+                                  community_nodes={"test_node_1", "test_node_2"},
+                                  summary="This is a test community")
+        self.kg.store_community(community)
+
+        self.assertEqual(self.kg.get_community("test_community_1"), community)
+        self.assertEqual(self.kg.list_communities(), [community])
+        with self.assertRaises(KeyError):
+            self.kg.get_community("test_community_missing")
+
+    def test_vector_index_reopened_after_writes(self):
+        """Test that an index reopened after unsaved incremental writes is refreshed before search."""
+        def _node(node_uid: str, embedding: list[float]) -> NodeData:
+            return NodeData(node_uid=node_uid, node_title="Test Node", node_type="Person",
+                            node_description="This is a vector index test node", node_degree=0,
+                            document_id="doc_1", embedding=embedding)
+
+        self.kg.add_node("test_vec_node_a", _node("test_vec_node_a", [1.0, 0.0]))
+        self.kg.add_node("test_vec_node_b", _node("test_vec_node_b", [0.0, 1.0]))
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.kg.vector_index = VectorIndex(directory)
+            self.kg.get_nearest_neighbors([1.0, 0.0], k=1, distance="cosine")
+            # the row of the removed node is reused by the added node, neither is saved
+            self.kg.remove_node("test_vec_node_a")
+            self.kg.add_node("test_vec_node_c", _node("test_vec_node_c", [1.0, 1.0]))
+
+            self.kg.vector_index = VectorIndex(directory)
+            self.assertTrue(self.kg.vector_index.is_stale)
+            neighbors = self.kg.get_nearest_neighbors([1.0, 0.0], k=2, distance="cosine")
+            self.assertEqual([n.node_uid for n in neighbors], ["test_vec_node_c", "test_vec_node_b"])
+            self.assertFalse(self.kg.vector_index.is_stale)
+            self.assertFalse(VectorIndex(directory).is_stale)
+
+    def test_ndarray_embedding(self):
+        """Test that nodes with np.ndarray embeddings are stored and read back."""
+        self.kg.add_node(node_uid="test_node_1", node_data=NodeData(
+            node_uid="test_node_1",
+            node_title="Test Node 1",
+            node_type="Person",
+            node_description="This is a test node",
+            node_degree=0,
+            document_id="doc_1",
+            embedding=np.ones(4, dtype=np.float32),
+        ))
+
+        np.testing.assert_array_equal(self.kg.get_node("test_node_1").embedding, np.ones(4))
+        np.testing.assert_array_equal(self.kg.get_nodes(["test_node_1"]).found["test_node_1"].embedding,
+                                      np.ones(4))
+
+    def test_get_nearest_neighbors(self):
+        """Test brute-force nearest neighbor search over node embeddings."""
+        for i in range(3):
+            self.kg.add_node(node_uid=f"test_nn_node_{i}", node_data=NodeData(
+                node_uid=f"test_nn_node_{i}",
+                node_title="Test Node",
+                node_type="Person" if i < 2 else "Event",
+                node_description="This is a nearest neighbor test node",
+                node_degree=0,
+                document_id="doc_1",
+                embedding=[float(i), 0.0, 0.0],
+            ))
+
+        neighbors = self.kg.get_nearest_neighbors([1.9, 0.0, 0.0])
+        self.assertEqual([n.node_uid for n in neighbors],
+                         ["test_nn_node_2", "test_nn_node_1", "test_nn_node_0"])
+        self.assertAlmostEqual(neighbors[0].distance, 0.1, places=5)
+        self.assertEqual(neighbors[0].fields, {})
+
+        neighbors = self.kg.get_nearest_neighbors([1.9, 0.0, 0.0], k=1, fields=["node_type"],
+                                                  pre_filter={"node_type": "Person"})
+        self.assertEqual([(n.node_uid, n.fields) for n in neighbors],
+                         [("test_nn_node_1", {"node_type": "Person"})])
+
+        neighbors = self.kg.get_nearest_neighbors([1.0, 0.0, 0.0], k=2, distance="dot")
+        self.assertEqual([n.node_uid for n in neighbors], ["test_nn_node_2", "test_nn_node_1"])
+        with self.assertRaises(ValueError):
+            self.kg.get_nearest_neighbors([1.0, 0.0, 0.0], pre_filter={"node_description": "test"})
+
+    def test_get_nearest_neighbors_batch(self):
+        """Test batched nearest neighbor search against single query search."""
+        for i in range(5):
+            self.kg.add_node(node_uid=f"test_nn_batch_node_{i}", node_data=NodeData(
+                node_uid=f"test_nn_batch_node_{i}",
+                node_title="Test Node",
+                node_type="Person",
+                node_description="This is a batched nearest neighbor test node",
+                node_degree=0,
+                document_id="doc_1",
+                embedding=[float(i), 1.0],
+            ))
+
+        queries = np.array([[0.9, 1.0], [3.2, 1.0], [9.0, 1.0]], dtype=np.float32)
+        batch = self.kg.get_nearest_neighbors_batch(queries, k=2)
+        self.assertEqual(batch.node_uids.shape, (3, 2))
+        for query, node_uids, distances in zip(queries, batch.node_uids, batch.distances):
+            neighbors = self.kg.get_nearest_neighbors(query.tolist(), k=2)
+            self.assertEqual(list(node_uids), [n.node_uid for n in neighbors])
+            np.testing.assert_allclose(distances, [n.distance for n in neighbors], rtol=1e-5)
+
+        # fewer matching nodes than k leave empty slots
+        batch = self.kg.get_nearest_neighbors_batch(queries[:1], k=7)
+        self.assertEqual(list(batch.node_uids[0, 5:]), [None, None])
+        self.assertTrue(np.isinf(batch.distances[0, 5:]).all())
+
+    def test_get_nearest_communities(self):
+        """Test community vector search with a rating filter."""
+        for i in range(3):
+            self.kg.store_community(CommunityData(title=f"test_nn_community_{i}",
+                                                  summary=f"This is test community {i}",
+                                                  community_uid=str(i),
+                                                  community_embedding=(float(i), 1.0),
+                                                  rating=i))
+        self.kg.store_community(CommunityData(title="test_nn_community_unembedded", rating=5))
+
+        communities = self.kg.get_nearest_communities([1.9, 1.0], k=2)
+        self.assertEqual([c.title for c in communities], ["test_nn_community_2", "test_nn_community_1"])
+        self.assertEqual((communities[0].summary, communities[0].rating, communities[0].community_uid),
+                         ("This is test community 2", 2, "2"))
+        self.assertAlmostEqual(communities[0].distance, 0.1, places=4)
+
+        communities = self.kg.get_nearest_communities([0.0, 1.0], k=3, min_rating=1)
+        self.assertEqual([c.title for c in communities], ["test_nn_community_1", "test_nn_community_2"])
+        with self.assertRaises(ValueError):
+            self.kg.get_nearest_communities([0.0, 1.0], distance="manhattan")
+
+    def test_retrieve_context(self):
+        """Test the retrieval of the subgraph around the nearest neighbors of a query vector."""
+        # chain 0 - 1 - 2 - 3 - 4 with embeddings along one axis, 2 -> 0 closes a cycle
+        for i in range(5):
+            self.kg.add_node(node_uid=f"test_ctx_node_{i}", node_data=NodeData(
+                node_uid=f"test_ctx_node_{i}",
+                node_title="Test Node",
+                node_type="Person",
+                node_description="This is a context retrieval test node",
+                node_degree=0,
+                document_id="doc_1",
+                embedding=[float(i), 0.0],
+            ))
+        self.kg.add_edges([EdgeData(source_uid=f"test_ctx_node_{i}", target_uid=f"test_ctx_node_{i + 1}",
+                                    description=f"edge {i}", directed=False) for i in range(4)]
+                          + [EdgeData(source_uid="test_ctx_node_2", target_uid="test_ctx_node_0",
+                                      description="cycle edge", directed=True)])
+
+        context = self.kg.retrieve_context([0.1, 0.0], k_seeds=2, hops=1)
+        self.assertEqual([seed.node_uid for seed in context.seeds], ["test_ctx_node_0", "test_ctx_node_1"])
+        self.assertEqual(list(context.nodes), ["test_ctx_node_0", "test_ctx_node_1", "test_ctx_node_2"])
+        self.assertEqual(context.hop_uids, [["test_ctx_node_2"]])
+        self.assertEqual(sorted(e.description for e in context.edges), ["cycle edge", "edge 0", "edge 1"])
+        self.assertFalse(context.truncated)
+
+        context = self.kg.retrieve_context([0.1, 0.0], k_seeds=1, hops=3, max_nodes=3)
+        self.assertEqual(len(context.nodes), 3)
+        self.assertTrue(context.truncated)
+
+        context = self.kg.retrieve_context([0.1, 0.0], k_seeds=1, hops=0)
+        self.assertEqual((list(context.nodes), context.edges), (["test_ctx_node_0"], []))
+        with self.assertRaises(ValueError):
+            self.kg.retrieve_context([0.1, 0.0], hops=-1)
+
+    def test_vector_index(self):
+        """Test exact search, incremental refresh and reloading of the memory mapped VectorIndex."""
+        for i in range(1, 4):
+            self.kg.add_node(node_uid=f"test_vec_node_{i}", node_data=NodeData(
+                node_uid=f"test_vec_node_{i}",
+                node_title="Test Node",
+                node_type="Person",
+                node_description="This is a vector index test node",
+                node_degree=0,
+                document_id="doc_1",
+                embedding=[float(i), 1.0],
+            ))
+
+        with tempfile.TemporaryDirectory() as directory:
+            index = VectorIndex(directory, block_rows=2)
+            index.build(self.kg)
+            self.assertEqual([uid for uid, _ in index.search([2.1, 1.0], k=2, metric="euclidean")],
+                             ["test_vec_node_2", "test_vec_node_3"])
+            self.assertEqual(index.search([1.0, 0.0], k=1, metric="dot")[0][0], "test_vec_node_3")
+            self.assertEqual(index.search([1.0, 1.0], k=1)[0][0], "test_vec_node_1")
+
+            self.kg.remove_node("test_vec_node_3")
+            self.kg.update_node("test_vec_node_1", dataclasses.replace(
+                self.kg.get_node("test_vec_node_1"), embedding=[10.0, 1.0]))
+            index.refresh(self.kg)
+            self.assertEqual([uid for uid, _ in index.search([9.0, 1.0], k=5, metric="euclidean")],
+                             ["test_vec_node_1", "test_vec_node_2"])
+
+            reloaded = VectorIndex(directory)
+            self.assertEqual(len(reloaded), 2)
+            self.assertEqual(reloaded.search([9.0, 1.0], k=1, metric="euclidean"),
+                             index.search([9.0, 1.0], k=1, metric="euclidean"))
+
+    def test_ivf_index(self):
+        """Test the attached IVFIndex following node writes and persisting its lists."""
+        def _node(node_uid: str, embedding: list[float]) -> NodeData:
+            return NodeData(node_uid=node_uid, node_title="Test Node", node_type="Person",
+                            node_description="This is an ivf index test node", node_degree=0,
+                            document_id="doc_1", embedding=embedding)
+
+        self.kg.add_nodes([_node(f"test_ivf_node_{i}", [float(i), float(i % 7), 1.0]) for i in range(50)])
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.kg.vector_index = IVFIndex(directory, metric="euclidean", nlist=5, nprobe=5)
+            neighbors = self.kg.get_nearest_neighbors([20.1, 6.0, 1.0])
+            self.assertEqual(neighbors[0].node_uid, "test_ivf_node_20")
+            batch = self.kg.get_nearest_neighbors_batch(np.array([[20.1, 6.0, 1.0], [3.0, 3.0, 1.0]]), k=1)
+            self.assertEqual(list(batch.node_uids[:, 0]), ["test_ivf_node_20", "test_ivf_node_3"])
+
+            # writes through the graph are applied to the index without a refresh
+            self.kg.add_node("test_ivf_node_new", _node("test_ivf_node_new", [20.0, 6.0, 1.0]))
+            self.kg.remove_node("test_ivf_node_20")
+            self.assertEqual(self.kg.vector_index.search([20.1, 6.0, 1.0], k=1)[0][0], "test_ivf_node_new")
+            self.assertNotIn("test_ivf_node_20", self.kg.vector_index)
+
+            self.kg.vector_index.save()
+            reloaded = IVFIndex(directory, metric="euclidean", nprobe=5)
+            self.assertEqual(len(reloaded), 50)
+            self.assertEqual(reloaded.search([40.0, 5.0, 1.0], k=3),
+                             self.kg.vector_index.search([40.0, 5.0, 1.0], k=3))
+            self.assertLess(len(reloaded.search([40.0, 5.0, 1.0], k=50, nprobe=1)), 50)
+
+            # the lists are trained for euclidean distance, exact scoring of node_uids takes any metric
+            with self.assertRaises(ValueError):
+                reloaded.search([40.0, 5.0, 1.0], k=3, metric="cosine")
+            self.assertEqual(reloaded.search([40.0, 5.0, 1.0], k=1, metric="cosine",
+                                             node_uids=["test_ivf_node_40"])[0][0], "test_ivf_node_40")
+
+    def test_ivf_index_default_distance(self):
+        """Test nearest neighbor searches without distance using the metric of the attached index."""
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(60, 4)).astype(np.float32)
+        self.kg.add_nodes([NodeData(node_uid=f"test_ivf_node_{i}", node_title="Test Node", node_type="Person",
+                                    node_description="This is an ivf index test node", node_degree=0,
+                                    document_id="doc_1", embedding=embedding.tolist())
+                           for i, embedding in enumerate(embeddings)])
+        query = embeddings[7] * 3.0
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.kg.vector_index = IVFIndex(directory, nlist=4, nprobe=4)
+            neighbors = self.kg.get_nearest_neighbors(query, k=2)
+            self.assertEqual(neighbors[0].node_uid, "test_ivf_node_7")
+            self.assertAlmostEqual(neighbors[0].distance, 0.0, places=5)
+            batch = self.kg.get_nearest_neighbors_batch(np.array([query]), k=2)
+            self.assertEqual(list(batch.node_uids[0]), [n.node_uid for n in neighbors])
+            context = self.kg.retrieve_context(query, k_seeds=2, hops=0)
+            self.assertEqual([seed.node_uid for seed in context.seeds], [n.node_uid for n in neighbors])
+            with self.assertRaises(ValueError):
+                self.kg.get_nearest_neighbors(query, k=2, distance="euclidean")
+
+
+    def test_quantized_index(self):
+        """Test int8 and product quantized search against exact search, with and without re-ranking."""
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(300, 16)).astype(np.float32)
+        self.kg.add_nodes([NodeData(node_uid=f"test_pq_node_{i}", node_title="Test Node", node_type="Person",
+                                    node_description="This is a quantized index test node", node_degree=0,
+                                    document_id="doc_1", embedding=embedding.tolist())
+                           for i, embedding in enumerate(embeddings)])
+        queries = embeddings[:20] + 0.05 * rng.normal(size=(20, 16)).astype(np.float32)
+
+        with tempfile.TemporaryDirectory() as directory:
+            exact = VectorIndex(os.path.join(directory, "exact"), metric="euclidean")
+            exact.build(self.kg)
+            exact_uids, exact_distances = exact.search_batch(queries, k=5)
+
+            int8 = QuantizedIndex(os.path.join(directory, "int8"), metric="euclidean", quantizer="int8")
+            int8.build(self.kg)
+            uids, _ = int8.search_batch(queries, k=5)
+            self.assertEqual(list(uids[:, 0]), list(exact_uids[:, 0]))
+
+            pq = QuantizedIndex(os.path.join(directory, "pq"), metric="euclidean", quantizer="pq", m=4)
+            pq.build(self.kg)
+            self.assertEqual(pq._matrix.shape[1], 4)  # type: ignore
+            uids, _ = pq.search_batch(queries, k=5, kg=self.kg, rerank=100)
+            self.assertEqual(uids.tolist(), exact_uids.tolist())
+            with self.assertRaises(ValueError):
+                pq.search_batch(queries, k=5, rerank=100)
+
+            # the attached index re-ranks through the graph and follows its writes
+            pq.rerank = 100
+            self.kg.vector_index = pq
+            neighbors = self.kg.get_nearest_neighbors(queries[0].tolist(), k=5)
+            self.assertEqual([n.node_uid for n in neighbors], list(exact_uids[0]))
+            np.testing.assert_allclose([n.distance for n in neighbors], exact_distances[0], rtol=1e-5)
+            self.kg.remove_node("test_pq_node_0")
+            self.assertNotIn("test_pq_node_0", pq)
+
+            pq.save()
+            reloaded = QuantizedIndex(os.path.join(directory, "pq"), metric="euclidean")
+            self.assertEqual(len(reloaded), 299)
+            self.assertEqual(reloaded.quantizer, "pq")  # the stored quantizer is loaded
+            self.assertEqual(reloaded.search(queries[1], k=3), pq.search(queries[1], k=3, rerank=0))
+
+    def test_quantized_index_incremental(self):
+        """Test the codebooks of an index built on an empty graph being trained once enough nodes are added."""
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(400, 16)).astype(np.float32)
+        node_uids = [f"test_pq_node_{i}" for i in range(400)]
+        queries = embeddings[:20] + 0.05 * rng.normal(size=(20, 16)).astype(np.float32)
+        exact_uids, _ = nearest_batch(node_uids, embeddings, queries, 10, "euclidean")
+
+        for quantizer, m, min_recall in [("int8", None, 0.95), ("pq", 4, 0.75)]:
+            self.kg.flush_kg()
+            with tempfile.TemporaryDirectory() as directory:
+                self.kg.vector_index = QuantizedIndex(directory, metric="euclidean", quantizer=quantizer, m=m)
+                self.assertEqual(self.kg.get_nearest_neighbors(queries[0], k=10), [])
+
+                for node_uid, embedding in zip(node_uids, embeddings):
+                    if node_uid == "test_pq_node_100":
+                        # the first embeddings are kept exactly until min_train_size are stored
+                        self.assertIsNone(self.kg.vector_index._codebook)
+                        neighbors = self.kg.get_nearest_neighbors(embeddings[7], k=1)
+                        self.assertEqual(neighbors[0].node_uid, "test_pq_node_7")
+                        self.assertAlmostEqual(neighbors[0].distance, 0.0, places=5)
+                    self.kg.add_node(node_uid, NodeData(
+                        node_uid=node_uid, node_title="Test Node", node_type="Person",
+                        node_description="This is a quantized index test node", node_degree=0,
+                        document_id="doc_1", embedding=embedding.tolist()))
+
+                self.assertEqual(self.kg.vector_index._row_shape[0], np.int8 if quantizer == "int8" else np.uint8)
+                batch = self.kg.get_nearest_neighbors_batch(queries, k=10)
+                recall = np.mean([len(set(batch.node_uids[i]) & set(exact_uids[i])) / 10 for i in range(20)])
+                self.assertGreaterEqual(recall, min_recall)
+
+                self.kg.vector_index.save()
+                reloaded = QuantizedIndex(directory, metric="euclidean", quantizer=quantizer)
+                self.assertEqual(reloaded.search(queries[0], k=10), self.kg.vector_index.search(queries[0], k=10))
+
+
+class SQLiteKGTest(_NoSQLKnowledgeGraphTests, unittest.TestCase):
+    """
+    Test cases for the SQLiteKG implementation of NoSQLKnowledgeGraph.
+
+    Every test runs against a fresh database file in a temporary directory.
+    """
+
+    def create_kg_instance(self) -> NoSQLKnowledgeGraph:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        kg = SQLiteKG(database_path=os.path.join(self.tmp_dir.name, "kg.sqlite"))
+        self.addCleanup(kg.close)
+        return kg
+
+    test_ndarray_embedding = InMemoryKGTest.test_ndarray_embedding
+    test_vector_index_reopened_after_writes = InMemoryKGTest.test_vector_index_reopened_after_writes
+    test_ivf_index_default_distance = InMemoryKGTest.test_ivf_index_default_distance
+    test_get_nearest_neighbors = InMemoryKGTest.test_get_nearest_neighbors
+    test_get_nearest_neighbors_batch = InMemoryKGTest.test_get_nearest_neighbors_batch
+    test_get_nearest_communities = InMemoryKGTest.test_get_nearest_communities
+    test_retrieve_context = InMemoryKGTest.test_retrieve_context
+
+    def test_concurrent_readers(self):
+        """Test that threads read through their own connections while the graph is written."""
+        for i in range(3):
+            self.kg.add_node(node_uid=f"test_sqlite_node_{i}", node_data=NodeData(
+                node_uid=f"test_sqlite_node_{i}",
+                node_title="Test Node",
+                node_type="Person",
+                node_description="This is a sqlite test node",
+                node_degree=0,
+                document_id="doc_1",
+            ))
+        self.kg.add_edge(EdgeData(source_uid="test_sqlite_node_0", target_uid="test_sqlite_node_1",
+                                  description="undirected edge", directed=False))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            nodes = list(executor.map(self.kg.get_node, ["test_sqlite_node_0"] * 8))
+        self.assertTrue(all(n.edges_to == ["test_sqlite_node_1"] for n in nodes))
+        self.assertEqual(self.kg.get_node("test_sqlite_node_1").edges_from, ["test_sqlite_node_0"])
+
+    def test_add_nodes_holds_write_lock(self):
+        """Test that add_nodes checks for existing node_uids under the write lock of its insert."""
+        def _node(node_uid: str) -> NodeData:
+            return NodeData(node_uid=node_uid, node_title="Test Node", node_type="Person",
+                            node_description="This is a sqlite test node", node_degree=0,
+                            document_id="doc_1")
+
+        other_kg = SQLiteKG(database_path=self.kg.database_path, timeout=0.0)  # type: ignore
+        self.addCleanup(other_kg.close)
+        existing_node_uids = self.kg._existing_node_uids  # type: ignore
+        blocked = []
+
+        def _existing_node_uids_with_concurrent_insert(node_uids):
+            # another connection tries to insert one of the node_uids between check and insert
+            try:
+                other_kg.add_node("test_sqlite_node_0", _node("test_sqlite_node_0"))
+            except sqlite3.OperationalError:
+                blocked.append(True)
+            return existing_node_uids(node_uids)
+
+        self.kg._existing_node_uids = _existing_node_uids_with_concurrent_insert  # type: ignore
+        result = self.kg.add_nodes([_node("test_sqlite_node_0"), _node("test_sqlite_node_1")])
+
+        self.assertEqual(blocked, [True])
+        self.assertEqual(result.succeeded, ["test_sqlite_node_0", "test_sqlite_node_1"])
+
+    def test_session_rollback_not_indexed(self):
+        """Test that nodes of a rolled back session are not applied to the vector_index."""
+        self.kg.add_node("test_sqlite_node_0", NodeData(
+            node_uid="test_sqlite_node_0", node_title="Test Node", node_type="Person",
+            node_description="This is a sqlite test node", node_degree=0, document_id="doc_1",
+            embedding=[1.0, 0.0]))
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.kg.vector_index = VectorIndex(directory)
+            self.kg.vector_index.build(self.kg)
+
+            # the session commit fails on the existing node after the new node was inserted
+            with self.assertRaises(Exception):
+                with self.kg.session() as session:
+                    session.add_node("test_sqlite_node_1", NodeData(
+                        node_uid="test_sqlite_node_1", node_title="Test Node", node_type="Person",
+                        node_description="This is a sqlite test node", node_degree=0, document_id="doc_1",
+                        embedding=[0.0, 1.0]))
+                    session.add_node("test_sqlite_node_0", NodeData(
+                        node_uid="test_sqlite_node_0", node_title="Test Node", node_type="Person",
+                        node_description="This is a sqlite test node", node_degree=0, document_id="doc_1"))
+
+            self.assertFalse(self.kg.node_exist("test_sqlite_node_1"))
+            self.assertNotIn("test_sqlite_node_1", self.kg.vector_index)
+
 
 def suite():
     """testing suite def"""
@@ -839,6 +1904,9 @@ def suite():
     suite.addTest(unittest.makeSuite(FirestoreKGTests))
     suite.addTest(unittest.makeSuite(AuraKGTest))
     suite.addTest(unittest.makeSuite(MongoKGTest))
+    suite.addTest(unittest.makeSuite(CachedKGTest))
+    suite.addTest(unittest.makeSuite(InMemoryKGTest))
+    suite.addTest(unittest.makeSuite(SQLiteKGTest))
     # Add tests for other database classes as needed
     return suite
 
@@ -0,0 +1,270 @@
+"""graph2nosql quantized local vector search over node embeddings"""
+
+import os
+from typing import Iterable, List
+
+import numpy as np
+
+from base.vectors import VectorIndex, distances
+
+QUANTIZERS = ("int8", "pq")  # compression schemes of QuantizedIndex
+
+
+def _kmeans(vectors: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """Clusters the rows of vectors with k-means and returns the (k, dim) centroids."""
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _nearest_codewords(vectors, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        # empty clusters keep their centroid
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+def _nearest_codewords(vectors: np.ndarray, codewords: np.ndarray) -> np.ndarray:
+    """Returns the index of the nearest codeword of each row of vectors."""
+    return np.argmin(np.einsum("ij,ij->i", codewords, codewords) - 2.0 * (vectors @ codewords.T), axis=1)
+
+
+class QuantizedIndex(VectorIndex):
+    """
+    Approximate nearest neighbor search over compressed codes of the node embeddings.
+
+    The embeddings are stored as 8-bit codes in a memory mapped .npy file instead of the
+    float32 matrix of VectorIndex:
+
+    - "int8" scalar quantization keeps one byte per dimension, 4x smaller than float32.
+      Each dimension is mapped linearly from its trained range to 256 levels.
+    - "pq" product quantization splits embeddings into m subvectors and keeps the index of
+      the nearest of 256 k-means centroids per subvector, m bytes per embedding.
+
+    Until min_train_size embeddings are stored, the index keeps their exact float32 rows
+    and searches them exactly. The codebooks are then trained on the stored embeddings,
+    the whole graph when the index is built from a knowledge graph, and the rows are
+    replaced by their codes. Queries are not quantized, the
+    distances of a query to the codes are computed asymmetrically: from the decoded rows
+    for "int8", and from per query lookup tables of the distances to every centroid for
+    "pq". The exact norm of every embedding is kept as well, so cosine distances only
+    carry the error of the quantized dot product.
+
+    With rerank, the rerank best candidates are re-scored with their exact embeddings,
+    read from the knowledge graph in one batch, and the k nearest of them are returned.
+    """
+
+    def __init__(self, directory: str, metric: str = "cosine", quantizer: str = "int8",
+                 m: int | None = None, rerank: int = 0, train_size: int = 65_536,
+                 min_train_size: int = 256, block_rows: int = 65_536) -> None:
+        """
+        Initializes the QuantizedIndex object, loading the index stored in directory on first use.
+
+        Args:
+            directory (str): directory of the codes, codebooks and uid table, created if missing.
+            metric (str): default distance metric of search, one of "cosine", "dot" or "euclidean".
+            quantizer (str): "int8" scalar quantization or "pq" product quantization.
+            m (int | None): number of "pq" subvectors, must divide the embedding dimension.
+                The largest divisor up to dimension / 8 if None.
+            rerank (int): default number of candidates re-scored with exact embeddings, 0 disables re-ranking.
+            train_size (int): maximum number of embeddings the codebooks are trained on.
+            min_train_size (int): number of embeddings stored exactly before the codebooks are trained.
+            block_rows (int): number of code rows scored per block.
+        """
+        if quantizer not in QUANTIZERS:
+            raise ValueError(f"Error: quantizer must be one of {QUANTIZERS}, not '{quantizer}'")
+        super().__init__(directory, metric=metric, block_rows=block_rows)
+        self.quantizer = quantizer
+        self.m = m
+        self.rerank = rerank
+        self.train_size = train_size
+        self.min_train_size = min_train_size
+        self._codebook: dict[str, np.ndarray] | None = None  # "low" and "step" for int8, "centroids" for pq
+
+    @property
+    def _matrix_path(self) -> str:
+        return os.path.join(self.directory, "codes.npy")
+
+    @property
+    def _codebook_path(self) -> str:
+        return os.path.join(self.directory, "codebook.npz")
+
+    @property
+    def _norms_path(self) -> str:
+        return os.path.join(self.directory, "norms.npy")
+
+    @property
+    def _row_shape(self) -> tuple[np.dtype, int]:
+        if self._codebook is None:
+            return super()._row_shape
+        if self.quantizer == "pq":
+            return np.dtype(np.uint8), self.m  # type: ignore
+        return np.dtype(np.int8), self.dim  # type: ignore
+
+    def _load(self) -> None:
+        if os.path.exists(self._codebook_path):
+            with np.load(self._codebook_path) as stored:
+                self.quantizer = str(stored["quantizer"])
+                self._codebook = {name: stored[name] for name in stored.files if name != "quantizer"}
+            if self.quantizer == "pq":
+                self.m = len(self._codebook["centroids"])
+        super()._load()
+
+    def _load_norms(self) -> np.ndarray:
+        """Reads the exact norms stored next to the codes."""
+        if self._codebook is None:
+            return super()._load_norms()
+        norms = np.zeros(len(self._matrix), dtype=np.float32)  # type: ignore
+        stored = np.load(self._norms_path)
+        norms[:len(stored)] = stored
+        return norms
+
+    def save(self) -> None:
+        """Writes the codebooks and norms, then the codes and uid table."""
+        self._ensure_loaded()
+        if self._codebook is not None:
+            np.savez(self._codebook_path, quantizer=np.array(self.quantizer), **self._codebook)
+            np.save(self._norms_path, self._norms[:len(self._uids)])
+        elif os.path.exists(self._codebook_path):
+            os.remove(self._codebook_path)
+            os.remove(self._norms_path)
+        super().save()
+
+    def clear(self) -> None:
+        """Drops all codes and codebooks, they are trained again by the next build."""
+        super().clear()
+        self._codebook = None
+
+    def train(self, embeddings: np.ndarray, iterations: int = 10, seed: int = 0) -> None:
+        """Trains the codebooks on a sample of at most train_size of the (n, dim) embeddings."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        if len(embeddings) > self.train_size:
+            embeddings = embeddings[np.sort(rng.choice(len(embeddings), self.train_size, replace=False))]
+        dim = embeddings.shape[1]
+
+        if self.quantizer == "int8":
+            low, high = embeddings.min(axis=0), embeddings.max(axis=0)
+            step = np.where(high > low, (high - low) / 255.0, 1.0).astype(np.float32)
+            self._codebook = {"low": low, "step": step}
+            return
+
+        m = self.m or max(d for d in range(1, max(1, dim // 8) + 1) if dim % d == 0)
+        if dim % m:
+            raise ValueError(f"Error: m must divide the embedding dimension {dim}, got {m}")
+        self.m = m
+        subvectors = embeddings.reshape(len(embeddings), m, dim // m)
+        ksub = min(256, len(embeddings))
+        self._codebook = {"centroids": np.stack(
+            [_kmeans(subvectors[:, j], ksub, iterations, rng) for j in range(m)])}
+
+    def _quantize(self) -> None:
+        """Trains the codebooks on the stored float32 rows and replaces the rows by their codes."""
+        used = len(self._uids)
+        exact = np.asarray(self._matrix[:used])  # type: ignore
+        rows = np.asarray(sorted(self._rows.values()))
+        if len(rows) > self.train_size:
+            rows = np.sort(np.random.default_rng(0).choice(rows, self.train_size, replace=False))
+        self.train(exact[rows])
+        dtype, width = self._row_shape
+        codes = np.lib.format.open_memmap(self._matrix_path + ".tmp", mode="w+",
+                                          dtype=dtype, shape=(len(self._matrix), width))  # type: ignore
+        for start in range(0, used, self.block_rows):
+            end = min(start + self.block_rows, used)
+            codes[start:end] = self._encode(exact[start:end])
+        codes.flush()
+        del codes, exact
+        self._matrix = None
+        os.replace(self._matrix_path + ".tmp", self._matrix_path)
+        self._matrix = np.load(self._matrix_path, mmap_mode="r+")
+        # the stored rows are codes now, write the codebooks and uid table with them
+        self.save()
+
+    def _encode(self, embeddings: np.ndarray) -> np.ndarray:
+        """Returns the codes of float32 embeddings, the embeddings themselves before training."""
+        if self._codebook is None:
+            return embeddings
+        if self.quantizer == "int8":
+            levels = np.rint((embeddings - self._codebook["low"]) / self._codebook["step"])  # type: ignore
+            return (np.clip(levels, 0, 255) - 128).astype(np.int8)
+        centroids = self._codebook["centroids"]  # type: ignore
+        subvectors = embeddings.reshape(len(embeddings), len(centroids), -1)
+        return np.stack([_nearest_codewords(subvectors[:, j], centroids[j])
+                         for j in range(len(centroids))], axis=1).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Returns the float32 embeddings approximated by (n, code width) codes."""
+        if self.quantizer == "int8":
+            return (codes.astype(np.float32) + 128.0) * self._codebook["step"] + self._codebook["low"]  # type: ignore
+        centroids = self._codebook["centroids"]  # type: ignore
+        return np.concatenate([centroids[j][codes[:, j]] for j in range(len(centroids))], axis=1)
+
+    def upsert(self, node_uids: List[str], embeddings: np.ndarray | List[List[float]]) -> None:
+        """Inserts or replaces the codes of node_uids, training the codebooks once min_train_size are stored."""
+        super().upsert(node_uids, embeddings)
+        if self._codebook is None and len(self._rows) >= max(self.min_train_size, 1):
+            self._quantize()
+
+    def _score(self, rows: np.ndarray, queries: np.ndarray, metric: str) -> np.ndarray:
+        """Asymmetric distances of the float32 queries to the codes stored in rows."""
+        if self._codebook is None:
+            return super()._score(rows, queries, metric)
+        codes = np.asarray(self._rows_block(rows))
+        norms = self._norms[rows]
+        if self.quantizer == "int8":
+            return distances(self.decode(codes), queries, metric, norms=norms).T
+
+        centroids = self._codebook["centroids"]  # type: ignore
+        m, _, dsub = centroids.shape
+        subqueries = queries.reshape(len(queries), m, dsub)
+        # (n_queries, m, 256) lookup tables, the distance of a row is the sum of its m entries
+        tables = np.einsum("qjd,jcd->qjc", subqueries, centroids)
+        if metric == "euclidean":
+            tables = (np.einsum("qjd,qjd->qj", subqueries, subqueries)[:, :, None] - 2.0 * tables
+                      + np.einsum("jcd,jcd->jc", centroids, centroids)[None])
+        scores = np.zeros((len(queries), len(rows)), dtype=np.float32)
+        for j in range(m):
+            scores += tables[:, j, codes[:, j]]
+
+        if metric == "euclidean":
+            return np.sqrt(np.maximum(scores, 0.0))
+        if metric == "dot":
+            return -scores
+        query_norms = np.linalg.norm(queries, axis=1)
+        return 1.0 - scores / np.maximum(query_norms[:, None] * norms[None, :], np.finfo(np.float32).tiny)
+
+    def search_batch(self, queries: np.ndarray, k: int = 10, metric: str | None = None,
+                     node_uids: Iterable[str] | None = None, kg=None, rerank: int | None = None,
+                     **search_params) -> tuple[np.ndarray, np.ndarray]:
+        """Searches the k nearest neighbors of every row of queries over the codes.
+
+        With rerank, defaulting to the rerank of the index, the best rerank candidates per
+        query are read from kg and re-scored exactly, so the returned distances are exact.
+        """
+        rerank = self.rerank if rerank is None else rerank
+        if not rerank or k < 1:
+            return super().search_batch(queries, k=k, metric=metric, node_uids=node_uids, **search_params)
+        if kg is None:
+            raise ValueError("Error: re-ranking reads the exact embeddings, the knowledge graph kg is required.")
+
+        metric = metric or self.metric
+        queries = np.asarray(queries, dtype=np.float32)
+        candidates, _ = super().search_batch(queries, k=max(k, rerank), metric=metric, node_uids=node_uids,
+                                             **search_params)
+        node_fields = kg._get_node_fields([uid for uid in dict.fromkeys(candidates.ravel()) if uid is not None],
+                                          ["embedding"])
+        exact = {uid: kg._decode_embedding(fields["embedding"]) for uid, fields in node_fields.items()}
+
+        uids = np.full((len(queries), k), None, dtype=object)
+        dists = np.full((len(queries), k), np.inf, dtype=np.float32)
+        for i, query in enumerate(queries):
+            found = [uid for uid in candidates[i]
+                     if uid is not None and uid in exact and len(exact[uid]) == len(query)]
+            if not found:
+                continue
+            matrix = np.asarray([exact[uid] for uid in found], dtype=np.float32)
+            found_distances = distances(matrix, query, metric)
+            order = np.argsort(found_distances, kind="stable")[:k]
+            uids[i, :len(order)] = np.asarray(found, dtype=object)[order]
+            dists[i, :len(order)] = found_distances[order]
+        return uids, dists
@@ -0,0 +1,605 @@
+"""graph2nosql local vector search over node embeddings"""
+
+import json
+import os
+import time
+from typing import Iterable, Iterator, List
+
+import numpy as np
+
+from base.operations import METRICS
+
+# upper bound of entries in one (rows, n_queries) block of distances
+_MAX_BLOCK_ENTRIES = 1 << 24
+
+
+def _validate_metric(metric: str) -> None:
+    if metric not in METRICS:
+        raise ValueError(f"Error: metric must be one of {METRICS}, not '{metric}'")
+
+
+def distances(matrix: np.ndarray, queries: np.ndarray, metric: str,
+              norms: np.ndarray | None = None) -> np.ndarray:
+    """Returns the distances of the rows of matrix to one query vector or to each row of queries, nearer is smaller.
+
+    1 - cosine similarity for "cosine", the negated dot product for "dot" and the
+    euclidean distance for "euclidean". norms are the row norms, computed if None.
+    The result has shape (rows,) for a single query and (rows, n_queries) otherwise.
+    """
+    products = matrix @ queries.T
+    if metric == "dot":
+        return -products
+    if norms is None:
+        norms = np.linalg.norm(matrix, axis=1)
+    if queries.ndim == 2:
+        norms = norms[:, None]
+    query_norms = np.linalg.norm(queries, axis=-1)
+    if metric == "cosine":
+        return 1.0 - products / np.maximum(norms * query_norms, np.finfo(np.float32).tiny)
+    return np.sqrt(np.maximum(norms ** 2 - 2.0 * products + query_norms ** 2, 0.0))
+
+
+def _merge_top_k(best_rows: np.ndarray, best_distances: np.ndarray, rows: np.ndarray,
+                 block_distances: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Merges the (n_queries, rows) block_distances of rows into the unsorted (n_queries, k) best so far."""
+    if block_distances.shape[1] > k:
+        top = np.argpartition(block_distances, k - 1, axis=1)[:, :k]
+        rows, block_distances = rows[top], np.take_along_axis(block_distances, top, axis=1)
+    else:
+        rows = np.broadcast_to(rows, block_distances.shape)
+    merged_rows = np.concatenate([best_rows, rows], axis=1)
+    merged_distances = np.concatenate([best_distances, block_distances], axis=1)
+    top = np.argpartition(merged_distances, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(merged_rows, top, axis=1), np.take_along_axis(merged_distances, top, axis=1)
+
+
+def _sorted_top_k(node_uids: np.ndarray, best_rows: np.ndarray,
+                  best_distances: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sorts the best rows per query and maps them to node_uids, None where no row was found."""
+    order = np.argsort(best_distances, axis=1, kind="stable")
+    best_rows = np.take_along_axis(best_rows, order, axis=1)
+    best_distances = np.take_along_axis(best_distances, order, axis=1)
+    # row -1 marks an empty slot and maps to the None appended to node_uids
+    uids = np.append(node_uids, None)[best_rows]
+    uids[~np.isfinite(best_distances)] = None
+    return uids, best_distances
+
+
+def nearest_batch(node_uids: List[str], matrix: np.ndarray, queries: np.ndarray, k: int, metric: str,
+                  block_rows: int = 65_536) -> tuple[np.ndarray, np.ndarray]:
+    """Brute-force search for each row of queries over the rows of matrix, with one matrix product per block of rows.
+
+    Returns (node_uids, distances) arrays of shape (n_queries, k), nearest first,
+    None and inf where matrix has fewer than k rows.
+    """
+    queries = np.asarray(queries, dtype=np.float32).reshape(-1, matrix.shape[1])
+    best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+    best_distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+    query_block = max(1, _MAX_BLOCK_ENTRIES // block_rows)
+    for query_start in range(0, len(queries), query_block):
+        query_slice = slice(query_start, query_start + query_block)
+        for start in range(0, len(matrix), block_rows):
+            block = matrix[start:start + block_rows].astype(np.float32, copy=False)
+            best_rows[query_slice], best_distances[query_slice] = _merge_top_k(
+                best_rows[query_slice], best_distances[query_slice], np.arange(start, start + len(block)),
+                distances(block, queries[query_slice], metric).T, k)
+    return _sorted_top_k(np.asarray(node_uids, dtype=object), best_rows, best_distances)
+
+
+def nearest(node_uids: List[str], matrix: np.ndarray, query_vec: np.ndarray | List[float], k: int,
+            metric: str) -> List[tuple[str, float]]:
+    """Brute-force search: returns the k nearest (node_uid, distance) pairs of the rows of matrix, nearest first."""
+    uids, dists = nearest_batch(node_uids, matrix, np.asarray(query_vec, dtype=np.float32)[None, :], k, metric)
+    return [(uid, float(dist)) for uid, dist in zip(uids[0], dists[0]) if uid is not None]
+
+
+class VectorIndex:
+    """
+    Exact nearest neighbor search over the node embeddings of a knowledge graph.
+
+    Embeddings are exported once into a contiguous float32 matrix stored as .npy file
+    and opened as memory map, next to a JSON table mapping rows to node_uids.
+    Queries are answered with blocked NumPy matrix products, so search runs in BLAS
+    without a round trip to the database. refresh() applies the node writes and
+    removals since the previous sync, like NoSQLKnowledgeGraph.refresh_networkx.
+
+    upsert and remove change the memory mapped matrix in place, the uid table is only
+    written by save(). The first change after a save leaves a marker file, an index
+    reopened with the marker is_stale until refresh() or build() saves it again.
+
+    Distances are returned nearest first: 1 - cosine similarity for "cosine",
+    the euclidean distance for "euclidean" and the negated dot product for "dot".
+    """
+
+    def __init__(self, directory: str, metric: str = "cosine", block_rows: int = 65_536) -> None:
+        """
+        Initializes the VectorIndex object, loading the index stored in directory if it exists.
+
+        Args:
+            directory (str): directory of the embedding matrix and uid table, created if missing.
+            metric (str): default distance metric of search, one of "cosine", "dot" or "euclidean".
+            block_rows (int): number of matrix rows scored per matrix product.
+        """
+        _validate_metric(metric)
+        self.directory = directory
+        self.metric = metric
+        self.block_rows = block_rows
+        self.dim: int | None = None
+        self.synced_at: float | None = None  # updated_at watermark of the last sync with the graph
+        self.watermark_skew: float = 5.0  # seconds re-read before the watermark, see NoSQLKnowledgeGraph
+        self._uids: list[str | None] = []  # node_uid per matrix row, None for free rows
+        self._rows: dict[str, int] = {}  # node_uid -> matrix row
+        self._free: list[int] = []  # rows of removed embeddings, reused by upsert
+        self._matrix: np.ndarray | None = None  # (capacity, dim) float32 memory map
+        self._norms: np.ndarray = np.zeros(0, dtype=np.float32)  # euclidean norm per row
+        self._loaded = False  # the stored index is opened on first use
+        self._dirty = False  # changed since the last save, the marker file exists
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def _matrix_path(self) -> str:
+        return os.path.join(self.directory, "embeddings.npy")
+
+    @property
+    def _uids_path(self) -> str:
+        return os.path.join(self.directory, "uids.json")
+
+    @property
+    def _dirty_path(self) -> str:
+        return os.path.join(self.directory, "dirty")
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._rows)
+
+    def __contains__(self, node_uid: str) -> bool:
+        self._ensure_loaded()
+        return node_uid in self._rows
+
+    @property
+    def is_built(self) -> bool:
+        """True if the index was built from a knowledge graph."""
+        self._ensure_loaded()
+        return self.synced_at is not None
+
+    @property
+    def is_stale(self) -> bool:
+        """True if the index was changed after its last save, so the stored uid table may not match the matrix."""
+        self._ensure_loaded()
+        return self._dirty
+
+    def _mark_dirty(self) -> None:
+        """Leaves the marker file of unsaved changes before the first change after a save."""
+        if not self._dirty:
+            open(self._dirty_path, "w").close()
+            self._dirty = True
+
+    def _ensure_loaded(self) -> None:
+        """Opens the index stored in directory on first use."""
+        if not self._loaded:
+            self._loaded = True
+            if os.path.exists(self._uids_path):
+                self._load()
+
+    def _load(self) -> None:
+        """Opens the stored embedding matrix and uid table."""
+        with open(self._uids_path) as f:
+            table = json.load(f)
+        self.dim, self.synced_at, self._uids = table["dim"], table["synced_at"], table["uids"]
+        self._rows = {uid: row for row, uid in enumerate(self._uids) if uid is not None}
+        self._free = [row for row, uid in enumerate(self._uids) if uid is None]
+        self._dirty = os.path.exists(self._dirty_path)
+        if self.dim is not None:
+            self._matrix = np.load(self._matrix_path, mmap_mode="r+")
+            self._norms = self._load_norms()
+
+    def _load_norms(self) -> np.ndarray:
+        """Computes the norms of the stored rows, one entry per row of capacity."""
+        norms = np.zeros(len(self._matrix), dtype=np.float32)  # type: ignore
+        for start in range(0, len(self._uids), self.block_rows):
+            block = self._matrix[start:start + self.block_rows]  # type: ignore
+            norms[start:start + len(block)] = np.linalg.norm(block, axis=1)
+        return norms
+
+    def save(self) -> None:
+        """Flushes the embedding matrix and writes the uid table."""
+        self._ensure_loaded()
+        if self._matrix is not None:
+            self._matrix.flush()
+        tmp_path = self._uids_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": self.dim, "synced_at": self.synced_at, "uids": self._uids}, f)
+        os.replace(tmp_path, self._uids_path)
+        if self._dirty:
+            os.remove(self._dirty_path)
+            self._dirty = False
+
+    @property
+    def _row_shape(self) -> tuple[np.dtype, int]:
+        """dtype and width of the stored matrix rows."""
+        return np.dtype(np.float32), self.dim  # type: ignore
+
+    def _encode(self, embeddings: np.ndarray) -> np.ndarray:
+        """Returns the stored rows of float32 embeddings."""
+        return embeddings
+
+    def _reserve(self, rows: int) -> None:
+        """Grows the memory mapped matrix to hold at least rows rows, doubling its capacity."""
+        capacity = 0 if self._matrix is None else len(self._matrix)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, 1024)
+        dtype, width = self._row_shape
+        matrix = np.lib.format.open_memmap(self._matrix_path + ".tmp", mode="w+",
+                                           dtype=dtype, shape=(capacity, width))
+        norms = np.zeros(capacity, dtype=np.float32)
+        if self._matrix is not None:
+            used = len(self._uids)
+            matrix[:used] = self._matrix[:used]
+            norms[:used] = self._norms[:used]
+            del self._matrix
+        matrix.flush()
+        del matrix
+        os.replace(self._matrix_path + ".tmp", self._matrix_path)
+        self._matrix = np.load(self._matrix_path, mmap_mode="r+")
+        self._norms = norms
+
+    def upsert(self, node_uids: List[str], embeddings: np.ndarray | List[List[float]]) -> None:
+        """Inserts or replaces the embeddings of node_uids, one embedding per row."""
+        self._ensure_loaded()
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(node_uids), -1)
+        if self.dim is None:
+            self.dim = embeddings.shape[1]
+        if embeddings.shape[1] != self.dim:
+            raise ValueError(
+                f"Error: Embeddings must have dimension {self.dim}, not {embeddings.shape[1]}")
+
+        self._mark_dirty()
+        rows = []
+        for node_uid in node_uids:
+            row = self._rows.get(node_uid)
+            if row is None:
+                row = self._free.pop() if self._free else len(self._uids)
+                if row == len(self._uids):
+                    self._uids.append(node_uid)
+                else:
+                    self._uids[row] = node_uid
+                self._rows[node_uid] = row
+            rows.append(row)
+
+        self._reserve(len(self._uids))
+        self._matrix[rows] = self._encode(embeddings)  # type: ignore
+        self._norms[rows] = np.linalg.norm(embeddings, axis=1)
+
+    def remove(self, node_uids: Iterable[str]) -> None:
+        """Removes the embeddings of node_uids, unknown node_uids are ignored."""
+        self._ensure_loaded()
+        for node_uid in node_uids:
+            row = self._rows.pop(node_uid, None)
+            if row is not None:
+                self._mark_dirty()
+                self._uids[row] = None
+                self._norms[row] = 0.0
+                self._free.append(row)
+
+    def _apply_nodes(self, nodes: Iterable[dict]) -> None:
+        """Upserts the embeddings of node dicts, nodes without an embedding are removed."""
+        node_uids, embeddings, removed = [], [], []
+        dim = self.dim
+        for node in nodes:
+            embedding = node.get("embedding")
+            if embedding is not None and len(embedding) and dim is None:
+                dim = len(embedding)
+            if embedding is not None and len(embedding) and len(embedding) == dim:
+                node_uids.append(node["node_uid"])
+                embeddings.append(embedding)
+            else:
+                removed.append(node["node_uid"])
+        self.remove(removed)
+        if node_uids:
+            self.upsert(node_uids, embeddings)
+
+    def build(self, kg) -> None:
+        """Exports the embeddings of all nodes of the knowledge graph kg into the index."""
+        sync_started_at = time.time()
+        nodes = kg._scan_nodes(["node_uid", "embedding"])
+        self.clear()
+        self._apply_nodes(kg._decoded_nodes(nodes))
+        self.synced_at = sync_started_at
+        self.save()
+
+    def clear(self) -> None:
+        """Drops all embeddings, the index is built from scratch by the next refresh."""
+        self._loaded = True
+        self._uids, self._rows, self._free = [], {}, []
+        self.dim, self.synced_at = None, None
+        self._matrix, self._norms = None, np.zeros(0, dtype=np.float32)
+
+    def refresh(self, kg) -> None:
+        """Applies the node writes and removals of kg since the previous sync, builds the index on first use."""
+        self._ensure_loaded()
+        if self.synced_at is None:
+            self.build(kg)
+            return
+        sync_started_at = time.time()
+        changes = kg._get_changes_since(self.synced_at - self.watermark_skew, ["node_uid", "embedding"])
+        self.remove(changes.removed_nodes)
+        self._apply_nodes(kg._decoded_nodes(changes.nodes))
+        self.synced_at = sync_started_at
+        self.save()
+
+    def _candidates(self, queries: np.ndarray, **search_params) -> Iterator[tuple[np.ndarray, np.ndarray | None]]:
+        """Yields (rows, query indexes) to score, None scores the rows against all queries.
+
+        Exact search scores blocks of contiguous rows against all queries.
+        """
+        used = len(self._uids)
+        for start in range(0, used, self.block_rows):
+            yield np.arange(start, min(start + self.block_rows, used)), None
+
+    def search(self, query_vec: np.ndarray | List[float], k: int = 10, metric: str | None = None,
+               node_uids: Iterable[str] | None = None, kg=None, **search_params) -> List[tuple[str, float]]:
+        """Returns the k nearest (node_uid, distance) pairs of query_vec, nearest first.
+
+        If node_uids is given, only their embeddings are scored, exactly.
+        """
+        uids, dists = self.search_batch(np.asarray(query_vec, dtype=np.float32).reshape(1, -1), k=k,
+                                        metric=metric, node_uids=node_uids, kg=kg, **search_params)
+        return [(uid, float(dist)) for uid, dist in zip(uids[0], dists[0]) if uid is not None]
+
+    def search_batch(self, queries: np.ndarray, k: int = 10, metric: str | None = None,
+                     node_uids: Iterable[str] | None = None, kg=None,
+                     **search_params) -> tuple[np.ndarray, np.ndarray]:
+        """Searches the k nearest neighbors of every row of queries with blocked matrix products.
+
+        Returns (node_uids, distances) arrays of shape (n_queries, k), nearest first,
+        None and inf where fewer than k embeddings were found.
+        If node_uids is given, only their embeddings are scored, exactly.
+        kg is the knowledge graph the index was built from, it is read by indexes that
+        re-rank with the exact embeddings.
+        """
+        self._ensure_loaded()
+        metric = metric or self.metric
+        _validate_metric(metric)
+        queries = np.asarray(queries, dtype=np.float32)
+        if queries.ndim != 2:
+            raise ValueError(f"Error: queries must be a 2-dimensional array, not {queries.ndim}-dimensional")
+        best_rows = np.full((len(queries), max(k, 0)), -1, dtype=np.int64)
+        best_distances = np.full((len(queries), max(k, 0)), np.inf, dtype=np.float32)
+        if self._matrix is None or not self._rows or k < 1:
+            return _sorted_top_k(np.asarray(self._uids, dtype=object), best_rows, best_distances)
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Error: queries must have dimension {self.dim}, not {queries.shape[1]}")
+        query_block = max(1, _MAX_BLOCK_ENTRIES // self.block_rows)
+        if len(queries) > query_block:
+            # bound the (rows, n_queries) distance blocks
+            results = [self.search_batch(queries[start:start + query_block], k=k, metric=metric,
+                                         node_uids=node_uids, kg=kg, **search_params)
+                       for start in range(0, len(queries), query_block)]
+            return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+        if node_uids is not None:
+            allowed = np.sort(np.asarray([self._rows[uid] for uid in node_uids if uid in self._rows], dtype=np.int64))
+            candidates = ((allowed[start:start + self.block_rows], None)
+                          for start in range(0, len(allowed), self.block_rows))
+        else:
+            candidates = self._candidates(queries, **search_params)
+
+        free_rows = np.asarray(self._free, dtype=np.int64)
+        for rows, query_indexes in candidates:
+            if len(rows) == 0:
+                continue
+            block_queries = queries if query_indexes is None else queries[query_indexes]
+            block_distances = self._score(rows, block_queries, metric)
+            # free rows never win
+            block_distances[:, np.isin(rows, free_rows)] = np.inf
+
+            if query_indexes is None:
+                best_rows, best_distances = _merge_top_k(best_rows, best_distances, rows, block_distances, k)
+            else:
+                best_rows[query_indexes], best_distances[query_indexes] = _merge_top_k(
+                    best_rows[query_indexes], best_distances[query_indexes], rows, block_distances, k)
+
+        return _sorted_top_k(np.asarray(self._uids, dtype=object), best_rows, best_distances)
+
+    def _rows_block(self, rows: np.ndarray) -> np.ndarray:
+        """Reads the stored rows, contiguous rows are read as memory map slice."""
+        if rows[-1] - rows[0] == len(rows) - 1:
+            return self._matrix[rows[0]:rows[-1] + 1]  # type: ignore
+        return self._matrix[rows]  # type: ignore
+
+    def _score(self, rows: np.ndarray, queries: np.ndarray, metric: str) -> np.ndarray:
+        """Returns the (n_queries, rows) distances of queries to the embeddings stored in rows."""
+        return distances(self._rows_block(rows), queries, metric, norms=self._norms[rows]).T
+
+
+class IVFIndex(VectorIndex):
+    """
+    Approximate nearest neighbor search with an inverted file index (IVF-flat).
+
+    The embeddings are clustered with k-means into nlist lists. A query only scores the
+    embeddings in the nprobe lists with the nearest centroids, so search reads a fraction
+    nprobe / nlist of the matrix. Raising nprobe trades latency for recall, nprobe = nlist
+    is exact search. Embeddings inserted after training are assigned to their nearest
+    centroid, call train() again once the distribution of embeddings has drifted.
+    The centroids and list assignments are stored next to the embedding matrix.
+    """
+
+    def __init__(self, directory: str, metric: str = "cosine", nlist: int | None = None,
+                 nprobe: int = 8, block_rows: int = 65_536) -> None:
+        """
+        Initializes the IVFIndex object, loading the index stored in directory on first use.
+
+        Args:
+            directory (str): directory of the index files, created if missing.
+            metric (str): default distance metric of search, one of "cosine", "dot" or "euclidean".
+            nlist (int | None): number of lists, 4 * sqrt(number of embeddings) if None.
+            nprobe (int): default number of lists scored per query.
+            block_rows (int): number of matrix rows scored per matrix product.
+        """
+        super().__init__(directory, metric=metric, block_rows=block_rows)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self._centroids: np.ndarray | None = None  # (nlist, dim) float32 k-means centroids
+        self._assignments: np.ndarray = np.zeros(0, dtype=np.int32)  # list per matrix row, -1 if unassigned
+        self._lists: list[set[int]] = []  # matrix rows per list
+
+    @property
+    def _centroids_path(self) -> str:
+        return os.path.join(self.directory, "centroids.npy")
+
+    @property
+    def _assignments_path(self) -> str:
+        return os.path.join(self.directory, "assignments.npy")
+
+    def _load(self) -> None:
+        super()._load()
+        if os.path.exists(self._centroids_path):
+            self._centroids = np.load(self._centroids_path)
+            self._assignments = np.full(len(self._norms), -1, dtype=np.int32)
+            stored = np.load(self._assignments_path)
+            self._assignments[:len(stored)] = stored
+            self._rebuild_lists()
+
+    def save(self) -> None:
+        """Writes the centroids and list assignments, then the embedding matrix and uid table."""
+        self._ensure_loaded()
+        if self._centroids is not None:
+            np.save(self._centroids_path, self._centroids)
+            np.save(self._assignments_path, self._assignments[:len(self._uids)])
+        elif os.path.exists(self._centroids_path):
+            os.remove(self._centroids_path)
+            os.remove(self._assignments_path)
+        super().save()
+
+    def clear(self) -> None:
+        super().clear()
+        self._centroids = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists = []
+
+    def _rebuild_lists(self) -> None:
+        self._lists = [set() for _ in range(len(self._centroids))]  # type: ignore
+        for row, assignment in enumerate(self._assignments[:len(self._uids)]):
+            if assignment >= 0:
+                self._lists[assignment].add(row)
+
+    def _coarse_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        """Returns the vectors in the space of the centroids, unit length for cosine distance."""
+        if self.metric == "cosine":
+            return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), np.finfo(np.float32).tiny)
+        return vectors
+
+    def _nearest_centroids(self, vectors: np.ndarray, n: int = 1) -> np.ndarray:
+        """Returns the n nearest centroids of each of the coarse vectors, nearest first."""
+        centroids = self._centroids
+        centroid_norms = np.einsum("ij,ij->i", centroids, centroids)  # type: ignore
+        nearest = []
+        for start in range(0, len(vectors), self.block_rows):
+            block = vectors[start:start + self.block_rows]
+            distances = centroid_norms - 2.0 * (block @ centroids.T)  # type: ignore
+            if n == 1:
+                nearest.append(np.argmin(distances, axis=1)[:, None])
+                continue
+            if n < distances.shape[1]:
+                top = np.argpartition(distances, n - 1, axis=1)[:, :n]
+            else:
+                top = np.tile(np.arange(distances.shape[1]), (len(block), 1))
+            order = np.argsort(np.take_along_axis(distances, top, axis=1), axis=1, kind="stable")
+            nearest.append(np.take_along_axis(top, order, axis=1))
+        return np.concatenate(nearest) if nearest else np.zeros((0, n), dtype=np.int64)
+
+    def train(self, nlist: int | None = None, iterations: int = 10, seed: int = 0) -> None:
+        """Clusters the stored embeddings with k-means and assigns every embedding to its nearest list.
+
+        k-means runs on a sample of 64 embeddings per list.
+        """
+        self._ensure_loaded()
+        rows = np.asarray(sorted(self._rows.values()), dtype=np.int64)
+        if len(rows) == 0:
+            return
+        nlist = min(nlist or self.nlist or max(1, int(4 * np.sqrt(len(rows)))), len(rows))
+        rng = np.random.default_rng(seed)
+        sample = self._coarse_vectors(np.asarray(self._matrix[np.sort(  # type: ignore
+            rng.choice(rows, min(len(rows), 64 * nlist), replace=False))]))
+
+        self._centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = self._nearest_centroids(sample)[:, 0]
+            counts = np.bincount(labels, minlength=nlist)
+            sums = np.zeros_like(self._centroids)
+            np.add.at(sums, labels, sample)
+            # empty lists keep their centroid
+            filled = counts > 0
+            self._centroids[filled] = sums[filled] / counts[filled, None]
+            self._centroids = self._coarse_vectors(self._centroids)
+
+        self._assignments = np.full(len(self._norms), -1, dtype=np.int32)
+        for start in range(0, len(rows), self.block_rows):
+            block_rows = rows[start:start + self.block_rows]
+            self._assignments[block_rows] = self._nearest_centroids(
+                self._coarse_vectors(np.asarray(self._matrix[block_rows])))[:, 0]  # type: ignore
+        self._rebuild_lists()
+
+    def build(self, kg) -> None:
+        """Exports the embeddings of all nodes of kg and trains the lists on them."""
+        super().build(kg)
+        self.train()
+        self.save()
+
+    def upsert(self, node_uids: List[str], embeddings: np.ndarray | List[List[float]]) -> None:
+        """Inserts or replaces the embeddings of node_uids and assigns them to their nearest list."""
+        self._discard(node_uids)
+        super().upsert(node_uids, embeddings)
+        if len(self._assignments) < len(self._norms):
+            self._assignments = np.concatenate([self._assignments, np.full(
+                len(self._norms) - len(self._assignments), -1, dtype=np.int32)])
+        if self._centroids is not None:
+            rows = np.asarray([self._rows[node_uid] for node_uid in node_uids], dtype=np.int64)
+            self._assignments[rows] = self._nearest_centroids(
+                self._coarse_vectors(np.asarray(self._matrix[rows])))[:, 0]  # type: ignore
+            for row, assignment in zip(rows, self._assignments[rows]):
+                self._lists[assignment].add(int(row))
+
+    def remove(self, node_uids: Iterable[str]) -> None:
+        node_uids = list(node_uids)
+        self._discard(node_uids)
+        super().remove(node_uids)
+
+    def _discard(self, node_uids: Iterable[str]) -> None:
+        """Takes the rows of node_uids out of their lists."""
+        self._ensure_loaded()
+        for node_uid in node_uids:
+            row = self._rows.get(node_uid)
+            if row is not None and row < len(self._assignments) and self._assignments[row] >= 0:
+                self._lists[self._assignments[row]].discard(row)
+                self._assignments[row] = -1
+
+    def search_batch(self, queries: np.ndarray, k: int = 10, metric: str | None = None,
+                     node_uids: Iterable[str] | None = None, kg=None,
+                     **search_params) -> tuple[np.ndarray, np.ndarray]:
+        """Searches the k nearest neighbors of every row of queries in the nprobe nearest lists.
+
+        The lists are clustered in the space of the metric of the index, a search with
+        another metric would probe the wrong lists and raises ValueError, unless node_uids
+        restricts it to exact scoring.
+        """
+        self._ensure_loaded()
+        if metric is not None and metric != self.metric and node_uids is None and self._centroids is not None:
+            raise ValueError(
+                f"Error: the lists of the IVFIndex are trained for metric '{self.metric}', not '{metric}'")
+        return super().search_batch(queries, k=k, metric=metric, node_uids=node_uids, kg=kg, **search_params)
+
+    def _candidates(self, queries: np.ndarray,
+                    nprobe: int | None = None) -> Iterator[tuple[np.ndarray, np.ndarray | None]]:
+        """Yields the rows of every probed list with the queries that probe it, all rows before training."""
+        if self._centroids is None:
+            yield from super()._candidates(queries)
+            return
+        probes = self._nearest_centroids(self._coarse_vectors(queries),
+                                         min(nprobe or self.nprobe, len(self._centroids)))
+        for probe in np.unique(probes):
+            rows = np.sort(np.fromiter(self._lists[probe], dtype=np.int64, count=len(self._lists[probe])))
+            query_indexes = np.flatnonzero((probes == probe).any(axis=1))
+            for start in range(0, len(rows), self.block_rows):
+                yield rows[start:start + self.block_rows], query_indexes
@@ -2,19 +2,24 @@
 
 import os
 import json
+import tempfile
 import time
 from abc import ABC, abstractmethod
 from typing import Any, Dict
 
 from dotenv import dotenv_values
+import numpy as np
 
 from google.cloud import bigquery
 import google.auth
 
 
 from base.operations import NoSQLKnowledgeGraph
+from base.quantization import QuantizedIndex
+from base.vectors import VectorIndex
 from databases.firestore_kg import FirestoreKG
 from databases.n4j import AuraKG
+from databases.inmemory_kg import InMemoryKG
 
 from datamodel.data_model import NodeData, EdgeData
 
@@ -143,6 +148,40 @@ class NodeImportBenchmark(KGDBBenchmark):
             print(f"Error adding node {data.node_uid} with {option_name}: {e}")
 
 
+class BulkImportBenchmark(KGDBBenchmark):
+    """
+    Define Latency Benchmark for bulk imports. Inherits from KGDBBenchmark.
+    Constructs the data of all records first and passes it to a single _db_transaction call.
+    """
+    def __call__(self, records):
+
+        print(
+            f'$$$$ Starting Benchmark {self.benchmark_name} with options: {self.option_names} $$$$')
+
+        data = [self._construct_data(row) for row in records]
+
+        for option_name in self.option_names:
+            start_time = time.time()
+            self._db_transaction(kgdb=self.options_dict[option_name],
+                                 data=data, option_name=option_name)
+            end_time = time.time()
+            self.option_times[option_name] = end_time - start_time
+
+        self._benchmark_reporting()
+
+
+class NodeBulkImportBenchmark(BulkImportBenchmark, NodeImportBenchmark):
+    """
+    Define Latency Benchmark for bulk node import with a single add_nodes call.
+    Reuses _construct_data of NodeImportBenchmark.
+    """
+    def _db_transaction(self, kgdb: NoSQLKnowledgeGraph, option_name, data: list[NodeData]) -> None:
+        # defines the db transaction that this benchmark run should compare
+        result = kgdb.add_nodes(data)
+        for node_uid, error in result.failed.items():
+            print(f"Error adding node {node_uid} with {option_name}: {error}")
+
+
 class EdgeImportBenchmark(KGDBBenchmark):
     """
     Define Latency Benchmark for edge import. Inhertits from KGDBBenchmark.
@@ -175,6 +214,18 @@ class EdgeImportBenchmark(KGDBBenchmark):
         return None
 
 
+class EdgeBulkImportBenchmark(BulkImportBenchmark, EdgeImportBenchmark):
+    """
+    Define Latency Benchmark for bulk edge import with a single add_edges call.
+    Reuses _construct_data of EdgeImportBenchmark.
+    """
+    def _db_transaction(self, kgdb: NoSQLKnowledgeGraph, option_name: str, data: list[EdgeData]) -> None:
+        # defines the db transaction that this benchmark run should compare
+        result = kgdb.add_edges(data)
+        for edge_uid, error in result.failed.items():
+            print(f"Error adding edge {edge_uid} with {option_name}: {error}")
+
+
 class NodeQueryBenchmark(KGDBBenchmark):
     """
     Define Latency Benchmark for node query. Inhertits from KGDBBenchmark.
@@ -195,6 +246,112 @@ class NodeQueryBenchmark(KGDBBenchmark):
         return None
 
 
+class NodeBatchQueryBenchmark(BulkImportBenchmark, NodeQueryBenchmark):
+    """
+    Define Latency Benchmark for batch node query with a single get_nodes call.
+    Reuses _construct_data of NodeQueryBenchmark.
+    """
+    def _db_transaction(self, kgdb: NoSQLKnowledgeGraph, option_name, data: list[str]):
+        # defines the db transaction that this benchmark run should compare
+        result = kgdb.get_nodes(node_uids=data)
+        for node_uid in result.missing:
+            print(f"Error fetching node data {node_uid} with {option_name}: not found")
+        return None
+
+
+
+class NeighborhoodCountBenchmark(NodeQueryBenchmark):
+    """
+    Define Latency Benchmark for counting the k-th degree connections of a node.
+    Reuses _construct_data of NodeQueryBenchmark.
+    """
+    def __init__(self,
+                 benchmark_name: str,
+                 options_dict: Dict[str, NoSQLKnowledgeGraph],
+                 import_lim: int,
+                 k: int = 2,
+                 ):
+        super().__init__(benchmark_name=benchmark_name, options_dict=options_dict, import_lim=import_lim)
+        self.k = k
+
+    def _db_transaction(self, kgdb: NoSQLKnowledgeGraph, option_name, data: str):
+        # defines the db transaction that this benchmark run should compare
+        try:
+            kgdb.get_k_hop_neighborhood(node_uid=data, k=self.k)
+        except Exception as e:
+            print(f"Error counting {self.k}-hop neighborhood of {data} with {option_name}: {e}")
+        return None
+
+
+def recall_at_k(approx_uids: np.ndarray, exact_uids: np.ndarray) -> float:
+    """Fraction of the exact k nearest neighbors found by an approximate search, averaged over the queries."""
+    hits = [len(set(approx) & set(exact) - {None}) / max(1, len(set(exact) - {None}))
+            for approx, exact in zip(approx_uids, exact_uids)]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+class VectorSearchRecallBenchmark:
+    """
+    Define Latency and Recall@k Benchmark of local vector indexes against exact search.
+
+    Every option is a vector index of the same knowledge graph. Options are built from
+    the graph if they are not yet built, then queried with the same batch of query
+    vectors. Reports build and search time, recall@k against an exact VectorIndex and
+    the stored bytes per embedding.
+    """
+    def __init__(self,
+                 benchmark_name: str,
+                 kg: NoSQLKnowledgeGraph,
+                 options_dict: Dict[str, VectorIndex],
+                 k: int = 10,
+                 metric: str = "cosine",
+                 ):
+        self.benchmark_name = benchmark_name
+        self.kg = kg
+        self.options_dict = options_dict
+        self.option_names = list(options_dict.keys())
+        self.k = k
+        self.metric = metric
+        self.option_results = {}
+
+    def __call__(self, queries: np.ndarray):
+
+        print(
+            f'$$$$ Starting Benchmark {self.benchmark_name} with options: {self.option_names} $$$$')
+
+        with tempfile.TemporaryDirectory() as directory:
+            exact = VectorIndex(directory, metric=self.metric)
+            exact.build(self.kg)
+            exact_uids, _ = exact.search_batch(queries, k=self.k, metric=self.metric)
+
+        for option_name in self.option_names:
+            index = self.options_dict[option_name]
+            start_time = time.time()
+            if not index.is_built:
+                index.build(self.kg)
+            build_time = time.time() - start_time
+
+            start_time = time.time()
+            uids, _ = index.search_batch(queries, k=self.k, metric=self.metric, kg=self.kg)
+            search_time = time.time() - start_time
+
+            dtype, width = index._row_shape
+            self.option_results[option_name] = {"build_time": build_time,
+                                                "search_time": search_time,
+                                                "recall": recall_at_k(uids, exact_uids),
+                                                "bytes_per_embedding": dtype.itemsize * width}
+
+        self._benchmark_reporting(len(queries))
+
+    def _benchmark_reporting(self, n_queries: int) -> None:
+        for option_name in self.option_names:
+            result = self.option_results[option_name]
+            print(f'{option_name} {self.benchmark_name} for {n_queries} queries: '
+                  f'build {result["build_time"]:.2f}s, search {result["search_time"]:.3f}s, '
+                  f'recall@{self.k} {result["recall"]:.3f}, {result["bytes_per_embedding"]} bytes per embedding')
+        return None
+
+
 if __name__ == "__main__":
     os.chdir('../')
     current_directory = os.getcwd()
@@ -224,6 +381,9 @@ if __name__ == "__main__":
                            str(secrets["NEO4J_PASSWORD"]))
                      )
 
+    # zero latency baseline, the difference to the database options is network and server time
+    memory_kg = InMemoryKG()
+
     # clean kg storages before starting test run
     # fskg.flush_kg()
     # aura_kg.flush_kg()
@@ -240,4 +400,16 @@ if __name__ == "__main__":
     # add_edges_testing = EdgeImportBenchmark(benchmark_name="Edge Import", option_1=fskg, option_2=aura_kg, import_lim=100)
     # add_edges_testing(records=query_job)
 
+    # # quantized vector search recall
+    # memory_kg.add_nodes([NodeData(node_uid=f"node_{i}", node_title=f"node_{i}", node_description="na",
+    #                               node_degree=0, node_type="na", document_id="na", embedding=embedding.tolist())
+    #                      for i, embedding in enumerate(np.random.default_rng(0).normal(size=(10_000, 128)))])
+    # queries = np.random.default_rng(1).normal(size=(100, 128)).astype(np.float32)
+    # index_dir = tempfile.mkdtemp()
+    # recall_testing = VectorSearchRecallBenchmark(benchmark_name="Vector Search", kg=memory_kg, k=10, options_dict={
+    #     "int8": QuantizedIndex(os.path.join(index_dir, "int8"), quantizer="int8"),
+    #     "pq": QuantizedIndex(os.path.join(index_dir, "pq"), quantizer="pq"),
+    #     "pq_rerank": QuantizedIndex(os.path.join(index_dir, "pq_rerank"), quantizer="pq", rerank=100)})
+    # recall_testing(queries=queries)
+
     print('hello base!')
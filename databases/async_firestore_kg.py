@@ -0,0 +1,382 @@
+"""Firestore asyncio database operations implementation"""
+
+from typing import Iterable, List
+import asyncio
+import time
+
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud import firestore
+from google.cloud.firestore_v1 import ArrayRemove, ArrayUnion
+import google.auth
+
+from datamodel.data_model import NodeData, EdgeData, BatchWriteResult, BatchReadResult
+from base.async_operations import AsyncNoSQLKnowledgeGraph
+from base.operations import batched
+from databases.firestore_kg import embedding_from_firestore, firestore_embedding
+
+
+class AsyncFirestoreKG(AsyncNoSQLKnowledgeGraph):
+    """
+    Firestore asyncio database operations implementation class on the native AsyncClient.
+
+    Works on the same collections as FirestoreKG. The async client has no BulkWriter,
+    bulk writes run as concurrent create() calls and atomic WriteBatches instead.
+    """
+
+    def __init__(self,
+                 gcp_project_id: str,
+                 gcp_credential_file: str,
+                 firestore_db_id: str,
+                 node_collection_id: str,
+                 edges_collection_id: str,
+                 community_collection_id: str
+                 ) -> None:
+        super().__init__()
+
+        credentials, _ = google.auth.load_credentials_from_file(gcp_credential_file)
+        self.db = firestore.AsyncClient(project=gcp_project_id,  # type: ignore
+                                        credentials=credentials,
+                                        database=firestore_db_id)
+
+        self.gcp_project_id = gcp_project_id
+        self.database_id = firestore_db_id
+        self.node_coll_id = node_collection_id
+        self.edges_coll_id = edges_collection_id
+        self.community_coll_id = community_collection_id
+        self.tombstone_coll_id = f"{node_collection_id}_tombstones"
+
+    def _encode_embedding(self, embedding):
+        """Stores float32 embeddings as Vector, like FirestoreKG."""
+        return firestore_embedding(self.embedding_codec, embedding)  # type: ignore
+
+    def _decode_embedding(self, value):
+        """Decodes Vector embeddings, bytes are decoded by the embedding_codec."""
+        return super()._decode_embedding(embedding_from_firestore(value))
+
+    async def add_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Adds an node to the knowledge graph.
+
+        The document is written with create(), existing node_uids are rejected server side.
+        """
+        # block NodeData if edge info is included
+        if node_data.edges_to or node_data.edges_from:
+            raise ValueError(
+                f"""Error: NodeData cannot be initiated with edges_to or edges_from. Please add edges separately.""")
+
+        doc_ref = self.db.collection(self.node_coll_id).document(node_uid)
+        try:
+            await doc_ref.create(self._stamped(self._node_record(node_data)))
+        except AlreadyExists as e:
+            raise ValueError(
+                f"Error: Node with node_uid '{node_uid}' already exists.") from e
+        except ValueError as e:
+            raise ValueError(
+                f"Error: Could not add node with node_uid '{node_uid}' to Firestore. Details: {e}"
+            ) from e
+
+    async def add_nodes(self, nodes: Iterable[NodeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many nodes with concurrent create() calls, batch_size nodes at a time.
+
+        Failures, such as existing node_uids, are reported per node_uid in the result.
+        """
+        result = BatchWriteResult()
+        seen_uids: set[str] = set()
+        node_coll = self.db.collection(self.node_coll_id)
+
+        for chunk in batched(nodes, batch_size):
+            valid_nodes = self._validate_bulk_nodes(chunk, seen_uids, result)
+            outcomes = await asyncio.gather(
+                *(node_coll.document(node_data.node_uid).create(self._stamped(self._node_record(node_data)))
+                  for node_data in valid_nodes),
+                return_exceptions=True)
+
+            for node_data, outcome in zip(valid_nodes, outcomes):
+                if isinstance(outcome, AlreadyExists):
+                    result.failed[node_data.node_uid] = f"Error: Node with node_uid '{node_data.node_uid}' already exists."
+                elif isinstance(outcome, Exception):
+                    result.failed[node_data.node_uid] = f"Error: Could not add node with node_uid '{node_data.node_uid}' to Firestore. Details: {outcome}"
+                else:
+                    result.succeeded.append(node_data.node_uid)
+        return result
+
+    async def get_node(self, node_uid: str) -> NodeData:
+        """Retrieves an node from the knowledge graph."""
+        doc_snapshot = await self.db.collection(self.node_coll_id).document(node_uid).get()
+
+        if doc_snapshot.exists:
+            return self._node_from_snapshot(doc_snapshot)
+        else:
+            raise KeyError(f"Error: No node found with node_uid: {node_uid}")
+
+    async def get_nodes(self, node_uids: List[str], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many nodes with one get_all round trip per chunk_size node_uids."""
+        result = BatchReadResult()
+        node_coll = self.db.collection(self.node_coll_id)
+
+        for chunk in batched(dict.fromkeys(node_uids), chunk_size):
+            snapshots = {snapshot.id: snapshot async for snapshot in self.db.get_all(
+                [node_coll.document(node_uid) for node_uid in chunk])}
+            for node_uid in chunk:
+                if snapshots[node_uid].exists:
+                    result.found[node_uid] = self._node_from_snapshot(snapshots[node_uid])
+                else:
+                    result.missing.append(node_uid)
+        return result
+
+    def _node_from_snapshot(self, doc_snapshot) -> NodeData:
+        """Converts a node document snapshot to NodeData."""
+        try:
+            return self._node_from_record(doc_snapshot.to_dict())
+        except (TypeError, KeyError) as e:
+            raise ValueError(
+                f"Error: Data fetched for node_uid '{doc_snapshot.id}' does not match the NodeData format. Details: {e}"
+            ) from e
+
+    async def update_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Updates an existing node in the knowledge graph."""
+        doc_ref = self.db.collection(self.node_coll_id).document(node_uid)
+        try:
+            await doc_ref.update(self._stamped(self._node_record(node_data)))
+        except NotFound as e:
+            raise KeyError(
+                f"Error: Node with node_uid '{node_uid}' does not exist.") from e
+        except ValueError as e:
+            raise ValueError(
+                f"Error: Could not update node with node_uid '{node_uid}' in Firestore. Details: {e}"
+            ) from e
+
+    async def remove_node(self, node_uid: str) -> None:
+        """
+        Removes an node from the knowledge graph.
+        Also removed all edges to and from the node to be removed from all other nodes.
+        """
+        node_coll = self.db.collection(self.node_coll_id)
+
+        # 1. Get the node data to find its connections (raises KeyError if missing)
+        node_data = await self.get_node(node_uid)
+
+        # 2. Only update neighbors that still exist, an update on a missing document fails the batch
+        neighbor_uids = set(node_data.edges_from) | set(node_data.edges_to)
+        existing_neighbors = {snapshot.id async for snapshot in self.db.get_all(
+            [node_coll.document(uid) for uid in neighbor_uids], field_paths=["node_uid"])
+            if snapshot.exists} if neighbor_uids else set()
+
+        writes = []
+        for other_node_uid in neighbor_uids:
+            field_updates = {"updated_at": time.time()}
+            # 3. Remove connections TO this node from other nodes
+            if other_node_uid in node_data.edges_from:
+                field_updates["edges_to"] = ArrayRemove([node_uid])
+                writes.append(("delete", self._edge_doc_ref(other_node_uid, node_uid), None))
+            # 4. Remove connections FROM this node to other nodes
+            if other_node_uid in node_data.edges_to:
+                field_updates["edges_from"] = ArrayRemove([node_uid])
+                writes.append(("delete", self._edge_doc_ref(node_uid, other_node_uid), None))
+            if other_node_uid in existing_neighbors:
+                writes.append(("update", node_coll.document(other_node_uid), field_updates))
+
+        # 5. Finally, remove the node itself and leave a tombstone for refresh_networkx
+        writes.append(("delete", node_coll.document(node_uid), None))
+        writes += self._tombstone_writes(self._tombstone_records(node_uids=[node_uid]))
+        await self._commit_writes(writes)
+
+    async def add_edge(self, edge_data: EdgeData) -> None:
+        """
+        Adds an edge (relationship) between two entities in the knowledge graph.
+
+        The adjacency lists of both nodes are extended server side with ArrayUnion
+        and committed together with the edge documents in one atomic batch.
+        """
+
+        # Type checking for edge_data
+        if not isinstance(edge_data, EdgeData):
+            raise TypeError(
+                f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+
+        try:
+            await self._commit_writes(self._edge_writes([edge_data]))
+        except NotFound as e:
+            # the batch is rejected as a whole if an endpoint is missing
+            for role, node_uid in (("Source", edge_data.source_uid), ("Target", edge_data.target_uid)):
+                if not await self.node_exist(node_uid):
+                    raise KeyError(
+                        f"Error: {role} node with node_uid '{node_uid}' does not exist.") from e
+            raise
+        except ValueError as e:
+            raise ValueError(
+                f"Error: Could not add edge from '{edge_data.source_uid}' to '{edge_data.target_uid}'. Details: {e}"
+            ) from e
+
+    async def add_edges(self, edges: Iterable[EdgeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many edges, merging the adjacency updates of each batch into one write per node.
+
+        Endpoint existence is checked with one get_all per batch. The writes of a batch
+        are committed in WriteBatches, if a commit fails all edges of the batch are
+        reported as failed.
+        """
+        result = BatchWriteResult()
+        node_coll = self.db.collection(self.node_coll_id)
+
+        for chunk in batched(edges, batch_size):
+            endpoint_uids = {uid for e in chunk if isinstance(e, EdgeData)
+                             for uid in (e.source_uid, e.target_uid)}
+            existing_uids = {snapshot.id async for snapshot in self.db.get_all(
+                [node_coll.document(uid) for uid in endpoint_uids], field_paths=["node_uid"])
+                if snapshot.exists} if endpoint_uids else set()
+            valid_edges = self._validate_bulk_edges(chunk, existing_uids, result)
+            if not valid_edges:
+                continue
+
+            edge_uids = [self._generate_edge_uid(source_uid=e.source_uid, target_uid=e.target_uid)
+                         for e in valid_edges]
+            try:
+                await self._commit_writes(self._edge_writes(valid_edges))
+            except Exception as e:
+                for edge_data, edge_uid in zip(valid_edges, edge_uids):
+                    result.failed[edge_uid] = (
+                        f"Error: Could not add edge from '{edge_data.source_uid}' to '{edge_data.target_uid}'. Details: {e}")
+            else:
+                result.succeeded.extend(edge_uids)
+
+        return result
+
+    def _edge_writes(self, edges: list[EdgeData]) -> list[tuple]:
+        """Returns the _commit_writes operations adding edges, one adjacency update per node."""
+        node_coll = self.db.collection(self.node_coll_id)
+        writes = []
+        for node_uid, delta in self._adjacency_deltas(edges).items():
+            writes.append(("update", node_coll.document(node_uid),
+                           {**{field: ArrayUnion(sorted(uids)) for field, uids in delta.items() if uids},
+                            "updated_at": time.time()}))
+        for edge_data in edges:
+            for record in self._edge_records(edge_data):
+                writes.append(("set", self._edge_doc_ref(record["source_uid"], record["target_uid"]), record))
+        return writes
+
+    async def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
+        """Retrieves an edge between two entities from the edges collection."""
+        edge_uid = self._generate_edge_uid(source_uid, target_uid)
+        doc_snapshot = await self._edge_doc_ref(source_uid, target_uid).get()
+
+        if doc_snapshot.exists:
+            try:
+                return EdgeData.__from_dict__(doc_snapshot.to_dict())
+            except (TypeError, KeyError) as e:
+                raise ValueError(
+                    f"Error: Data fetched for edge_uid '{edge_uid}' does not match the EdgeData format. Details: {e}"
+                ) from e
+        else:
+            raise KeyError(f"Error: No edge found with edge_uid: {edge_uid}")
+
+    async def update_edge(self, edge_data: EdgeData) -> None:
+        """Updates an existing edge in the knowledge graph."""
+
+        # 1. Validate input
+        if not isinstance(edge_data, EdgeData):
+            raise TypeError(
+                f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+
+        edge_uid = self._generate_edge_uid(
+            edge_data.source_uid, edge_data.target_uid)
+
+        # 2. Update the edge document and ensure the node references in one batch.
+        # update() fails the batch if the edge document does not exist.
+        node_coll = self.db.collection(self.node_coll_id)
+        record = self._edge_records(edge_data)[0]
+        writes = [
+            ("update", self._edge_doc_ref(edge_data.source_uid, edge_data.target_uid), record),
+            ("update", node_coll.document(edge_data.source_uid),
+             {"edges_to": ArrayUnion([edge_data.target_uid]), "updated_at": time.time()}),
+            ("update", node_coll.document(edge_data.target_uid),
+             {"edges_from": ArrayUnion([edge_data.source_uid]), "updated_at": time.time()}),
+        ]
+        try:
+            await self._commit_writes(writes)
+        except NotFound as e:
+            if not await self.edge_exist(edge_data.source_uid, edge_data.target_uid):
+                raise KeyError(
+                    f"Error: Edge with edge_uid '{edge_uid}' does not exist.") from e
+            raise Exception(
+                f"Error updating edge references in nodes: {e}") from e
+
+    async def remove_edge(self, source_uid: str, target_uid: str) -> None:
+        """Removes an edge between two entities."""
+
+        # Get involved edge data, only needed to know whether the edge is directed
+        edge_data = await self.get_edge(source_uid=source_uid, target_uid=target_uid)
+
+        # remove source -> target from both adjacency lists and the edges collection,
+        # plus the opposite direction if the edge is undirected
+        source_update = {"edges_to": ArrayRemove([target_uid]), "updated_at": time.time()}
+        target_update = {"edges_from": ArrayRemove([source_uid]), "updated_at": time.time()}
+        removed_edges = [(source_uid, target_uid)]
+        if not edge_data.directed:
+            source_update["edges_from"] = ArrayRemove([target_uid])
+            target_update["edges_to"] = ArrayRemove([source_uid])
+            removed_edges.append((target_uid, source_uid))
+
+        node_coll = self.db.collection(self.node_coll_id)
+        writes = [
+            ("update", node_coll.document(source_uid), source_update),
+            ("update", node_coll.document(target_uid), target_update),
+        ]
+        writes += [("delete", self._edge_doc_ref(s, t), None) for s, t in removed_edges]
+        writes += self._tombstone_writes(self._tombstone_records(edges=removed_edges))
+
+        try:
+            await self._commit_writes(writes)
+        except NotFound as e:
+            raise KeyError(
+                f"Error: Source or target node of edge '{edge_data.edge_uid}' does not exist. Details: {e}") from e
+
+    def _tombstone_writes(self, tombstones: list[dict]) -> list[tuple]:
+        """Returns the _commit_writes operations storing tombstone records."""
+        tombstone_coll = self.db.collection(self.tombstone_coll_id)
+        return [("set", tombstone_coll.document(tombstone["tombstone_uid"]), tombstone)
+                for tombstone in tombstones]
+
+    def _edge_doc_ref(self, source_uid: str, target_uid: str):
+        """Returns the document reference of an edge in the edges collection."""
+        return self.db.collection(self.edges_coll_id).document(
+            self._generate_edge_uid(source_uid, target_uid))
+
+    async def _commit_writes(self, writes: list[tuple]) -> None:
+        """Commits (operation, document reference, data) writes in WriteBatches.
+
+        Up to 500 writes are committed atomically in a single batch.
+        """
+        for chunk in batched(writes, 500):
+            batch = self.db.batch()
+            for operation, doc_ref, data in chunk:
+                if operation == "delete":
+                    batch.delete(doc_ref)
+                else:
+                    getattr(batch, operation)(doc_ref, data)
+            await batch.commit()
+
+    def _generate_edge_uid(self, source_uid: str, target_uid: str):
+        return f"{source_uid}_to_{target_uid}"
+
+    async def node_exist(self, node_uid: str) -> bool:
+        """Checks for node existence and returns boolean"""
+        doc_snapshot = await self.db.collection(self.node_coll_id).document(node_uid).get(
+            field_paths=["node_uid"])
+        return doc_snapshot.exists
+
+    async def edge_exist(self, source_uid: str, target_uid: str) -> bool:
+        """Checks for edge existence and returns boolean"""
+        doc_snapshot = await self._edge_doc_ref(source_uid, target_uid).get(
+            field_paths=["edge_uid"])
+        return doc_snapshot.exists
+
+    async def flush_kg(self) -> None:
+        """Method to wipe the complete datastore of the knowledge graph"""
+        for collection_id in [self.node_coll_id, self.edges_coll_id, self.community_coll_id,
+                              self.tombstone_coll_id]:
+            writes = [("delete", doc.reference, None)
+                      async for doc in self.db.collection(collection_id).select([]).stream()]
+            await self._commit_writes(writes)
+
+    async def close(self) -> None:
+        """Closes the async database client of this knowledge graph."""
+        self.db.close()
@@ -0,0 +1,365 @@
+"""MongoDB asyncio Database Operations"""
+
+from typing import Iterable, List
+import time
+
+from pymongo import AsyncMongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from datamodel.data_model import NodeData, EdgeData, BatchWriteResult, BatchReadResult
+from base.async_operations import AsyncNoSQLKnowledgeGraph
+from base.operations import batched
+from databases.connections import ConnectionConfig, mongo_client_options
+from databases.mdb import bson_embedding, embedding_from_bson
+
+
+class AsyncMongoKG(AsyncNoSQLKnowledgeGraph):
+    """
+    MongoDB asyncio Database Operations Class on the native pymongo AsyncMongoClient.
+
+    Works on the same collections as MongoKG. Indexes are provisioned by MongoKG.ensure_indexes.
+    """
+
+    def __init__(self,
+                 mdb_uri: str,
+                 mdb_db_id: str,
+                 node_coll_id: str,
+                 edges_coll_id: str,
+                 community_collection_id: str,
+                 connection_config: ConnectionConfig | None = None
+                 ):
+        super().__init__()
+
+        # The client connects lazily on the first operation
+        self.mdb_client = AsyncMongoClient(
+            str(mdb_uri), **mongo_client_options(connection_config or ConnectionConfig()))
+
+        self.db = self.mdb_client[mdb_db_id]
+        self.mdb_node_coll = self.db[node_coll_id]
+        self.mdbe_edges_coll = self.db[edges_coll_id]
+        self.mdb_comm_coll = self.db[community_collection_id]
+        self.mdb_tombstone_coll = self.db[f"{node_coll_id}_tombstones"]
+
+    def _encode_embedding(self, embedding):
+        """Stores float32 embeddings as BSON Binary vector, like MongoKG."""
+        return bson_embedding(self.embedding_codec, embedding)  # type: ignore
+
+    def _decode_embedding(self, value):
+        """Decodes BSON Binary vectors, generic Binary is read as bytes and decoded by the embedding_codec."""
+        return super()._decode_embedding(embedding_from_bson(value))
+
+    async def add_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Adds an node to the knowledge graph."""
+        # Check if a node with the same node_uid already exists
+        if await self.mdb_node_coll.find_one({"node_uid": node_uid}, {"_id": 1}):
+            raise KeyError(
+                f"Error: Node with node_uid '{node_uid}' already exists.")
+
+        if node_data.edges_to or node_data.edges_from:
+            raise ValueError(
+                f"""Error: NodeData cannot be initiated with edges_to or edges_from. Please add edges separately.""")
+
+        try:
+            await self.mdb_node_coll.insert_one(self._stamped(self._node_record(node_data)))
+        except Exception as e:
+            raise Exception(
+                f"Error adding node with node_uid '{node_uid}': {e}") from e
+
+    async def add_nodes(self, nodes: Iterable[NodeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many nodes with one unordered insert_many per batch_size nodes.
+
+        Existing node_uids are filtered with a single $in lookup per batch.
+        Write errors such as duplicate keys are reported per node_uid in the result.
+        """
+        result = BatchWriteResult()
+        seen_uids: set[str] = set()
+
+        for chunk in batched(nodes, batch_size):
+            valid_nodes = self._validate_bulk_nodes(chunk, seen_uids, result)
+            if not valid_nodes:
+                continue
+
+            existing_uids = {doc["node_uid"] async for doc in self.mdb_node_coll.find(
+                {"node_uid": {"$in": [n.node_uid for n in valid_nodes]}}, {"node_uid": 1})}
+            new_nodes = []
+            for node_data in valid_nodes:
+                if node_data.node_uid in existing_uids:
+                    result.failed[node_data.node_uid] = f"Error: Node with node_uid '{node_data.node_uid}' already exists."
+                else:
+                    new_nodes.append(node_data)
+            if not new_nodes:
+                continue
+
+            write_errors: dict[int, dict] = {}
+            try:
+                await self.mdb_node_coll.insert_many(
+                    [self._stamped(self._node_record(n)) for n in new_nodes], ordered=False)
+            except BulkWriteError as e:
+                write_errors = {err["index"]: err for err in e.details.get("writeErrors", [])}
+
+            for i, node_data in enumerate(new_nodes):
+                if i not in write_errors:
+                    result.succeeded.append(node_data.node_uid)
+                elif write_errors[i].get("code") == 11000:  # duplicate key
+                    result.failed[node_data.node_uid] = f"Error: Node with node_uid '{node_data.node_uid}' already exists."
+                else:
+                    result.failed[node_data.node_uid] = f"Error adding node with node_uid '{node_data.node_uid}': {write_errors[i].get('errmsg')}"
+
+        return result
+
+    async def get_node(self, node_uid: str) -> NodeData:
+        """Retrieves an node from the knowledge graph."""
+        node_data_dict = await self.mdb_node_coll.find_one({"node_uid": node_uid})
+
+        if node_data_dict:
+            return self._node_from_record(node_data_dict)
+        else:
+            raise KeyError(f"Error: No node found with node_uid: {node_uid}")
+
+    async def get_nodes(self, node_uids: List[str], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many nodes with one $in query per chunk_size node_uids."""
+        result = BatchReadResult()
+
+        for chunk in batched(dict.fromkeys(node_uids), chunk_size):
+            docs = {doc["node_uid"]: doc async for doc in self.mdb_node_coll.find(
+                {"node_uid": {"$in": chunk}})}
+            for node_uid in chunk:
+                if node_uid in docs:
+                    result.found[node_uid] = self._node_from_record(docs[node_uid])
+                else:
+                    result.missing.append(node_uid)
+        return result
+
+    async def update_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Updates an existing node in the knowledge graph."""
+        update_result = await self.mdb_node_coll.update_one(
+            {"node_uid": node_uid}, {"$set": self._stamped(self._node_record(node_data))})
+        if update_result.matched_count == 0:
+            raise KeyError(
+                f"Error: Node with node_uid '{node_uid}' does not exist.")
+
+    async def remove_node(self, node_uid: str) -> None:
+        """Removes a node from the knowledge graph."""
+
+        # 1. Get the node data to find its connections (raises KeyError if missing)
+        node_data = await self.get_node(node_uid)
+
+        # 2. Remove connections TO and FROM this node from other nodes with $pull
+        neighbor_ops = []
+        for other_node_uid in set(node_data.edges_from) | set(node_data.edges_to):
+            pulls = {}
+            if other_node_uid in node_data.edges_from:
+                pulls["edges_to"] = node_uid
+            if other_node_uid in node_data.edges_to:
+                pulls["edges_from"] = node_uid
+            neighbor_ops.append(UpdateOne({"node_uid": other_node_uid},
+                                          {"$pull": pulls, "$set": {"updated_at": time.time()}}))
+        if neighbor_ops:
+            await self.mdb_node_coll.bulk_write(neighbor_ops, ordered=False)
+
+        # 3. Remove the edge records of the node's connections
+        edge_uids = [self._generate_edge_uid(other_node_uid, node_uid) for other_node_uid in node_data.edges_from]
+        edge_uids += [self._generate_edge_uid(node_uid, other_node_uid) for other_node_uid in node_data.edges_to]
+        if edge_uids:
+            await self.mdbe_edges_coll.delete_many({"edge_uid": {"$in": edge_uids}})
+
+        # 4. Finally, remove the node itself and leave a tombstone for refresh_networkx
+        delete_result = await self.mdb_node_coll.delete_one({"node_uid": node_uid})
+        if delete_result.deleted_count == 1:
+            await self._write_tombstones(self._tombstone_records(node_uids=[node_uid]))
+            return None
+        else:
+            raise KeyError(f"Error: No node found with node_uid: {node_uid}")
+
+    async def add_edge(self, edge_data: EdgeData) -> None:
+        """Adds an edge (relationship) between two entities in the knowledge graph.
+
+        Node adjacency lists are extended server side with $addToSet.
+        """
+
+        # Type checking for edge_data
+        if not isinstance(edge_data, EdgeData):
+            raise TypeError(
+                f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+
+        # Check if source and target nodes exist with a single lookup
+        existing_uids = {doc["node_uid"] async for doc in self.mdb_node_coll.find(
+            {"node_uid": {"$in": [edge_data.source_uid, edge_data.target_uid]}}, {"node_uid": 1})}
+        if edge_data.source_uid not in existing_uids:
+            raise KeyError(
+                f"Error: Source node with node_uid '{edge_data.source_uid}' does not exist.")
+        if edge_data.target_uid not in existing_uids:
+            raise KeyError(
+                f"Error: Target node with node_uid '{edge_data.target_uid}' does not exist.")
+
+        await self.mdb_node_coll.bulk_write([
+            UpdateOne({"node_uid": node_uid},
+                      {"$addToSet": {field: {"$each": sorted(uids)}
+                                     for field, uids in delta.items() if uids},
+                       "$set": {"updated_at": time.time()}})
+            for node_uid, delta in self._adjacency_deltas([edge_data]).items()])
+
+        # Add the edge, and the reverse edge if undirected, to the edges collection
+        await self.mdbe_edges_coll.bulk_write([
+            UpdateOne({"edge_uid": record["edge_uid"]}, {"$set": record}, upsert=True)
+            for record in self._edge_records(edge_data)])
+
+    async def add_edges(self, edges: Iterable[EdgeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many edges, merging the adjacency updates of each batch into one update per node.
+
+        An edge is reported as failed if any write it depends on failed.
+        """
+        result = BatchWriteResult()
+
+        for chunk in batched(edges, batch_size):
+            endpoint_uids = {uid for e in chunk if isinstance(e, EdgeData)
+                             for uid in (e.source_uid, e.target_uid)}
+            existing_uids = {doc["node_uid"] async for doc in self.mdb_node_coll.find(
+                {"node_uid": {"$in": list(endpoint_uids)}}, {"node_uid": 1})}
+            valid_edges = self._validate_bulk_edges(chunk, existing_uids, result)
+            if not valid_edges:
+                continue
+
+            node_ops, edge_ops = [], []
+            node_op_index: dict[str, int] = {}
+            for node_uid, delta in self._adjacency_deltas(valid_edges).items():
+                node_op_index[node_uid] = len(node_ops)
+                node_ops.append(UpdateOne(
+                    {"node_uid": node_uid},
+                    {"$addToSet": {field: {"$each": sorted(uids)}
+                                   for field, uids in delta.items() if uids},
+                     "$set": {"updated_at": time.time()}}))
+
+            edge_op_index: dict[str, list[int]] = {}
+            for edge_data in valid_edges:
+                edge_uid = self._generate_edge_uid(edge_data.source_uid, edge_data.target_uid)
+                for record in self._edge_records(edge_data):
+                    edge_op_index.setdefault(edge_uid, []).append(len(edge_ops))
+                    edge_ops.append(UpdateOne(
+                        {"edge_uid": record["edge_uid"]}, {"$set": record}, upsert=True))
+
+            node_errors = await self._bulk_write_errors(self.mdb_node_coll, node_ops)
+            edge_errors = await self._bulk_write_errors(self.mdbe_edges_coll, edge_ops)
+
+            for edge_data in valid_edges:
+                edge_uid = self._generate_edge_uid(edge_data.source_uid, edge_data.target_uid)
+                errors = [node_errors[node_op_index[uid]]
+                          for uid in (edge_data.source_uid, edge_data.target_uid)
+                          if node_op_index[uid] in node_errors]
+                errors += [edge_errors[i] for i in edge_op_index[edge_uid] if i in edge_errors]
+                if errors:
+                    result.failed[edge_uid] = (
+                        f"Error: Could not add edge from '{edge_data.source_uid}' to '{edge_data.target_uid}'. Details: {errors[0]}")
+                else:
+                    result.succeeded.append(edge_uid)
+
+        return result
+
+    async def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
+        """Retrieves an edge between two entities."""
+        edge_uid = self._generate_edge_uid(source_uid, target_uid)
+        edge_data_dict = await self.mdbe_edges_coll.find_one({"edge_uid": edge_uid})
+
+        if edge_data_dict:
+            return EdgeData.__from_dict__(edge_data_dict)
+        else:
+            raise KeyError(f"Error: No edge found with edge_uid: {edge_uid}")
+
+    async def update_edge(self, edge_data: EdgeData) -> None:
+        """Updates an existing edge in the knowledge graph."""
+
+        if not isinstance(edge_data, EdgeData):
+            raise TypeError(
+                f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+
+        edge_uid = self._generate_edge_uid(
+            edge_data.source_uid, edge_data.target_uid)
+
+        # Update the edge document, fails if the edge does not exist
+        update_result = await self.mdbe_edges_coll.update_one(
+            {"edge_uid": edge_uid}, {"$set": self._edge_records(edge_data)[0]})
+        if update_result.matched_count == 0:
+            raise KeyError(
+                f"Error: Edge with edge_uid '{edge_uid}' does not exist.")
+
+        # Ensure edge references in the NODES collection
+        await self.mdb_node_coll.bulk_write([
+            UpdateOne({"node_uid": edge_data.source_uid},
+                      {"$addToSet": {"edges_to": edge_data.target_uid},
+                       "$set": {"updated_at": time.time()}}),
+            UpdateOne({"node_uid": edge_data.target_uid},
+                      {"$addToSet": {"edges_from": edge_data.source_uid},
+                       "$set": {"updated_at": time.time()}}),
+        ])
+
+    async def remove_edge(self, source_uid: str, target_uid: str) -> None:
+        """Removes an edge between two entities."""
+
+        # Get involved edge data, only needed to know whether the edge is directed
+        edge_data = await self.get_edge(source_uid=source_uid, target_uid=target_uid)
+
+        source_pulls = {"edges_to": target_uid}
+        target_pulls = {"edges_from": source_uid}
+        removed_edges = [(source_uid, target_uid)]
+        if not edge_data.directed:
+            source_pulls["edges_from"] = target_uid
+            target_pulls["edges_to"] = source_uid
+            removed_edges.append((target_uid, source_uid))
+        edge_uids = [self._generate_edge_uid(s, t) for s, t in removed_edges]
+
+        bulk_result = await self.mdb_node_coll.bulk_write([
+            UpdateOne({"node_uid": source_uid},
+                      {"$pull": source_pulls, "$set": {"updated_at": time.time()}}),
+            UpdateOne({"node_uid": target_uid},
+                      {"$pull": target_pulls, "$set": {"updated_at": time.time()}}),
+        ])
+        if bulk_result.matched_count < 2:
+            raise KeyError(
+                f"Error: Source or target node of edge '{edge_uids[0]}' does not exist.")
+
+        # Remove the edge records and leave tombstones for refresh_networkx
+        await self.mdbe_edges_coll.delete_many({"edge_uid": {"$in": edge_uids}})
+        await self._write_tombstones(self._tombstone_records(edges=removed_edges))
+
+    def _generate_edge_uid(self, source_uid: str, target_uid: str):
+        return f"{source_uid}_to_{target_uid}"
+
+    @staticmethod
+    async def _bulk_write_errors(collection, operations: list) -> dict[int, str]:
+        """Runs an unordered bulk_write and returns the error message per failed operation index."""
+        if not operations:
+            return {}
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            return {err["index"]: err.get("errmsg", "") for err in e.details.get("writeErrors", [])}
+        return {}
+
+    async def _write_tombstones(self, tombstones: list[dict]) -> None:
+        """Upserts tombstone records into the tombstone collection."""
+        if tombstones:
+            await self.mdb_tombstone_coll.bulk_write([
+                UpdateOne({"tombstone_uid": tombstone["tombstone_uid"]}, {"$set": tombstone}, upsert=True)
+                for tombstone in tombstones], ordered=False)
+
+    async def edge_exist(self, source_uid: str, target_uid: str) -> bool:
+        """Checks for edge existence and returns boolean"""
+        edge_uid = self._generate_edge_uid(source_uid, target_uid)
+        return await self.mdbe_edges_coll.find_one({"edge_uid": edge_uid}, {"_id": 1}) is not None
+
+    async def node_exist(self, node_uid: str) -> bool:
+        """Checks for node existence and returns boolean"""
+        return await self.mdb_node_coll.find_one({"node_uid": node_uid}, {"_id": 1}) is not None
+
+    async def flush_kg(self) -> None:
+        """Method to wipe the complete datastore of the knowledge graph.
+
+        Documents are deleted instead of dropping the collections, so indexes are kept.
+        """
+        for collection in [self.mdb_node_coll, self.mdbe_edges_coll,
+                           self.mdb_comm_coll, self.mdb_tombstone_coll]:
+            await collection.delete_many({})
+
+    async def close(self) -> None:
+        """Closes the async database client of this knowledge graph."""
+        await self.mdb_client.close()
@@ -0,0 +1,417 @@
+"""Neo4j asyncio database operations"""
+
+import time
+from collections import defaultdict
+from typing import Iterable, List
+
+from neo4j import AsyncGraphDatabase
+from neo4j.exceptions import ConstraintError
+
+from base.async_operations import AsyncNoSQLKnowledgeGraph
+from base.operations import batched
+from datamodel.data_model import NodeData, EdgeData, BatchWriteResult, BatchReadResult
+from databases.connections import ConnectionConfig, neo4j_driver_options
+
+
+class AsyncAuraKG(AsyncNoSQLKnowledgeGraph):
+    """
+    Neo4j asyncio database operations class on the native AsyncDriver.
+
+    Uses the same :Entity data model as AuraKG, the schema is provisioned by AuraKG.ensure_schema.
+    """
+
+    def __init__(self,
+                 uri: str,
+                 auth: tuple[str, str],
+                 connection_config: ConnectionConfig | None = None
+                 ):
+        super().__init__()
+        self.uri = uri
+        self.auth = auth
+
+        # The driver connects lazily on the first query
+        self.driver = AsyncGraphDatabase.driver(
+            uri, auth=auth, **neo4j_driver_options(connection_config or ConnectionConfig()))
+
+    async def _execute_query(self, query: str, **parameters):
+        """Runs a query with driver.execute_query.
+
+        execute_query runs the query in a managed transaction, which the driver retries
+        itself on transient failures such as a lost connection. Queries are not re-run
+        here, a write whose commit acknowledgement was lost would be applied twice.
+        """
+        return await self.driver.execute_query(query, **parameters)
+
+    async def add_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Adds an node to the knowledge graph."""
+        try:
+            await self._execute_query(
+                "CREATE (n:Entity:" + node_data.node_type + ") SET n = $row",
+                row=self._stamped(self._node_record(node_data))
+            )
+        except ConstraintError as e:
+            raise ValueError(
+                f"Error: Node with node_uid '{node_uid}' already exists.") from e
+
+    async def add_nodes(self, nodes: Iterable[NodeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many nodes with one UNWIND ... CREATE query per node type and batch.
+
+        Rows whose node_uid already exists are skipped by the query and reported
+        as failed in the result.
+        """
+        result = BatchWriteResult()
+        seen_uids: set[str] = set()
+
+        for chunk in batched(nodes, batch_size):
+            valid_nodes = self._validate_bulk_nodes(chunk, seen_uids, result)
+
+            # labels cannot be parameterized, so rows are grouped by node_type
+            rows_by_type: dict[str, list[dict]] = defaultdict(list)
+            for node_data in valid_nodes:
+                rows_by_type[node_data.node_type].append(self._stamped(self._node_record(node_data)))
+
+            for node_type, rows in rows_by_type.items():
+                records, _, _ = await self._execute_query(
+                    """
+                    UNWIND $rows AS row
+                    OPTIONAL MATCH (existing:Entity {node_uid: row.node_uid})
+                    WITH row, existing WHERE existing IS NULL
+                    CREATE (n:Entity:""" + node_type + """)
+                    SET n = row
+                    RETURN n.node_uid AS node_uid
+                    """,
+                    rows=rows
+                )
+                created_uids = {record["node_uid"] for record in records}
+                for row in rows:
+                    if row["node_uid"] in created_uids:
+                        result.succeeded.append(row["node_uid"])
+                    else:
+                        result.failed[row["node_uid"]] = f"Error: Node with node_uid '{row['node_uid']}' already exists."
+
+        return result
+
+    async def get_node(self, node_uid: str) -> NodeData:
+        """Retrieves a node from the knowledge graph."""
+        records, _, _ = await self._execute_query(
+            "MATCH (n:Entity {node_uid: $node_uid}) RETURN n",
+            node_uid=node_uid
+        )
+
+        if records:
+            return self._node_from_record(dict(records[0]['n']))
+        else:
+            raise KeyError(
+                f"Error: No node found with node_uid: {node_uid}")
+
+    async def get_nodes(self, node_uids: List[str], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many nodes with one UNWIND query per chunk_size node_uids."""
+        result = BatchReadResult()
+
+        for chunk in batched(dict.fromkeys(node_uids), chunk_size):
+            records, _, _ = await self._execute_query(
+                """
+                UNWIND $node_uids AS node_uid
+                MATCH (n:Entity {node_uid: node_uid})
+                RETURN n
+                """,
+                node_uids=chunk
+            )
+            nodes = {record["n"]["node_uid"]: record["n"] for record in records}
+            for node_uid in chunk:
+                if node_uid in nodes:
+                    result.found[node_uid] = self._node_from_record(dict(nodes[node_uid]))
+                else:
+                    result.missing.append(node_uid)
+        return result
+
+    async def update_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Updates an existing node in the knowledge graph."""
+        row = self._stamped(self._node_record(node_data))
+        row.pop("node_uid")
+        records, _, _ = await self._execute_query(
+            """
+            MATCH (n:Entity {node_uid: $node_uid})
+            SET n += $row
+            RETURN count(n) AS updated
+            """,
+            node_uid=node_uid,
+            row=row
+        )
+
+        if not records or records[0]["updated"] == 0:
+            raise KeyError(
+                f"Error: Node with node_uid '{node_uid}' does not exist.")
+
+    async def remove_node(self, node_uid: str) -> None:
+        """Removes a node from the knowledge graph and its uid from the adjacency lists of its neighbors."""
+        summary = (await self._execute_query(
+            """
+            MATCH (n:Entity {node_uid: $node_uid})
+            OPTIONAL MATCH (n)--(m)
+            WITH n, collect(DISTINCT m) AS neighbors
+            FOREACH (m IN neighbors |
+                SET m.edges_to = [uid IN coalesce(m.edges_to, []) WHERE uid <> $node_uid],
+                    m.edges_from = [uid IN coalesce(m.edges_from, []) WHERE uid <> $node_uid],
+                    m.updated_at = $updated_at)
+            DETACH DELETE n
+            """,
+            node_uid=node_uid,
+            updated_at=time.time()
+        )).summary
+
+        if summary.counters.nodes_deleted == 0:
+            raise KeyError(
+                f"Error: No node found with node_uid: {node_uid}")
+
+        # leave a tombstone for refresh_networkx
+        await self._write_tombstones(self._tombstone_records(node_uids=[node_uid]))
+
+    async def add_edge(self, edge_data: EdgeData) -> None:
+        """Adds an edge (relationship) between two entities in the knowledge graph.
+
+        The relationship and the adjacency lists of both nodes are written in a single query.
+        """
+        if not isinstance(edge_data, EdgeData):
+            raise TypeError(
+                f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+
+        if edge_data.directed:
+            query = """
+            MATCH (source:Entity {node_uid: $source_uid}), (target:Entity {node_uid: $target_uid})
+            SET source.edges_to = coalesce(source.edges_to, []) + [uid IN [$target_uid] WHERE NOT uid IN coalesce(source.edges_to, [])],
+                target.edges_from = coalesce(target.edges_from, []) + [uid IN [$source_uid] WHERE NOT uid IN coalesce(target.edges_from, [])],
+                source.updated_at = $updated_at,
+                target.updated_at = $updated_at
+            MERGE (source)-[r:DIRECTED]->(target)
+            SET r.description = $description, r.updated_at = $updated_at
+            """
+        else:
+            query = """
+            MATCH (source:Entity {node_uid: $source_uid}), (target:Entity {node_uid: $target_uid})
+            SET source.edges_to = coalesce(source.edges_to, []) + [uid IN [$target_uid] WHERE NOT uid IN coalesce(source.edges_to, [])],
+                source.edges_from = coalesce(source.edges_from, []) + [uid IN [$target_uid] WHERE NOT uid IN coalesce(source.edges_from, [])],
+                target.edges_to = coalesce(target.edges_to, []) + [uid IN [$source_uid] WHERE NOT uid IN coalesce(target.edges_to, [])],
+                target.edges_from = coalesce(target.edges_from, []) + [uid IN [$source_uid] WHERE NOT uid IN coalesce(target.edges_from, [])],
+                source.updated_at = $updated_at,
+                target.updated_at = $updated_at
+            MERGE (source)-[r1:UNDIRECTED]->(target)
+            MERGE (target)-[r2:UNDIRECTED]->(source)
+            SET r1.description = $description, r2.description = $description,
+                r1.updated_at = $updated_at, r2.updated_at = $updated_at
+            """
+
+        records, _, _ = await self._execute_query(
+            query + "RETURN count(*) AS matched",
+            source_uid=edge_data.source_uid,
+            target_uid=edge_data.target_uid,
+            description=edge_data.description,
+            updated_at=time.time()
+        )
+
+        if not records or records[0]["matched"] == 0:
+            raise KeyError(
+                f"Error: Source node '{edge_data.source_uid}' or target node '{edge_data.target_uid}' does not exist.")
+
+    async def add_edges(self, edges: Iterable[EdgeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many edges with UNWIND queries, one write transaction per batch.
+
+        The adjacency updates of a batch are merged into one row per node, so every
+        node's edges_to / edges_from lists are extended exactly once per batch.
+        """
+        result = BatchWriteResult()
+
+        for chunk in batched(edges, batch_size):
+            endpoint_uids = {uid for e in chunk if isinstance(e, EdgeData)
+                             for uid in (e.source_uid, e.target_uid)}
+            records, _, _ = await self._execute_query(
+                """
+                UNWIND $node_uids AS node_uid
+                MATCH (n:Entity {node_uid: node_uid})
+                RETURN n.node_uid AS node_uid
+                """,
+                node_uids=list(endpoint_uids)
+            )
+            existing_uids = {record["node_uid"] for record in records}
+            valid_edges = self._validate_bulk_edges(chunk, existing_uids, result)
+            if not valid_edges:
+                continue
+
+            node_rows = [self._stamped({"node_uid": node_uid,
+                                        "edges_to": sorted(delta["edges_to"]),
+                                        "edges_from": sorted(delta["edges_from"])})
+                         for node_uid, delta in self._adjacency_deltas(valid_edges).items()]
+            edge_rows = [self._stamped({"source_uid": e.source_uid,
+                                        "target_uid": e.target_uid,
+                                        "description": e.description,
+                                        "directed": e.directed}) for e in valid_edges]
+
+            try:
+                async with self.driver.session() as session:
+                    await session.execute_write(self._write_edge_batch, node_rows, edge_rows)
+            except Exception as e:
+                for edge_data in valid_edges:
+                    result.failed[self._generate_edge_uid(edge_data.source_uid, edge_data.target_uid)] = (
+                        f"Error: Could not add edge from '{edge_data.source_uid}' to '{edge_data.target_uid}'. Details: {e}")
+            else:
+                result.succeeded.extend(self._generate_edge_uid(e.source_uid, e.target_uid)
+                                        for e in valid_edges)
+
+        return result
+
+    @staticmethod
+    async def _write_edge_batch(tx, node_rows: list[dict], edge_rows: list[dict]) -> None:
+        """Transaction function extending node adjacency lists and merging relationships for a batch."""
+        await (await tx.run(
+            """
+            UNWIND $rows AS row
+            MATCH (n:Entity {node_uid: row.node_uid})
+            WITH n, row, coalesce(n.edges_to, []) AS edges_to, coalesce(n.edges_from, []) AS edges_from
+            SET n.edges_to = edges_to + [uid IN row.edges_to WHERE NOT uid IN edges_to],
+                n.edges_from = edges_from + [uid IN row.edges_from WHERE NOT uid IN edges_from],
+                n.updated_at = row.updated_at
+            """,
+            rows=node_rows
+        )).consume()
+        await (await tx.run(
+            """
+            UNWIND $rows AS row
+            WITH row WHERE row.directed
+            MATCH (source:Entity {node_uid: row.source_uid}), (target:Entity {node_uid: row.target_uid})
+            MERGE (source)-[r:DIRECTED]->(target)
+            SET r.description = row.description, r.updated_at = row.updated_at
+            """,
+            rows=edge_rows
+        )).consume()
+        await (await tx.run(
+            """
+            UNWIND $rows AS row
+            WITH row WHERE NOT row.directed
+            MATCH (source:Entity {node_uid: row.source_uid}), (target:Entity {node_uid: row.target_uid})
+            MERGE (source)-[r1:UNDIRECTED]->(target)
+            MERGE (target)-[r2:UNDIRECTED]->(source)
+            SET r1.description = row.description, r2.description = row.description,
+                r1.updated_at = row.updated_at, r2.updated_at = row.updated_at
+            """,
+            rows=edge_rows
+        )).consume()
+
+    async def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
+        """Retrieves an edge between two entities."""
+        records, _, _ = await self._execute_query(
+            """
+            MATCH (source:Entity {node_uid: $source_uid})-[r]->(target:Entity {node_uid: $target_uid})
+            RETURN r
+            """,
+            source_uid=source_uid,
+            target_uid=target_uid
+        )
+
+        if records:
+            record = records[0][0]
+            return EdgeData(source_uid=source_uid, target_uid=target_uid, description=record.get('description'),
+                            directed=record.type == "DIRECTED", edge_uid=self._generate_edge_uid(source_uid, target_uid))
+        else:
+            raise KeyError(
+                f"Error: No edge found between source_uid: '{source_uid}' and target_uid: '{target_uid}'")
+
+    async def update_edge(self, edge_data: EdgeData) -> None:
+        """Updates an existing edge in the knowledge graph."""
+        records, _, _ = await self._execute_query(
+            """
+            MATCH (source:Entity {node_uid: $source_uid})-[r]->(target:Entity {node_uid: $target_uid})
+            SET r.description = $description,
+                r.updated_at = $updated_at,
+                source.edges_to = coalesce(source.edges_to, []) + [uid IN [$target_uid] WHERE NOT uid IN coalesce(source.edges_to, [])],
+                target.edges_from = coalesce(target.edges_from, []) + [uid IN [$source_uid] WHERE NOT uid IN coalesce(target.edges_from, [])],
+                source.updated_at = $updated_at,
+                target.updated_at = $updated_at
+            RETURN count(r) AS updated
+            """,
+            source_uid=edge_data.source_uid,
+            target_uid=edge_data.target_uid,
+            description=edge_data.description,
+            updated_at=time.time()
+        )
+
+        if not records or records[0]["updated"] == 0:
+            raise KeyError(
+                f"Error: No edge found between source_uid: '{edge_data.source_uid}' and target_uid: '{edge_data.target_uid}'")
+
+    async def remove_edge(self, source_uid: str, target_uid: str) -> None:
+        """Removes an edge between two entities, undirected edges in both directions."""
+        records, summary, _ = await self._execute_query(
+            """
+            MATCH (source:Entity {node_uid: $source_uid})-[r]->(target:Entity {node_uid: $target_uid})
+            WITH source, target, r, type(r) = 'UNDIRECTED' AS undirected
+            OPTIONAL MATCH (target)-[reverse:UNDIRECTED]->(source) WHERE undirected
+            DELETE r, reverse
+            SET source.edges_to = [uid IN coalesce(source.edges_to, []) WHERE uid <> $target_uid],
+                target.edges_from = [uid IN coalesce(target.edges_from, []) WHERE uid <> $source_uid],
+                source.edges_from = CASE WHEN undirected
+                    THEN [uid IN coalesce(source.edges_from, []) WHERE uid <> $target_uid]
+                    ELSE source.edges_from END,
+                target.edges_to = CASE WHEN undirected
+                    THEN [uid IN coalesce(target.edges_to, []) WHERE uid <> $source_uid]
+                    ELSE target.edges_to END,
+                source.updated_at = $updated_at,
+                target.updated_at = $updated_at
+            RETURN undirected
+            """,
+            source_uid=source_uid,
+            target_uid=target_uid,
+            updated_at=time.time()
+        )
+
+        if summary.counters.relationships_deleted == 0:
+            raise KeyError(
+                f"Error: No edge found between source_uid: '{source_uid}' and target_uid: '{target_uid}'")
+
+        # leave tombstones for refresh_networkx
+        removed_edges = [(source_uid, target_uid)]
+        if records[0]["undirected"]:
+            removed_edges.append((target_uid, source_uid))
+        await self._write_tombstones(self._tombstone_records(edges=removed_edges))
+
+    async def _write_tombstones(self, tombstones: list[dict]) -> None:
+        """Merges tombstone records as :Tombstone nodes, which are not labeled :Entity."""
+        await self._execute_query(
+            """
+            UNWIND $rows AS row
+            MERGE (t:Tombstone {tombstone_uid: row.tombstone_uid})
+            SET t += row
+            """,
+            rows=tombstones
+        )
+
+    def _generate_edge_uid(self, source_uid: str, target_uid: str) -> str:
+        """Generates Edge uid for the network based on source and target nod uid"""
+        return f"{source_uid}_to_{target_uid}"
+
+    async def edge_exist(self, source_uid: str, target_uid: str) -> bool:
+        """Checks for edge existence and returns boolean"""
+        records, _, _ = await self._execute_query(
+            """
+            MATCH (:Entity {node_uid: $source_uid})-[r]->(:Entity {node_uid: $target_uid})
+            RETURN count(r) > 0 AS exists
+            """,
+            source_uid=source_uid,
+            target_uid=target_uid
+        )
+        return records[0]["exists"]
+
+    async def node_exist(self, node_uid: str) -> bool:
+        """Checks for node existence and returns boolean"""
+        records, _, _ = await self._execute_query(
+            "MATCH (n:Entity {node_uid: $node_uid}) RETURN count(n) > 0 AS exists",
+            node_uid=node_uid
+        )
+        return records[0]["exists"]
+
+    async def flush_kg(self) -> None:
+        """Method to wipe the complete datastore of the knowledge graph"""
+        await self._execute_query("MATCH (n) DETACH DELETE n")
+
+    async def close(self) -> None:
+        """Closes the async database driver of this knowledge graph."""
+        await self.driver.close()
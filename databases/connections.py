@@ -0,0 +1,116 @@
+"""Shared database clients and drivers, one per connection target across knowledge graph instances"""
+
+import threading
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+import firebase_admin  # type: ignore
+from firebase_admin import firestore
+import google.auth
+
+from neo4j import Driver, GraphDatabase
+from pymongo.mongo_client import MongoClient
+from pymongo.server_api import ServerApi
+
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class ConnectionConfig:
+    """Connection pool settings of the shared Neo4j driver and MongoDB client"""
+    max_pool_size: int = 100  # maximum number of pooled connections per driver / client
+    connect_timeout: float = 30.0  # seconds to establish a new connection
+    acquisition_timeout: float = 60.0  # seconds to wait for a free connection from the pool
+    keep_alive: bool = True  # TCP keep-alive of Neo4j connections, always enabled by pymongo
+
+
+def neo4j_driver_options(config: ConnectionConfig) -> dict:
+    """Returns the keyword arguments of GraphDatabase.driver / AsyncGraphDatabase.driver for config."""
+    return {"max_connection_pool_size": config.max_pool_size,
+            "connection_timeout": config.connect_timeout,
+            "connection_acquisition_timeout": config.acquisition_timeout,
+            "keep_alive": config.keep_alive}
+
+
+def mongo_client_options(config: ConnectionConfig) -> dict:
+    """Returns the keyword arguments of MongoClient / AsyncMongoClient for config."""
+    return {"server_api": ServerApi('1'),
+            "maxPoolSize": config.max_pool_size,
+            "connectTimeoutMS": int(config.connect_timeout * 1000),
+            "waitQueueTimeoutMS": int(config.acquisition_timeout * 1000)}
+
+
+_connections: dict[tuple, object] = {}
+_connections_lock = threading.Lock()
+
+
+def _shared(key: tuple, create: Callable[[], T]) -> T:
+    """Returns the connection stored under key, creating it on first use."""
+    with _connections_lock:
+        if key not in _connections:
+            _connections[key] = create()
+        return _connections[key]  # type: ignore
+
+
+def get_neo4j_driver(uri: str, auth: tuple[str, str],
+                     config: ConnectionConfig = ConnectionConfig()) -> Driver:
+    """Returns the Neo4j driver shared for uri, auth and config.
+
+    Connectivity is verified once when the driver is created, not per query.
+    """
+    def _create() -> Driver:
+        driver = GraphDatabase.driver(uri, auth=auth, **neo4j_driver_options(config))
+        try:
+            driver.verify_connectivity()
+        except Exception:
+            driver.close()
+            raise
+        return driver
+
+    return _shared(("neo4j", uri, tuple(auth), config), _create)
+
+
+def get_mongo_client(uri: str, config: ConnectionConfig = ConnectionConfig()) -> MongoClient:
+    """Returns the MongoDB client shared for uri and config.
+
+    The deployment is pinged once when the client is created, not per operation.
+    """
+    def _create() -> MongoClient:
+        client = MongoClient(uri, **mongo_client_options(config))
+        try:
+            client.admin.command('ping')
+        except Exception:
+            client.close()
+            raise
+        print("Pinged your deployment. You successfully connected to MongoDB!")
+        return client
+
+    return _shared(("mongodb", uri, config), _create)
+
+
+def get_firestore_client(gcp_project_id: str, gcp_credential_file: str,
+                         firestore_db_id: str) -> firestore.Client:
+    """Returns the Firestore client shared for project, credential file and database.
+
+    Firestore multiplexes requests over the gRPC channel of the client, so
+    ConnectionConfig does not apply.
+    """
+    def _create() -> firestore.Client:
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(
+                firebase_admin.credentials.Certificate(gcp_credential_file))
+        credentials, _ = google.auth.load_credentials_from_file(gcp_credential_file)
+        return firestore.Client(project=gcp_project_id,  # type: ignore
+                                credentials=credentials,
+                                database=firestore_db_id)
+
+    return _shared(("firestore", gcp_project_id, gcp_credential_file, firestore_db_id), _create)
+
+
+def close_connections() -> None:
+    """Closes all shared drivers and clients, e.g. before the process exits."""
+    with _connections_lock:
+        for connection in _connections.values():
+            connection.close()  # type: ignore
+        _connections.clear()
@@ -1,17 +1,54 @@
 """Firestore database operations implementation"""
 
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List
+import time
 
-import firebase_admin  # type: ignore
-from firebase_admin import firestore
+from google.api_core.exceptions import Conflict, NotFound
+from google.cloud.firestore_v1 import ArrayRemove, ArrayUnion
+from google.cloud.firestore_v1.base_query import FieldFilter
 from google.cloud.firestore_v1.base_vector_query import DistanceMeasure
+from google.cloud.firestore_v1.bulk_writer import BulkWriteFailure, BulkWriter
 from google.cloud.firestore_v1.vector import Vector
-import google.auth
+from google.rpc import code_pb2
 
+import numpy as np
 import networkx as nx  # type: ignore
 
-from datamodel.data_model import NodeData, EdgeData, CommunityData
-from base.operations import NoSQLKnowledgeGraph
+from datamodel.data_model import NodeData, EdgeData, CommunityData, BatchWriteResult, BatchReadResult, GraphChanges, NeighborData, NeighborBatchData, CommunityNeighborData
+from base.codec import EmbeddingCodec
+from base.operations import NoSQLKnowledgeGraph, batched
+from databases.connections import get_firestore_client
+
+
+_DISTANCE_FIELD = "vector_distance"  # result field of find_nearest carrying the computed distance
+_DISTANCE_MEASURES = {"cosine": DistanceMeasure.COSINE,
+                      "dot": DistanceMeasure.DOT_PRODUCT,
+                      "euclidean": DistanceMeasure.EUCLIDEAN}
+
+
+# grpc status codes that will not succeed on retry within a BulkWriter
+_PERMANENT_WRITE_ERRORS = {
+    code_pb2.INVALID_ARGUMENT,
+    code_pb2.NOT_FOUND,
+    code_pb2.ALREADY_EXISTS,
+    code_pb2.FAILED_PRECONDITION,
+}
+_MAX_WRITE_ATTEMPTS = 5
+
+
+def firestore_embedding(codec: EmbeddingCodec, embedding) -> Vector | bytes:
+    """Stores an embedding as Vector if codec is float32, which find_nearest indexes, as packed bytes otherwise."""
+    if codec.dtype == np.float32:
+        return Vector(np.asarray(embedding, dtype=np.float32).tolist())
+    return codec.encode(embedding)
+
+
+def embedding_from_firestore(value):
+    """Returns a Vector as float32 np.ndarray, other values as they are."""
+    if isinstance(value, Vector):
+        return np.asarray(value, dtype=np.float32)
+    return value
 
 
 class FirestoreKG(NoSQLKnowledgeGraph):
@@ -35,24 +72,17 @@ class FirestoreKG(NoSQLKnowledgeGraph):
         """
         super().__init__()
 
-        if not firebase_admin._apps:
-            credentials = firebase_admin.credentials.Certificate(
-                gcp_credential_file
-            )
-            app = firebase_admin.initialize_app(credentials)
-
-        self.credentials, self.project_id = google.auth.load_credentials_from_file(
-            gcp_credential_file)
-
-        self.db = firestore.Client(project=gcp_project_id,  # type: ignore
-                                   credentials=self.credentials,
-                                   database=firestore_db_id)
+        # one client per project, credentials and database, shared across instances
+        self.db = get_firestore_client(gcp_project_id=gcp_project_id,
+                                       gcp_credential_file=gcp_credential_file,
+                                       firestore_db_id=firestore_db_id)
 
         self.gcp_project_id = gcp_project_id
         self.database_id = firestore_db_id
         self.node_coll_id = node_collection_id
         self.edges_coll_id = edges_collection_id
         self.community_coll_id = community_collection_id
+        self.tombstone_coll_id = f"{node_collection_id}_tombstones"
 
     def add_node(self, node_uid: str, node_data: NodeData) -> None:
         """Adds an node to the knowledge graph."""
@@ -70,7 +100,7 @@ class FirestoreKG(NoSQLKnowledgeGraph):
 
         # Convert NodeData to a dictionary for Firestore storage
         try:
-            node_data_dict = node_data.__dict__
+            node_data_dict = self._node_record(node_data)
         except TypeError as e:
             raise ValueError(
                 f"Error: Provided node_data for node_uid '{node_uid}' cannot be converted to a dictionary. Details: {e}"
@@ -78,7 +108,7 @@ class FirestoreKG(NoSQLKnowledgeGraph):
 
         # Set the document ID to match the node_uid
         try:
-            doc_ref.set(node_data_dict)
+            doc_ref.set(self._stamped(node_data_dict))
         except ValueError as e:
             raise ValueError(
                 f"Error: Could not add node with node_uid '{node_uid}' to Firestore. Details: {e}"
@@ -105,22 +135,96 @@ class FirestoreKG(NoSQLKnowledgeGraph):
                 # If the other node doesn't exist, just continue
                 continue
 
+        self._index_nodes([node_data])
+
+    def add_nodes(self, nodes: Iterable[NodeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many nodes through a Firestore BulkWriter, flushing every batch_size nodes.
+
+        Nodes are written with create() so existing node_uids are rejected server side
+        without a read per node. Failures are reported per node_uid in the result.
+        """
+        result = BatchWriteResult()
+        seen_uids: set[str] = set()
+        write_errors: dict[str, str] = {}
+
+        def _on_write_error(failure: BulkWriteFailure, _: BulkWriter) -> bool:
+            if failure.code not in _PERMANENT_WRITE_ERRORS and failure.attempts < _MAX_WRITE_ATTEMPTS:
+                return True  # retry transient errors
+            node_uid = failure.operation.reference.id
+            if failure.code == code_pb2.ALREADY_EXISTS:
+                write_errors[node_uid] = f"Error: Node with node_uid '{node_uid}' already exists."
+            else:
+                write_errors[node_uid] = f"Error: Could not add node with node_uid '{node_uid}' to Firestore. Details: {failure.message}"
+            return False
+
+        bulk_writer = self.db.bulk_writer()
+        bulk_writer.on_write_error(_on_write_error)
+        node_coll = self.db.collection(self.node_coll_id)
+
+        for chunk in batched(nodes, batch_size):
+            valid_nodes = self._validate_bulk_nodes(chunk, seen_uids, result)
+            for node_data in valid_nodes:
+                bulk_writer.create(node_coll.document(node_data.node_uid),
+                                   self._stamped(self._node_record(node_data)))
+            bulk_writer.flush()
+
+            for node_data in valid_nodes:
+                if node_data.node_uid in write_errors:
+                    result.failed[node_data.node_uid] = write_errors.pop(node_data.node_uid)
+                else:
+                    result.succeeded.append(node_data.node_uid)
+            self._index_nodes(n for n in valid_nodes if n.node_uid not in result.failed)
+
+        bulk_writer.close()
+        return result
+
     def get_node(self, node_uid: str) -> NodeData:
         """Retrieves an node from the knowledge graph."""
         doc_ref = self.db.collection(self.node_coll_id).document(node_uid)
         doc_snapshot = doc_ref.get()
 
         if doc_snapshot.exists:
-            try:
-                node_data = NodeData(**doc_snapshot.to_dict())
-                return node_data
-            except TypeError as e:
-                raise ValueError(
-                    f"Error: Data fetched for node_uid '{node_uid}' does not match the NodeData format. Details: {e}"
-                ) from e
+            return self._node_from_snapshot(doc_snapshot)
         else:
             raise KeyError(f"Error: No node found with node_uid: {node_uid}")
 
+    def get_nodes(self, node_uids: List[str], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many nodes with one get_all round trip per chunk_size node_uids."""
+        result = BatchReadResult()
+        node_coll = self.db.collection(self.node_coll_id)
+
+        for chunk in batched(dict.fromkeys(node_uids), chunk_size):
+            snapshots = {snapshot.id: snapshot for snapshot in self.db.get_all(
+                [node_coll.document(node_uid) for node_uid in chunk])}
+            for node_uid in chunk:
+                if snapshots[node_uid].exists:
+                    result.found[node_uid] = self._node_from_snapshot(snapshots[node_uid])
+                else:
+                    result.missing.append(node_uid)
+        return result
+
+    def _get_adjacency(self, node_uids: List[str]) -> dict[str, tuple[list[str], list[str]]]:
+        """Reads only edges_to and edges_from of node_uids, with one get_all per 500 node_uids."""
+        node_coll = self.db.collection(self.node_coll_id)
+        adjacency = {}
+        for chunk in batched(dict.fromkeys(node_uids), 500):
+            for snapshot in self.db.get_all([node_coll.document(node_uid) for node_uid in chunk],
+                                            field_paths=["edges_to", "edges_from"]):
+                if snapshot.exists:
+                    node_data = snapshot.to_dict()
+                    adjacency[snapshot.id] = (node_data.get("edges_to") or [],
+                                              node_data.get("edges_from") or [])
+        return adjacency
+
+    def _node_from_snapshot(self, doc_snapshot) -> NodeData:
+        """Converts a node document snapshot to NodeData."""
+        try:
+            return self._node_from_record(doc_snapshot.to_dict())
+        except (TypeError, KeyError) as e:
+            raise ValueError(
+                f"Error: Data fetched for node_uid '{doc_snapshot.id}' does not match the NodeData format. Details: {e}"
+            ) from e
+
     def update_node(self, node_uid: str, node_data: NodeData) -> None:
         """Updates an existing node in the knowledge graph."""
         doc_ref = self.db.collection(self.node_coll_id).document(node_uid)
@@ -132,7 +236,7 @@ class FirestoreKG(NoSQLKnowledgeGraph):
 
         # Convert NodeData to a dictionary for Firestore storage
         try:
-            node_data_dict = node_data.__dict__
+            node_data_dict = self._node_record(node_data)
         except TypeError as e:
             raise ValueError(
                 f"Error: Provided node_data for node_uid '{node_uid}' cannot be converted to a dictionary. Details: {e}"
@@ -140,127 +244,173 @@ class FirestoreKG(NoSQLKnowledgeGraph):
 
         # Update the document
         try:
-            doc_ref.update(node_data_dict)
+            doc_ref.update(self._stamped(node_data_dict))
         except ValueError as e:
             raise ValueError(
                 f"Error: Could not update node with node_uid '{node_uid}' in Firestore. Details: {e}"
             ) from e
+        self._index_nodes([node_data])
 
     def remove_node(self, node_uid: str) -> None:
         """
         Removes an node from the knowledge graph.
         Also removed all edges to and from the node to be removed from all other nodes.
         """
-        doc_ref = self.db.collection(self.node_coll_id).document(node_uid)
-
-        # TODO: Update edge collection on edge removal.
+        node_coll = self.db.collection(self.node_coll_id)
 
-        # Check if the node exists
-        if not doc_ref.get().exists:
-            raise KeyError(
-                f"Error: Node with node_uid '{node_uid}' does not exist.")
-
-        # 1. Get the node data to find its connections
+        # 1. Get the node data to find its connections (raises KeyError if missing)
         node_data = self.get_node(node_uid)
 
-        # 2. Remove connections TO this node from other nodes
-        for other_node_uid in node_data.edges_from:
-            try:
-                other_node_data = self.get_node(other_node_uid)
-                other_node_data.edges_to = list(
-                    edge for edge in other_node_data.edges_to if edge != node_uid
-                )
-                self.update_node(other_node_uid, other_node_data)
-            except KeyError:
-                # If the other node doesn't exist, just continue
-                continue
-
-        # 3. Remove connections FROM this node to other nodes
-        for other_node_uid in node_data.edges_to:
-            try:
-                other_node_data = self.get_node(other_node_uid)
-                other_node_data.edges_from = list(
-                    edge for edge in other_node_data.edges_from if edge != node_uid
-                )
-                self.update_node(other_node_uid, other_node_data)
-            except KeyError:
-                # If the other node doesn't exist, just continue
-                continue
-
-        # 4. Finally, remove the node itself
-        doc_ref.delete()
+        # 2. Only update neighbors that still exist, an update on a missing document fails the batch
+        neighbor_uids = set(node_data.edges_from) | set(node_data.edges_to)
+        existing_neighbors = {snapshot.id for snapshot in self.db.get_all(
+            [node_coll.document(uid) for uid in neighbor_uids], field_paths=["node_uid"])
+            if snapshot.exists} if neighbor_uids else set()
+
+        writes = []
+        for other_node_uid in neighbor_uids:
+            field_updates = {"updated_at": time.time()}
+            # 3. Remove connections TO this node from other nodes
+            if other_node_uid in node_data.edges_from:
+                field_updates["edges_to"] = ArrayRemove([node_uid])
+                writes.append(("delete", self._edge_doc_ref(other_node_uid, node_uid), None))
+            # 4. Remove connections FROM this node to other nodes
+            if other_node_uid in node_data.edges_to:
+                field_updates["edges_from"] = ArrayRemove([node_uid])
+                writes.append(("delete", self._edge_doc_ref(node_uid, other_node_uid), None))
+            if other_node_uid in existing_neighbors:
+                writes.append(("update", node_coll.document(other_node_uid), field_updates))
+
+        # 5. Finally, remove the node itself and leave a tombstone for refresh_networkx
+        writes.append(("delete", node_coll.document(node_uid), None))
+        writes += self._tombstone_writes(self._tombstone_records(node_uids=[node_uid]))
+        self._commit_writes(writes)
+        self._unindex_nodes([node_uid])
 
     def add_edge(self, edge_data: EdgeData) -> None:
         """
         Adds an edge (relationship) between two entities in the knowledge graph.
 
+        The adjacency lists of both nodes are extended server side with ArrayUnion
+        and committed together with the edge documents in one atomic batch.
+
         Args:
-            source_uid (str): The UID of the source node.
-            target_uid (str): The UID of the target node.
             edge_data (EdgeData): The edge data to be added.
-            directed (bool, optional): Whether the edge is directed. Defaults to True.
         """
 
-        # Check if source and target nodes exist
-        if not self.get_node(edge_data.source_uid):
-            raise KeyError(
-                f"Error: Source node with node_uid '{edge_data.source_uid}' does not exist.")
-        if not self.get_node(edge_data.target_uid):
-            raise KeyError(
-                f"Error: Target node with node_uid '{edge_data.target_uid}' does not exist.")
-
         # Type checking for edge_data
         if not isinstance(edge_data, EdgeData):
             raise TypeError(
                 f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
 
-        edge_uid = self._generate_edge_uid(
-            source_uid=edge_data.source_uid, target_uid=edge_data.target_uid)
+        node_coll = self.db.collection(self.node_coll_id)
+        writes = []
+        for node_uid, delta in self._adjacency_deltas([edge_data]).items():
+            writes.append(("update", node_coll.document(node_uid),
+                           {**{field: ArrayUnion(sorted(uids)) for field, uids in delta.items() if uids},
+                            "updated_at": time.time()}))
+        for record in self._edge_records(edge_data):
+            writes.append(("set", self._edge_doc_ref(record["source_uid"], record["target_uid"]), record))
 
         try:
-            source_node_data = self.get_node(edge_data.source_uid)
-            target_node_data = self.get_node(edge_data.target_uid)
-
-            source_node_data.edges_to = list(
-                set(source_node_data.edges_to) | {edge_data.target_uid})
-            self.update_node(edge_data.source_uid, source_node_data)
-
-            # Add the edge to the target node's edges_from
-            target_node_data.edges_from = list(
-                set(target_node_data.edges_from) | {edge_data.source_uid})
-            self.update_node(edge_data.target_uid, target_node_data)
-
-            # Add the edge to the edges collection
-            self._update_egde_coll(edge_uid=edge_uid,
-                                   target_uid=edge_data.target_uid,
-                                   source_uid=edge_data.source_uid,
-                                   description=edge_data.description,
-                                   directed=edge_data.directed)
-
-            if not edge_data.directed:  # If undirected, add the reverse edge as well
-                target_node_data.edges_to = list(
-                    set(target_node_data.edges_to) | {edge_data.source_uid})
-                self.update_node(edge_data.target_uid, target_node_data)
-
-                # Since it's undirected, also add source_uid to target_node_data.edges_from
-                source_node_data.edges_from = list(
-                    set(source_node_data.edges_from) | {edge_data.target_uid})
-                self.update_node(edge_data.source_uid, source_node_data)
-
-                # Add the reverse edge to the edges collection
-                reverse_edge_uid = self._generate_edge_uid(source_uid=edge_data.target_uid,
-                                                           target_uid=edge_data.source_uid)
-                self._update_egde_coll(edge_uid=reverse_edge_uid,
-                                       target_uid=edge_data.source_uid,
-                                       source_uid=edge_data.target_uid,
-                                       description=edge_data.description,
-                                       directed=edge_data.directed)
-
+            self._commit_writes(writes)
+        except NotFound as e:
+            # the batch is rejected as a whole if an endpoint is missing
+            for role, node_uid in (("Source", edge_data.source_uid), ("Target", edge_data.target_uid)):
+                if not self.node_exist(node_uid):
+                    raise KeyError(
+                        f"Error: {role} node with node_uid '{node_uid}' does not exist.") from e
+            raise
         except ValueError as e:
             raise ValueError(
                 f"Error: Could not add edge from '{edge_data.source_uid}' to '{edge_data.target_uid}'. Details: {e}"
             ) from e
 
+    def add_edges(self, edges: Iterable[EdgeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many edges, merging the adjacency updates of each batch into one write per node.
+
+        Endpoint existence is checked with one get_all per batch. Node adjacency is
+        extended with ArrayUnion and the edge documents are set through a BulkWriter.
+        An edge is reported as failed if any write it depends on failed.
+        """
+        result = BatchWriteResult()
+        write_errors: dict[str, str] = {}  # document path -> error message
+
+        def _on_write_error(failure: BulkWriteFailure, _: BulkWriter) -> bool:
+            if failure.code not in _PERMANENT_WRITE_ERRORS and failure.attempts < _MAX_WRITE_ATTEMPTS:
+                return True  # retry transient errors
+            write_errors[failure.operation.reference.path] = failure.message
+            return False
+
+        bulk_writer = self.db.bulk_writer()
+        bulk_writer.on_write_error(_on_write_error)
+        node_coll = self.db.collection(self.node_coll_id)
+        edges_coll = self.db.collection(self.edges_coll_id)
+
+        for chunk in batched(edges, batch_size):
+            endpoint_uids = {uid for e in chunk if isinstance(e, EdgeData)
+                             for uid in (e.source_uid, e.target_uid)}
+            existing_uids = {snapshot.id for snapshot in self.db.get_all(
+                [node_coll.document(uid) for uid in endpoint_uids], field_paths=["node_uid"])
+                if snapshot.exists} if endpoint_uids else set()
+            valid_edges = self._validate_bulk_edges(chunk, existing_uids, result)
+
+            for node_uid, delta in self._adjacency_deltas(valid_edges).items():
+                field_updates = {field: ArrayUnion(sorted(uids))
+                                 for field, uids in delta.items() if uids}
+                field_updates["updated_at"] = time.time()
+                bulk_writer.update(node_coll.document(node_uid), field_updates)
+
+            for edge_data in valid_edges:
+                for record in self._edge_records(edge_data):
+                    bulk_writer.set(edges_coll.document(record["edge_uid"]), record)
+            bulk_writer.flush()
+
+            for edge_data in valid_edges:
+                edge_uid = self._generate_edge_uid(
+                    source_uid=edge_data.source_uid, target_uid=edge_data.target_uid)
+                dependent_paths = [node_coll.document(edge_data.source_uid).path,
+                                   node_coll.document(edge_data.target_uid).path] + [
+                    edges_coll.document(record["edge_uid"]).path
+                    for record in self._edge_records(edge_data)]
+                errors = [write_errors[path] for path in dependent_paths if path in write_errors]
+                if errors:
+                    result.failed[edge_uid] = (
+                        f"Error: Could not add edge from '{edge_data.source_uid}' to '{edge_data.target_uid}'. Details: {errors[0]}")
+                else:
+                    result.succeeded.append(edge_uid)
+            write_errors.clear()
+
+        bulk_writer.close()
+        return result
+
+    def _commit_session(self, nodes: list[NodeData], updates: dict[str, NodeData],
+                        edges: list[EdgeData]) -> None:
+        """Commits the buffered writes of a KGSession with one write per document.
+
+        Sessions of up to 500 document writes are committed atomically in one WriteBatch.
+        Larger sessions are committed in consecutive batches of 500 writes, which are only
+        atomic per batch, so a failing batch leaves the batches before it applied.
+        """
+        created, updated, deltas, edge_records = self._coalesce_session(nodes, updates, edges)
+        node_coll = self.db.collection(self.node_coll_id)
+
+        writes = [("create", node_coll.document(record["node_uid"]), record) for record in created]
+        writes += [("update", node_coll.document(node_uid), record) for node_uid, record in updated.items()]
+        writes += [("update", node_coll.document(node_uid),
+                    {**{field: ArrayUnion(sorted(uids)) for field, uids in delta.items() if uids},
+                     "updated_at": time.time()})
+                   for node_uid, delta in deltas.items()]
+        writes += [("set", self._edge_doc_ref(record["source_uid"], record["target_uid"]), record)
+                   for record in edge_records]
+
+        try:
+            self._commit_writes(writes)
+        except Conflict as e:
+            raise ValueError(f"Error: Session commit failed, a node already exists. Details: {e}") from e
+        except NotFound as e:
+            raise KeyError(f"Error: Session commit failed, a node does not exist. Details: {e}") from e
+
     def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
         """Retrieves an edge between two entities from the edges collection."""
         edge_uid = self._generate_edge_uid(source_uid, target_uid)
@@ -270,19 +420,35 @@ class FirestoreKG(NoSQLKnowledgeGraph):
 
         if doc_snapshot.exists:
             try:
-                edge_data = EdgeData(**doc_snapshot.to_dict())
+                edge_data = EdgeData.__from_dict__(doc_snapshot.to_dict())
                 return edge_data
-            except TypeError as e:
+            except (TypeError, KeyError) as e:
                 raise ValueError(
                     f"Error: Data fetched for edge_uid '{edge_uid}' does not match the EdgeData format. Details: {e}"
                 ) from e
         else:
             raise KeyError(f"Error: No edge found with edge_uid: {edge_uid}")
 
+    def get_edges(self, edges: List[tuple[str, str]], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many edges with one get_all round trip per chunk_size edges."""
+        result = BatchReadResult()
+        edge_coll = self.db.collection(self.edges_coll_id)
+        edge_uids = [self._generate_edge_uid(source_uid, target_uid) for source_uid, target_uid in edges]
+
+        for chunk in batched(dict.fromkeys(edge_uids), chunk_size):
+            snapshots = {snapshot.id: snapshot for snapshot in self.db.get_all(
+                [edge_coll.document(edge_uid) for edge_uid in chunk])}
+            for edge_uid in chunk:
+                if snapshots[edge_uid].exists:
+                    result.found[edge_uid] = EdgeData.__from_dict__(snapshots[edge_uid].to_dict())
+                else:
+                    result.missing.append(edge_uid)
+        return result
+
     def update_edge(self, edge_data: EdgeData) -> None:
         """Updates an existing edge in the knowledge graph."""
 
-        # 1. Validate input and check if the edge exists
+        # 1. Validate input
         if not isinstance(edge_data, EdgeData):
             raise TypeError(
                 f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
@@ -290,42 +456,23 @@ class FirestoreKG(NoSQLKnowledgeGraph):
         edge_uid = self._generate_edge_uid(
             edge_data.source_uid, edge_data.target_uid)
 
-        if not self.db.collection(self.edges_coll_id).document(edge_uid).get().exists:
-            raise KeyError(
-                f"Error: Edge with edge_uid '{edge_uid}' does not exist.")
-
-        # 2. Update the edge document in the EDGES collection
+        # 2. Update the edge document and ensure the node references in one batch.
+        # update() fails the batch if the edge document does not exist.
+        node_coll = self.db.collection(self.node_coll_id)
+        record = self._edge_records(edge_data)[0]
+        writes = [
+            ("update", self._edge_doc_ref(edge_data.source_uid, edge_data.target_uid), record),
+            ("update", node_coll.document(edge_data.source_uid),
+             {"edges_to": ArrayUnion([edge_data.target_uid]), "updated_at": time.time()}),
+            ("update", node_coll.document(edge_data.target_uid),
+             {"edges_from": ArrayUnion([edge_data.source_uid]), "updated_at": time.time()}),
+        ]
         try:
-            self._update_egde_coll(
-                edge_uid=edge_uid,
-                target_uid=edge_data.target_uid,
-                source_uid=edge_data.source_uid,
-                description=edge_data.description,
-                directed=edge_data.directed
-            )
-        except Exception as e:
-            raise Exception(
-                f"Error updating edge in edges collection: {e}") from e
-
-        # 3. Update edge references in the NODES collection
-        try:
-            # 3a. Update source node
-            source_node_data = self.get_node(edge_data.source_uid)
-            # Ensure the target_uid is present in edges_to
-            if edge_data.target_uid not in source_node_data.edges_to:
-                source_node_data.edges_to = list(
-                    set(source_node_data.edges_to) | {edge_data.target_uid})
-                self.update_node(edge_data.source_uid, source_node_data)
-
-            # 3b. Update target node
-            target_node_data = self.get_node(edge_data.target_uid)
-            # Ensure the source_uid is present in edges_from
-            if edge_data.source_uid not in target_node_data.edges_from:
-                target_node_data.edges_from = list(
-                    set(target_node_data.edges_from) | {edge_data.source_uid})
-                self.update_node(edge_data.target_uid, target_node_data)
-
-        except Exception as e:
+            self._commit_writes(writes)
+        except NotFound as e:
+            if not self.edge_exist(edge_data.source_uid, edge_data.target_uid):
+                raise KeyError(
+                    f"Error: Edge with edge_uid '{edge_uid}' does not exist.") from e
             raise Exception(
                 f"Error updating edge references in nodes: {e}") from e
 
@@ -338,88 +485,85 @@ class FirestoreKG(NoSQLKnowledgeGraph):
     def remove_edge(self, source_uid: str, target_uid: str) -> None:
         """Removes an edge between two entities."""
 
-        # Get involved edge and node data
+        # Get involved edge data, only needed to know whether the edge is directed
         try:
             edge_data = self.get_edge(
                 source_uid=source_uid, target_uid=target_uid)
         except Exception as e:
             raise Exception(f"Error getting edge: {e}") from e
 
-        try:
-            source_node_data = self.get_node(node_uid=source_uid)
-        except Exception as e:
-            raise Exception(f"Error getting source node: {e}") from e
-
-        try:
-            target_node_data = self.get_node(node_uid=target_uid)
-        except Exception as e:
-            raise Exception(f"Error getting target node: {e}") from e
-
-        # remove target_uid from from source -> target
-        try:
-            source_node_data.edges_to.remove(target_uid)
-            self.update_node(source_uid, source_node_data)
-        except ValueError as e:
-            raise ValueError(
-                f"Error: Target node not in source's edges_to: {e}")
-
-        # remove source_uid from target <- source
-        try:
-            target_node_data.edges_from.remove(source_uid)
-            self.update_node(target_uid, target_node_data)
-        except ValueError as e:
-            raise ValueError(
-                f"Error: Source node not in target's edges_to: {e}")
-
-        # Remove the edge from the edges collection
-        edge_uid = self._generate_edge_uid(source_uid, target_uid)
-        self._delete_from_edge_coll(edge_uid=edge_uid)
-
-        # remove the opposite direction if edge undirected
+        # remove source -> target from both adjacency lists and the edges collection,
+        # plus the opposite direction if the edge is undirected
+        source_update = {"edges_to": ArrayRemove([target_uid]), "updated_at": time.time()}
+        target_update = {"edges_from": ArrayRemove([source_uid]), "updated_at": time.time()}
+        removed_edges = [(source_uid, target_uid)]
         if not edge_data.directed:
-            # remove target_uid from source <- target
-            try:
-                source_node_data.edges_from.remove(target_uid)
-                self.update_node(source_uid, source_node_data)
-            except ValueError as e:
-                raise ValueError(
-                    f"Error: Target node not in source's edges_to: {e}")
-
-            # remove source_uid from target -> source
-            try:
-                target_node_data.edges_to.remove(source_uid)
-                self.update_node(target_uid, target_node_data)
-            except ValueError as e:
-                raise ValueError(
-                    f"Error: Source node not in target's edges_to: {e}")
+            source_update["edges_from"] = ArrayRemove([target_uid])
+            target_update["edges_to"] = ArrayRemove([source_uid])
+            removed_edges.append((target_uid, source_uid))
+
+        node_coll = self.db.collection(self.node_coll_id)
+        writes = [
+            ("update", node_coll.document(source_uid), source_update),
+            ("update", node_coll.document(target_uid), target_update),
+        ]
+        writes += [("delete", self._edge_doc_ref(s, t), None) for s, t in removed_edges]
+        writes += self._tombstone_writes(self._tombstone_records(edges=removed_edges))
 
-            # Remove the edge from the edges collection
-            reverse_edge_uid = self._generate_edge_uid(target_uid, source_uid)
-            self._delete_from_edge_coll(edge_uid=reverse_edge_uid)
-        else:
-            pass
+        try:
+            self._commit_writes(writes)
+        except NotFound as e:
+            raise KeyError(
+                f"Error: Source or target node of edge '{edge_data.edge_uid}' does not exist. Details: {e}") from e
 
-    def build_networkx(self):
-        """Get the NetworkX representation of the full graph."""
+    def build_networkx(self, attributes: List[str] | None = None):
+        """Get the NetworkX representation of the full graph.
 
+        Only node_uid, node_type and the requested attributes are read with a
+        select() projection, edges only read source_uid and target_uid.
+        """
+        node_fields = self._networkx_node_fields(attributes)
         graph = nx.Graph()  # Initialize an undirected NetworkX graph
 
         # 1. Add Nodes to the NetworkX Graph
-        nodes_ref = self.db.collection(self.node_coll_id).stream()
+        nodes_ref = self.db.collection(self.node_coll_id).select(node_fields).stream()
         for doc in nodes_ref:
             node_data = doc.to_dict()
             graph.add_node(doc.id, **node_data)
 
         # 2. Add Edges to the NetworkX Graph
-        edges_ref = self.db.collection(self.edges_coll_id).stream()
+        edges_ref = self.db.collection(self.edges_coll_id).select(
+            ["source_uid", "target_uid"]).stream()
         for doc in edges_ref:
             edge_data = doc.to_dict()
             source_uid = edge_data['source_uid']
             target_uid = edge_data['target_uid']
-            # Consider adding edge attributes if needed (e.g., 'description')
             graph.add_edge(source_uid, target_uid)
 
         self.networkx = graph
+        self.networkx_attributes = node_fields
+
+    def _get_changes_since(self, since: float, node_fields: List[str]) -> GraphChanges:
+        """Reads the nodes, edges and tombstones with an updated_at watermark at or after since."""
+        changed = FieldFilter("updated_at", ">=", since)
+        changes = GraphChanges(
+            nodes=[doc.to_dict() for doc in self.db.collection(
+                self.node_coll_id).where(filter=changed).select(node_fields).stream()],
+            edges=[(doc.get("source_uid"), doc.get("target_uid")) for doc in self.db.collection(
+                self.edges_coll_id).where(filter=changed).select(["source_uid", "target_uid"]).stream()]
+        )
+        return self._add_tombstones(changes, (doc.to_dict() for doc in self.db.collection(
+            self.tombstone_coll_id).where(filter=changed).stream()))
+
+    def _scan_nodes(self, node_fields: List[str]) -> List[dict]:
+        """Reads the given fields of all nodes, including nodes written without an updated_at watermark."""
+        return [doc.to_dict() for doc in self.db.collection(self.node_coll_id).select(node_fields).stream()]
+
+    def _tombstone_writes(self, tombstones: list[dict]) -> list[tuple]:
+        """Returns the _commit_writes operations storing tombstone records."""
+        tombstone_coll = self.db.collection(self.tombstone_coll_id)
+        return [("set", tombstone_coll.document(tombstone["tombstone_uid"]), tombstone)
+                for tombstone in tombstones]
 
     def get_community(self, community_id: str) -> CommunityData:
         """Retrieves the community report for a given community id."""
@@ -429,7 +573,7 @@ class FirestoreKG(NoSQLKnowledgeGraph):
 
         if doc_snapshot.exists:
             try:
-                community_data = CommunityData(**doc_snapshot.to_dict())
+                community_data = CommunityData.__from_dict__(doc_snapshot.to_dict())
                 return community_data
             except TypeError as e:
                 raise ValueError(
@@ -444,18 +588,24 @@ class FirestoreKG(NoSQLKnowledgeGraph):
         docs = self.db.collection(self.community_coll_id).stream()
         return [CommunityData.__from_dict__(doc.to_dict()) for doc in docs]
 
-    def _update_egde_coll(self, edge_uid: str, source_uid: str, target_uid: str, description: str, directed: bool) -> None:
-        """Update edge record in the edges collection."""
-        edge_doc_ref = self.db.collection(
-            self.edges_coll_id).document(edge_uid)
-        edge_data_dict = {
-            "edge_uid": edge_uid,
-            "source_uid": source_uid,
-            "target_uid": target_uid,
-            "description": description,
-            "directed": directed
-        }
-        edge_doc_ref.set(edge_data_dict)
+    def _edge_doc_ref(self, source_uid: str, target_uid: str):
+        """Returns the document reference of an edge in the edges collection."""
+        return self.db.collection(self.edges_coll_id).document(
+            self._generate_edge_uid(source_uid, target_uid))
+
+    def _commit_writes(self, writes: list[tuple]) -> None:
+        """Commits (operation, document reference, data) writes in WriteBatches.
+
+        Up to 500 writes are committed atomically in a single batch.
+        """
+        for chunk in batched(writes, 500):
+            batch = self.db.batch()
+            for operation, doc_ref, data in chunk:
+                if operation == "delete":
+                    batch.delete(doc_ref)
+                else:
+                    getattr(batch, operation)(doc_ref, data)
+            batch.commit()
 
     def store_community(self, community: CommunityData) -> None:
         """Takes valid graph community data and upserts the database with it.
@@ -463,12 +613,16 @@ class FirestoreKG(NoSQLKnowledgeGraph):
         """
         # Convert CommunityData to a dictionary for Firestore storage
         try:
-            community_data_dict = community.__dict__
+            community_data_dict = community.__to_dict__()
         except TypeError as e:
             raise ValueError(
                 f"Error: Provided community data for community '{community.title}' cannot be converted to a dictionary. Details: {e}"
             ) from e
 
+        # find_nearest only indexes embeddings stored as Vector
+        if community_data_dict["community_embedding"]:
+            community_data_dict["community_embedding"] = Vector(community_data_dict["community_embedding"])
+
         # Get a reference to the document
         doc_ref = self.db.collection(
             self.community_coll_id).document(community.title)
@@ -504,21 +658,100 @@ class FirestoreKG(NoSQLKnowledgeGraph):
         else:
             return False
 
-    def get_nearest_neighbors(self, query_vec: list[float]) -> list:
+    def _encode_embedding(self, embedding) -> Vector | bytes:
+        """Stores float32 embeddings as Vector, which find_nearest indexes, float16 embeddings as bytes."""
+        return firestore_embedding(self.embedding_codec, embedding)  # type: ignore
+
+    def _decode_embedding(self, value):
+        """Decodes Vector embeddings, bytes are decoded by the embedding_codec."""
+        return super()._decode_embedding(embedding_from_firestore(value))
+
+    def get_nearest_neighbors(self, query_vec: list[float], k: int = 10, distance: str | None = None,
+                              fields: List[str] | None = None,
+                              pre_filter: dict | None = None) -> List[NeighborData]:
         """
         Implements nearest neighbor search based on Firestore embedding index:
         https://firebase.google.com/docs/firestore/vector-search
+
+        Only node_uid, the computed distance and the requested fields are returned.
+        A pre_filter requires a composite vector index on the filtered fields.
+        Embeddings stored as bytes by a float16 embedding_codec are not indexed by Firestore,
+        these are searched through the local vector_index instead.
         """
+        if self.embedding_codec is not None and self.embedding_codec.dtype != np.float32:
+            return self._index_nearest_neighbors(query_vec, k=k, distance=distance, fields=fields,
+                                                 pre_filter=pre_filter)
+        distance = self._resolve_distance(distance)
+        self._validate_nn_query(k, distance, fields, pre_filter)
+        fields = fields or []
 
-        collection = self.db.collection(self.node_coll_id)
+        query = self.db.collection(self.node_coll_id)
+        for field, value in (pre_filter or {}).items():
+            query = query.where(filter=FieldFilter(field, "==", value))
 
         # Requires vector index
-        nn = collection.find_nearest(
+        nn = query.select(["node_uid", *fields, _DISTANCE_FIELD]).find_nearest(
             vector_field="embedding",
             query_vector=Vector(query_vec),
-            distance_measure=DistanceMeasure.EUCLIDEAN,
-            limit=10).get()
-        return [n.to_dict() for n in nn]
+            distance_measure=_DISTANCE_MEASURES[distance],
+            limit=k,
+            distance_result_field=_DISTANCE_FIELD).get()
+
+        neighbors = []
+        for snapshot in nn:
+            doc = snapshot.to_dict()
+            # Firestore reports the dot product itself, negate it so nearer is smaller for every distance
+            dist = -doc[_DISTANCE_FIELD] if distance == "dot" else doc[_DISTANCE_FIELD]
+            node_fields = {field: doc.get(field) for field in fields}
+            if "embedding" in node_fields:
+                node_fields["embedding"] = self._decode_embedding(node_fields["embedding"])
+            neighbors.append(NeighborData(node_uid=snapshot.id, distance=dist, fields=node_fields))
+        return neighbors
+
+    def get_nearest_neighbors_batch(self, queries: np.ndarray, k: int = 10, distance: str | None = None,
+                                    pre_filter: dict | None = None, max_workers: int = 32) -> NeighborBatchData:
+        """Runs one find_nearest query per row of queries, with up to max_workers queries in flight.
+
+        Searches through the vector_index instead if one is attached.
+        """
+        if self.vector_index is not None:
+            return super().get_nearest_neighbors_batch(queries, k=k, distance=distance, pre_filter=pre_filter)
+        distance = self._resolve_distance(distance)
+        self._validate_nn_query(k, distance, None, pre_filter)
+        queries = np.asarray(queries, dtype=np.float32)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as executor:
+            neighbors = list(executor.map(
+                lambda query: self.get_nearest_neighbors(query.tolist(), k=k, distance=distance,
+                                                         pre_filter=pre_filter), queries))
+        return self._pack_neighbors(neighbors, k)
+
+    def get_nearest_communities(self, query_vec, k: int = 10, distance: str = "euclidean",
+                                min_rating: int | None = None) -> List[CommunityNeighborData]:
+        """
+        Implements community vector search with find_nearest over the community collection:
+        https://firebase.google.com/docs/firestore/vector-search
+
+        Requires a vector index on community_embedding, a composite one including rating if min_rating is set.
+        """
+        self._validate_nn_query(k, distance, None, None)
+
+        query = self.db.collection(self.community_coll_id)
+        if min_rating is not None:
+            query = query.where(filter=FieldFilter("rating", ">=", min_rating))
+
+        nn = query.select(["title", "summary", "rating", "community_uid", _DISTANCE_FIELD]).find_nearest(
+            vector_field="community_embedding",
+            query_vector=Vector(list(map(float, query_vec))),
+            distance_measure=_DISTANCE_MEASURES[distance],
+            limit=k,
+            distance_result_field=_DISTANCE_FIELD).get()
+
+        communities = []
+        for snapshot in nn:
+            doc = snapshot.to_dict()
+            dist = -doc[_DISTANCE_FIELD] if distance == "dot" else doc[_DISTANCE_FIELD]
+            communities.append(self._community_neighbor({"title": snapshot.id, **doc}, dist))
+        return communities
 
     def clean_zerodegree_nodes(self) -> None:
         """Removes all nodes with degree 0."""
@@ -538,10 +771,14 @@ class FirestoreKG(NoSQLKnowledgeGraph):
 
     def flush_kg(self) -> None:
         """Method to wipe the complete datastore of the knowledge graph"""
-        for collection_id in [self.node_coll_id, self.edges_coll_id, self.community_coll_id]:
+        for collection_id in [self.node_coll_id, self.edges_coll_id, self.community_coll_id,
+                              self.tombstone_coll_id]:
             docs = self.db.collection(collection_id).stream()
             for doc in docs:
                 doc.reference.delete()
+        # the networkx representation has to be rebuilt from scratch
+        self.networkx_synced_at = None
+        self._clear_index()
         return None
 
 
@@ -574,7 +811,7 @@ if __name__ == "__main__":
     nn = fskg.get_nearest_neighbors(node.embedding)
 
     for n in nn:
-        print(n["node_uid"])
+        print(n.node_uid, n.distance)
 
     print("Hello World!")
     print("")
@@ -0,0 +1,279 @@
+"""In-memory database operations implementation"""
+
+from typing import List
+import dataclasses
+import time
+
+import numpy as np
+import networkx as nx  # type: ignore
+
+from datamodel.data_model import NodeData, EdgeData, CommunityData, GraphChanges, NeighborData, NeighborBatchData
+from base.operations import NoSQLKnowledgeGraph
+from base.vectors import nearest, nearest_batch
+
+
+class InMemoryKG(NoSQLKnowledgeGraph):
+    """
+    In-memory reference implementation of NoSQLKnowledgeGraph.
+
+    Nodes, edges and communities are stored as records in dicts keyed by uid, with
+    the adjacency kept in the edges_to / edges_from lists of the node records like
+    the document stores. It needs no database, so it serves for offline tests and
+    as zero latency baseline in benchmarks. Data is lost when the object is dropped.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.nodes: dict[str, dict] = {}  # node_uid -> node record
+        self.edges: dict[str, dict] = {}  # edge_uid -> edge record
+        self.communities: dict[str, dict] = {}  # community title -> community record
+        self.tombstones: dict[str, dict] = {}  # tombstone_uid -> tombstone record
+
+    @staticmethod
+    def _record(data: dict) -> dict:
+        """Returns a copy of a record with copies of its list fields, so stored records are not shared."""
+        return {key: value.copy() if isinstance(value, list) else value for key, value in data.items()}
+
+    def add_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Adds an node to the knowledge graph."""
+        if node_uid in self.nodes:
+            raise ValueError(
+                f"Error: Node with node_uid '{node_uid}' already exists.")
+
+        if node_data.edges_to or node_data.edges_from:
+            raise ValueError(
+                f"""Error: NodeData cannot be initiated with edges_to or edges_from. Please add edges separately.""")
+
+        self.nodes[node_uid] = self._record(self._stamped(node_data.__dict__))
+        self._index_nodes([node_data])
+
+    def get_node(self, node_uid: str) -> NodeData:
+        """Retrieves an node from the knowledge graph."""
+        if node_uid in self.nodes:
+            return NodeData.__from_dict__(self._record(self.nodes[node_uid]))
+        else:
+            raise KeyError(f"Error: No node found with node_uid: {node_uid}")
+
+    def update_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Updates an existing node in the knowledge graph."""
+        if node_uid not in self.nodes:
+            raise KeyError(
+                f"Error: Node with node_uid '{node_uid}' does not exist.")
+        self.nodes[node_uid] = self._record(self._stamped({**node_data.__dict__, "node_uid": node_uid}))
+        self._index_nodes([dataclasses.replace(node_data, node_uid=node_uid)])
+
+    def remove_node(self, node_uid: str) -> None:
+        """
+        Removes an node from the knowledge graph.
+        Also removed all edges to and from the node to be removed from all other nodes.
+        """
+        node_data = self.get_node(node_uid)
+
+        for other_node_uid in set(node_data.edges_from) | set(node_data.edges_to):
+            self.edges.pop(self._generate_edge_uid(other_node_uid, node_uid), None)
+            self.edges.pop(self._generate_edge_uid(node_uid, other_node_uid), None)
+            other_node = self.nodes.get(other_node_uid)
+            if other_node is not None:
+                other_node["edges_to"] = [uid for uid in other_node["edges_to"] if uid != node_uid]
+                other_node["edges_from"] = [uid for uid in other_node["edges_from"] if uid != node_uid]
+                other_node["updated_at"] = time.time()
+
+        del self.nodes[node_uid]
+        self._write_tombstones(self._tombstone_records(node_uids=[node_uid]))
+        self._unindex_nodes([node_uid])
+
+    def add_edge(self, edge_data: EdgeData) -> None:
+        """Adds an edge (relationship) between two entities in the knowledge graph."""
+
+        # Type checking for edge_data
+        if not isinstance(edge_data, EdgeData):
+            raise TypeError(
+                f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+
+        for role, node_uid in (("Source", edge_data.source_uid), ("Target", edge_data.target_uid)):
+            if node_uid not in self.nodes:
+                raise KeyError(
+                    f"Error: {role} node with node_uid '{node_uid}' does not exist.")
+
+        for node_uid, delta in self._adjacency_deltas([edge_data]).items():
+            node = self.nodes[node_uid]
+            for field, uids in delta.items():
+                node[field] = node[field] + [uid for uid in sorted(uids) if uid not in node[field]]
+            node["updated_at"] = time.time()
+
+        for record in self._edge_records(edge_data):
+            self.edges[record["edge_uid"]] = record
+
+    def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
+        """Retrieves an edge between two entities."""
+        edge_uid = self._generate_edge_uid(source_uid, target_uid)
+        if edge_uid in self.edges:
+            return EdgeData.__from_dict__(self.edges[edge_uid])
+        else:
+            raise KeyError(f"Error: No edge found with edge_uid: {edge_uid}")
+
+    def update_edge(self, edge_data: EdgeData) -> None:
+        """Updates an existing edge in the knowledge graph."""
+
+        if not isinstance(edge_data, EdgeData):
+            raise TypeError(
+                f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+
+        edge_uid = self._generate_edge_uid(
+            edge_data.source_uid, edge_data.target_uid)
+        if edge_uid not in self.edges:
+            raise KeyError(
+                f"Error: Edge with edge_uid '{edge_uid}' does not exist.")
+
+        self.edges[edge_uid] = self._edge_records(edge_data)[0]
+
+        # Ensure edge references in the node records
+        source, target = self.nodes[edge_data.source_uid], self.nodes[edge_data.target_uid]
+        if edge_data.target_uid not in source["edges_to"]:
+            source["edges_to"] = source["edges_to"] + [edge_data.target_uid]
+        if edge_data.source_uid not in target["edges_from"]:
+            target["edges_from"] = target["edges_from"] + [edge_data.source_uid]
+        source["updated_at"] = target["updated_at"] = time.time()
+
+    def _delete_from_edge_coll(self, edge_uid: str) -> None:
+        """Method to delete record from edge collection of given kg store"""
+        self.edges.pop(edge_uid, None)
+
+    def remove_edge(self, source_uid: str, target_uid: str) -> None:
+        """Removes an edge between two entities, undirected edges in both directions."""
+
+        # Get involved edge data, only needed to know whether the edge is directed
+        edge_data = self.get_edge(source_uid=source_uid, target_uid=target_uid)
+
+        removed_edges = [(source_uid, target_uid)]
+        if not edge_data.directed:
+            removed_edges.append((target_uid, source_uid))
+
+        for edge_source_uid, edge_target_uid in removed_edges:
+            self._delete_from_edge_coll(self._generate_edge_uid(edge_source_uid, edge_target_uid))
+            source, target = self.nodes[edge_source_uid], self.nodes[edge_target_uid]
+            source["edges_to"] = [uid for uid in source["edges_to"] if uid != edge_target_uid]
+            target["edges_from"] = [uid for uid in target["edges_from"] if uid != edge_source_uid]
+            source["updated_at"] = target["updated_at"] = time.time()
+
+        self._write_tombstones(self._tombstone_records(edges=removed_edges))
+
+    def build_networkx(self, attributes: List[str] | None = None) -> None:
+        """Builds the NetworkX representation of the full graph.
+        https://networkx.org/documentation/stable/index.html
+        """
+        node_fields = self._networkx_node_fields(attributes)
+        graph = nx.Graph()  # Initialize an undirected NetworkX graph
+
+        for node_uid, node in self.nodes.items():
+            graph.add_node(node_uid, **{field: node[field] for field in node_fields})
+        for edge in self.edges.values():
+            graph.add_edge(edge["source_uid"], edge["target_uid"])
+
+        self.networkx = graph
+        self.networkx_attributes = node_fields
+
+    def _get_changes_since(self, since: float, node_fields: List[str]) -> GraphChanges:
+        """Returns the nodes, edges and tombstones with an updated_at watermark at or after since."""
+        changes = GraphChanges(
+            nodes=[{field: node[field] for field in node_fields}
+                   for node in self.nodes.values() if node["updated_at"] >= since],
+            edges=[(edge["source_uid"], edge["target_uid"])
+                   for edge in self.edges.values() if edge["updated_at"] >= since]
+        )
+        return self._add_tombstones(changes, (tombstone for tombstone in self.tombstones.values()
+                                              if tombstone["updated_at"] >= since))
+
+    def _write_tombstones(self, tombstones: list[dict]) -> None:
+        """Stores tombstone records, overwriting earlier tombstones of the same uid."""
+        for tombstone in tombstones:
+            self.tombstones[tombstone["tombstone_uid"]] = tombstone
+
+    def store_community(self, community: CommunityData) -> None:
+        """Takes valid graph community data and upserts the database with it.
+        https://www.nature.com/articles/s41598-019-41695-z
+        """
+        self.communities[community.title] = community.__to_dict__()
+
+    def _generate_edge_uid(self, source_uid: str, target_uid: str) -> str:
+        return f"{source_uid}_to_{target_uid}"
+
+    def get_nearest_neighbors(self, query_vec, k: int = 10, distance: str | None = None,
+                              fields: List[str] | None = None,
+                              pre_filter: dict | None = None) -> List[NeighborData]:
+        """Brute-force nearest neighbor search over the embeddings of the nodes matching pre_filter.
+
+        Nodes without an embedding of matching dimension are skipped.
+        Searches through the vector_index instead if one is attached.
+        """
+        if self.vector_index is not None:
+            return self._index_nearest_neighbors(query_vec, k=k, distance=distance, fields=fields,
+                                                 pre_filter=pre_filter)
+        distance = self._resolve_distance(distance)
+        self._validate_nn_query(k, distance, fields, pre_filter)
+        node_uids, matrix = self._embedding_matrix(len(query_vec), pre_filter)
+        return self._neighbors(nearest(node_uids, matrix, query_vec, k, distance), fields)
+
+    def get_nearest_neighbors_batch(self, queries: np.ndarray, k: int = 10, distance: str | None = None,
+                                    pre_filter: dict | None = None) -> NeighborBatchData:
+        """Brute-force nearest neighbor search for every row of queries with one blocked matrix product.
+
+        Searches through the vector_index instead if one is attached.
+        """
+        if self.vector_index is not None:
+            return super().get_nearest_neighbors_batch(queries, k=k, distance=distance, pre_filter=pre_filter)
+        distance = self._resolve_distance(distance)
+        self._validate_nn_query(k, distance, None, pre_filter)
+        queries = np.asarray(queries, dtype=np.float32)
+        node_uids, matrix = self._embedding_matrix(queries.shape[1], pre_filter)
+        uids, dists = nearest_batch(node_uids, matrix, queries, k, distance)
+        return NeighborBatchData(node_uids=uids, distances=dists)
+
+    def _embedding_matrix(self, dim: int, pre_filter: dict | None) -> tuple[List[str], np.ndarray]:
+        """Returns the node_uids and float32 embedding matrix of the nodes matching pre_filter with dim dimensional embeddings."""
+        candidates = [node for node in self.nodes.values()
+                      if len(node["embedding"]) == dim
+                      and all(node[field] == value for field, value in (pre_filter or {}).items())]
+        matrix = np.asarray([node["embedding"] for node in candidates], dtype=np.float32).reshape(len(candidates), dim)
+        return [node["node_uid"] for node in candidates], matrix
+
+    def _get_node_fields(self, node_uids: List[str], fields: List[str]) -> dict[str, dict]:
+        """Returns copies of the requested fields of the existing node_uids."""
+        return {node_uid: self._record({field: self.nodes[node_uid][field] for field in fields})
+                for node_uid in node_uids if node_uid in self.nodes}
+
+    def get_community(self, community_id: str) -> CommunityData:
+        """Retrieves the community report for a given community id."""
+        if community_id in self.communities:
+            return CommunityData.__from_dict__(self.communities[community_id])
+        else:
+            raise KeyError(
+                f"Error: No community found with community_id: {community_id}")
+
+    def list_communities(self) -> List[CommunityData]:
+        """Lists all stored communities for the given network."""
+        return [CommunityData.__from_dict__(community) for community in self.communities.values()]
+
+    def clean_zerodegree_nodes(self) -> None:
+        """Removes all nodes with degree 0."""
+        for node_uid in [node_uid for node_uid, node in self.nodes.items()
+                         if not node["edges_to"] and not node["edges_from"]]:
+            self.remove_node(node_uid)
+
+    def edge_exist(self, source_uid: str, target_uid: str) -> bool:
+        """Checks for edge existence and returns boolean"""
+        return self._generate_edge_uid(source_uid, target_uid) in self.edges
+
+    def node_exist(self, node_uid: str) -> bool:
+        """Checks for node existence and returns boolean"""
+        return node_uid in self.nodes
+
+    def flush_kg(self) -> None:
+        """Method to wipe the complete datastore of the knowledge graph"""
+        self.nodes.clear()
+        self.edges.clear()
+        self.communities.clear()
+        self.tombstones.clear()
+        # the networkx representation has to be rebuilt from scratch
+        self.networkx_synced_at = None
+        self._clear_index()
@@ -1,43 +1,127 @@
 """MongoDB Database Operations"""
 
-from typing import List
+from typing import Iterable, List
+import time
+
+from bson.binary import VECTOR_SUBTYPE, Binary, BinaryVectorDtype
+import numpy as np
+from pymongo import ASCENDING, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from datamodel.data_model import NodeData, EdgeData, CommunityData, BatchWriteResult, BatchReadResult, GraphChanges, NeighborhoodData, NeighborData
+from base.codec import EmbeddingCodec
+from base.operations import NoSQLKnowledgeGraph, batched
+from databases.connections import ConnectionConfig, get_mongo_client
 
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
+import networkx as nx  # type: ignore
 
-from datamodel.data_model import NodeData, EdgeData, CommunityData
-from base.operations import NoSQLKnowledgeGraph
 
-import networkx as nx  # type: ignore
+_FLOAT32_VECTOR_HEADER = BinaryVectorDtype.FLOAT32.value + b"\x00"  # dtype and padding byte of a BSON float32 vector
+
+
+def bson_embedding(codec: EmbeddingCodec, embedding) -> Binary:
+    """Packs an embedding as BSON Binary vector (subtype 9) if codec is float32, as generic Binary otherwise."""
+    packed = codec.encode(embedding)
+    if codec.dtype == np.float32:
+        return Binary(_FLOAT32_VECTOR_HEADER + packed, subtype=VECTOR_SUBTYPE)
+    return Binary(packed)
+
+
+def embedding_from_bson(value):
+    """Returns a float32 BSON Binary vector as np.ndarray view behind its header, other values as they are."""
+    if isinstance(value, Binary) and value.subtype == VECTOR_SUBTYPE:
+        if value[:2] == _FLOAT32_VECTOR_HEADER:
+            return np.frombuffer(value, dtype="<f4", offset=len(_FLOAT32_VECTOR_HEADER))
+        return np.asarray(value.as_vector().data, dtype=np.float32)
+    return value
 
 
 class MongoKG(NoSQLKnowledgeGraph):
     """MongoDB Database Operations Class"""
 
+    _node_uid_unique = False  # set by ensure_indexes once a unique node_uid index is verified
+    _transactions: bool | None = None  # whether the deployment supports transactions, checked on first use
+
     def __init__(self,
                  mdb_uri: str,
                  mdb_db_id: str,
                  node_coll_id: str,
                  edges_coll_id: str,
-                 community_collection_id: str
+                 community_collection_id: str,
+                 create_indexes: bool = True,
+                 connection_config: ConnectionConfig | None = None
                  ):
         super().__init__()
 
-        # Connect and send a ping to confirm a successful mongo db connection
-        self.mdb_client = MongoClient(str(mdb_uri), server_api=ServerApi('1'))
+        # Connect to the client shared per uri, which is pinged once when it is created
+        try:
+            self.mdb_client = get_mongo_client(str(mdb_uri), connection_config or ConnectionConfig())
+        except Exception as e:
+            print(e)
+            raise Exception(f"Error connecting to MongoDB: {e}")
 
         self.db = self.mdb_client[mdb_db_id]
         self.mdb_node_coll = self.db[node_coll_id]
         self.mdbe_edges_coll = self.db[edges_coll_id]
         self.mdb_comm_coll = self.db[community_collection_id]
+        self.mdb_tombstone_coll = self.db[f"{node_coll_id}_tombstones"]
+        self.create_indexes = create_indexes
 
-        try:
-            # client.admin.command('ping')
-            self.mdb_client.admin.command('ping')
-            print("Pinged your deployment. You successfully connected to MongoDB!")
-        except Exception as e:
-            print(e)
-            raise Exception(f"Error connecting to MongoDB: {e}")
+        if self.create_indexes:
+            self.ensure_indexes()
+
+    def ensure_indexes(self) -> List[str]:
+        """Creates the indexes backing node and edge lookups if they do not exist yet.
+
+        node_uid, edge_uid and tombstone_uid are unique. source_uid, target_uid, node_type,
+        document_id, community_id and the updated_at watermark get secondary indexes.
+        Existing indexes are left untouched, so the check is idempotent. An existing index
+        that is not unique where it should be is reported, and add_nodes keeps checking
+        node_uid existence itself instead of relying on the index.
+        Returns the "<collection>.<field>" indexes that were missing and have been created.
+        """
+        # collection -> (field, unique) of every index the operations rely on
+        index_specs = {
+            self.mdb_node_coll: [("node_uid", True), ("node_type", False), ("document_id", False),
+                                 ("community_id", False), ("updated_at", False)],
+            self.mdbe_edges_coll: [("edge_uid", True), ("source_uid", False),
+                                   ("target_uid", False), ("updated_at", False)],
+            self.mdb_tombstone_coll: [("tombstone_uid", True), ("updated_at", False)],
+            self.mdb_comm_coll: [("title", True), ("rating", False)],
+        }
+
+        created = []
+        not_unique = []
+        for collection, specs in index_specs.items():
+            # single field key -> unique flag of the existing indexes
+            existing = {tuple(info["key"]): info.get("unique", False)
+                        for info in collection.index_information().values()}
+            for field, unique in specs:
+                key = ((field, ASCENDING),)
+                if key in existing:
+                    if unique and not existing[key]:
+                        not_unique.append(f"{collection.name}.{field}")
+                    continue
+                try:
+                    collection.create_index([(field, ASCENDING)], unique=unique)
+                except OperationFailure as e:
+                    raise Exception(
+                        f"Error creating index on '{field}' of collection '{collection.name}': {e}") from e
+                created.append(f"{collection.name}.{field}")
+
+        if created:
+            print(f"Created missing MongoDB indexes: {created}")
+        if not_unique:
+            print(f"Warning: existing MongoDB indexes are not unique, drop and recreate them: {not_unique}")
+        self._node_uid_unique = f"{self.mdb_node_coll.name}.node_uid" not in not_unique
+        return created
+
+    def _encode_embedding(self, embedding) -> Binary:
+        """Stores float32 embeddings as BSON Binary vector, which Atlas Vector Search indexes as well."""
+        return bson_embedding(self.embedding_codec, embedding)  # type: ignore
+
+    def _decode_embedding(self, value):
+        """Decodes BSON Binary vectors, generic Binary is read as bytes and decoded by the embedding_codec."""
+        return super()._decode_embedding(embedding_from_bson(value))
 
     def add_node(self, node_uid: str, node_data: NodeData) -> None:
         """Adds an node to the knowledge graph."""
@@ -52,7 +136,7 @@ class MongoKG(NoSQLKnowledgeGraph):
 
         try:
             # Convert NodeData to a dictionary for MongoDB storage
-            node_data_dict = node_data.__dict__
+            node_data_dict = self._stamped(self._node_record(node_data))
 
             # Insert the node data into the collection
             self.mdb_node_coll.insert_one(node_data_dict)
@@ -60,6 +144,53 @@ class MongoKG(NoSQLKnowledgeGraph):
         except Exception as e:
             raise Exception(
                 f"Error adding node with node_uid '{node_uid}': {e}") from e
+        self._index_nodes([node_data])
+
+    def add_nodes(self, nodes: Iterable[NodeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many nodes with one unordered insert_many per batch_size nodes.
+
+        Existing node_uids are rejected by the unique node_uid index, or filtered with
+        a single $in lookup per batch if ensure_indexes has not verified that index.
+        Write errors such as duplicate keys are reported per node_uid in the result.
+        """
+        result = BatchWriteResult()
+        seen_uids: set[str] = set()
+
+        for chunk in batched(nodes, batch_size):
+            valid_nodes = self._validate_bulk_nodes(chunk, seen_uids, result)
+            if not valid_nodes:
+                continue
+
+            # the unique node_uid index makes insert_many reject existing node_uids itself
+            existing_uids = set() if self._node_uid_unique else {doc["node_uid"] for doc in self.mdb_node_coll.find(
+                {"node_uid": {"$in": [n.node_uid for n in valid_nodes]}}, {"node_uid": 1})}
+            new_nodes = []
+            for node_data in valid_nodes:
+                if node_data.node_uid in existing_uids:
+                    result.failed[node_data.node_uid] = f"Error: Node with node_uid '{node_data.node_uid}' already exists."
+                else:
+                    new_nodes.append(node_data)
+            if not new_nodes:
+                continue
+
+            # stamped copies, insert_many adds an _id field to every document it is given
+            write_errors: dict[int, dict] = {}
+            try:
+                self.mdb_node_coll.insert_many(
+                    [self._stamped(self._node_record(n)) for n in new_nodes], ordered=False)
+            except BulkWriteError as e:
+                write_errors = {err["index"]: err for err in e.details.get("writeErrors", [])}
+
+            for i, node_data in enumerate(new_nodes):
+                if i not in write_errors:
+                    result.succeeded.append(node_data.node_uid)
+                elif write_errors[i].get("code") == 11000:  # duplicate key
+                    result.failed[node_data.node_uid] = f"Error: Node with node_uid '{node_data.node_uid}' already exists."
+                else:
+                    result.failed[node_data.node_uid] = f"Error adding node with node_uid '{node_data.node_uid}': {write_errors[i].get('errmsg')}"
+            self._index_nodes(n for n in new_nodes if n.node_uid not in result.failed)
+
+        return result
 
     def get_node(self, node_uid: str) -> NodeData:
         """Retrieves an node from the knowledge graph."""
@@ -68,21 +199,80 @@ class MongoKG(NoSQLKnowledgeGraph):
 
         if node_data_dict:
             # Convert the dictionary back to a NodeData object
-            return NodeData(
-                node_uid=node_data_dict['node_uid'],
-                node_title=node_data_dict['node_title'],
-                node_type=node_data_dict['node_type'],
-                node_description=node_data_dict['node_description'],
-                node_degree=node_data_dict.get('node_degree', 0),
-                document_id=node_data_dict.get('document_id', ''),
-                community_id=node_data_dict.get('community_id', ''),
-                edges_to=node_data_dict.get('edges_to', []),
-                edges_from=node_data_dict.get('edges_from', []),
-                embedding=node_data_dict.get('embedding', [])
-            )
+            return self._node_from_record(node_data_dict)
         else:
             raise KeyError(f"Error: No node found with node_uid: {node_uid}")
 
+    def get_nodes(self, node_uids: List[str], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many nodes with one $in query per chunk_size node_uids."""
+        result = BatchReadResult()
+
+        for chunk in batched(dict.fromkeys(node_uids), chunk_size):
+            docs = {doc["node_uid"]: doc for doc in self.mdb_node_coll.find(
+                {"node_uid": {"$in": chunk}})}
+            for node_uid in chunk:
+                if node_uid in docs:
+                    result.found[node_uid] = self._node_from_record(docs[node_uid])
+                else:
+                    result.missing.append(node_uid)
+        return result
+
+    def get_k_hop_neighborhood(self, node_uid: str, k: int, direction: str = "both",
+                               limit: int | None = None, return_uids: bool = False) -> NeighborhoodData:
+        """Returns the nodes reachable from node_uid in 1 to k hops, counted per hop.
+
+        "out" and "in" traversals run server side in one aggregation: $graphLookup
+        follows the edges collection along the indexed source_uid / target_uid fields,
+        and the reached nodes are grouped by hop. $graphLookup follows a single field
+        pair, so "both" uses the frontier-batched traversal of the base class.
+        """
+        self._validate_traversal(k, direction, limit)
+        if direction == "both":
+            return super().get_k_hop_neighborhood(node_uid=node_uid, k=k, direction=direction,
+                                                  limit=limit, return_uids=return_uids)
+
+        connect_from, connect_to = ("target_uid", "source_uid") if direction == "out" else ("source_uid", "target_uid")
+        pipeline = [
+            {"$match": {connect_to: node_uid}},
+            {"$limit": 1},
+            {"$graphLookup": {
+                "from": self.mdbe_edges_coll.name,
+                "startWith": "$" + connect_to,
+                "connectFromField": connect_from,
+                "connectToField": connect_to,
+                "maxDepth": k - 1,
+                "depthField": "depth",
+                "as": "reached",
+            }},
+            {"$unwind": "$reached"},
+            # a node is reached at the hop of its shortest path
+            {"$group": {"_id": "$reached." + connect_from, "depth": {"$min": "$reached.depth"}}},
+            {"$match": {"_id": {"$ne": node_uid}}},
+            {"$sort": {"depth": 1, "_id": 1}},
+        ]
+        if limit is not None:
+            pipeline.append({"$limit": limit + 1})
+        pipeline += [
+            {"$group": {"_id": "$depth", "count": {"$sum": 1},
+                        **({"node_uids": {"$push": "$_id"}} if return_uids else {})}},
+            {"$sort": {"_id": 1}},
+        ]
+        hops = list(self.mdbe_edges_coll.aggregate(pipeline))
+
+        if not hops and not self.node_exist(node_uid):
+            raise KeyError(f"Error: No node found with node_uid: {node_uid}")
+
+        return self._neighborhood_from_hops(node_uid, hops, limit, return_uids)
+
+    def _get_adjacency(self, node_uids: List[str]) -> dict[str, tuple[list[str], list[str]]]:
+        """Reads only edges_to and edges_from of node_uids, with one $in query per 500 node_uids."""
+        adjacency = {}
+        for chunk in batched(dict.fromkeys(node_uids), 500):
+            for doc in self.mdb_node_coll.find({"node_uid": {"$in": chunk}},
+                                               self._projection(["node_uid", "edges_to", "edges_from"])):
+                adjacency[doc["node_uid"]] = (doc.get("edges_to") or [], doc.get("edges_from") or [])
+        return adjacency
+
     def update_node(self, node_uid: str, node_data: NodeData) -> None:
         """Updates an existing node in the knowledge graph."""
         try:
@@ -92,127 +282,191 @@ class MongoKG(NoSQLKnowledgeGraph):
                     f"Error: Node with node_uid '{node_uid}' does not exist.")
 
             # Convert NodeData to a dictionary for MongoDB storage
-            node_data_dict = node_data.__dict__
+            node_data_dict = self._node_record(node_data)
 
             # Update the node data in the collection
             self.mdb_node_coll.update_one(
-                {"node_uid": node_uid}, {"$set": node_data_dict}
+                {"node_uid": node_uid}, {"$set": self._stamped(node_data_dict)}
             )
 
         except Exception as e:
             raise Exception(
                 f"Error updating node with node_uid '{node_uid}': {e}") from e
+        self._index_nodes([node_data])
 
     def remove_node(self, node_uid: str) -> None:
         """Removes a node from the knowledge graph."""
 
-        # Check if the node exists
-        if not self.node_exist(node_uid=node_uid):
-            raise KeyError(
-                f"Error: Node with node_uid '{node_uid}' does not exist.")
-
-        # 1. Get the node data to find its connections
+        # 1. Get the node data to find its connections (raises KeyError if missing)
         node_data = self.get_node(node_uid)
 
-        # TODO: Update edge collection on edge removal.
-
-        # 2. Remove connections TO this node from other nodes
-        for other_node_uid in node_data.edges_from:
-            try:
-                other_node_data = self.get_node(other_node_uid)
-                other_node_data.edges_to = list(
-                    edge for edge in other_node_data.edges_to if edge != node_uid
-                )
-                self.update_node(other_node_uid, other_node_data)
-            except KeyError:
-                # If the other node doesn't exist, just continue
-                continue
-
-        # 3. Remove connections FROM this node to other nodes
-        for other_node_uid in node_data.edges_to:
-            try:
-                other_node_data = self.get_node(other_node_uid)
-                other_node_data.edges_from = list(
-                    edge for edge in other_node_data.edges_from if edge != node_uid
-                )
-                self.update_node(other_node_uid, other_node_data)
-            except KeyError:
-                # If the other node doesn't exist, just continue
-                continue
-
-        # 4. Finally, remove the node itself
+        # 2. Remove connections TO and FROM this node from other nodes with $pull.
+        # Updates on neighbors that no longer exist simply match nothing.
+        neighbor_ops = []
+        for other_node_uid in set(node_data.edges_from) | set(node_data.edges_to):
+            pulls = {}
+            if other_node_uid in node_data.edges_from:
+                pulls["edges_to"] = node_uid
+            if other_node_uid in node_data.edges_to:
+                pulls["edges_from"] = node_uid
+            neighbor_ops.append(UpdateOne({"node_uid": other_node_uid},
+                                          {"$pull": pulls, "$set": {"updated_at": time.time()}}))
+        if neighbor_ops:
+            self.mdb_node_coll.bulk_write(neighbor_ops, ordered=False)
+
+        # 3. Remove the edge records of the node's connections
+        edge_uids = [self._generate_edge_uid(other_node_uid, node_uid) for other_node_uid in node_data.edges_from]
+        edge_uids += [self._generate_edge_uid(node_uid, other_node_uid) for other_node_uid in node_data.edges_to]
+        if edge_uids:
+            self.mdbe_edges_coll.delete_many({"edge_uid": {"$in": edge_uids}})
+
+        # 4. Finally, remove the node itself and leave a tombstone for refresh_networkx
         delete_result = self.mdb_node_coll.delete_one({"node_uid": node_uid})
         if delete_result.deleted_count == 1:
+            self._write_tombstones(self._tombstone_records(node_uids=[node_uid]))
+            self._unindex_nodes([node_uid])
             return None
         else:
             raise KeyError(f"Error: No node found with node_uid: {node_uid}")
 
     def add_edge(self, edge_data: EdgeData) -> None:
-        """Adds an edge (relationship) between two entities in the knowledge graph."""
+        """Adds an edge (relationship) between two entities in the knowledge graph.
 
-        # TODO: consider moving to base class.
-
-        # Check if source and target nodes exist
-        if not self.node_exist(edge_data.source_uid):
-            raise KeyError(
-                f"Error: Source node with node_uid '{edge_data.source_uid}' does not exist.")
-        if not self.node_exist(edge_data.target_uid):
-            raise KeyError(
-                f"Error: Target node with node_uid '{edge_data.target_uid}' does not exist.")
+        Node adjacency lists are extended server side with $addToSet, so neither
+        node document is read or rewritten as a whole.
+        """
 
         # Type checking for edge_data
         if not isinstance(edge_data, EdgeData):
             raise TypeError(
                 f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
 
-        edge_uid = self._generate_edge_uid(
-            edge_data.source_uid, edge_data.target_uid)
+        # Check if source and target nodes exist with a single lookup
+        existing_uids = {doc["node_uid"] for doc in self.mdb_node_coll.find(
+            {"node_uid": {"$in": [edge_data.source_uid, edge_data.target_uid]}}, {"node_uid": 1})}
+        if edge_data.source_uid not in existing_uids:
+            raise KeyError(
+                f"Error: Source node with node_uid '{edge_data.source_uid}' does not exist.")
+        if edge_data.target_uid not in existing_uids:
+            raise KeyError(
+                f"Error: Target node with node_uid '{edge_data.target_uid}' does not exist.")
 
         try:
-            source_node_data = self.get_node(edge_data.source_uid)
-            target_node_data = self.get_node(edge_data.target_uid)
-
-            source_node_data.edges_to = list(
-                set(source_node_data.edges_to) | {edge_data.target_uid})
-            self.update_node(edge_data.source_uid, source_node_data)
-
-            # Add the edge to the target node's edges_from
-            target_node_data.edges_from = list(
-                set(target_node_data.edges_from) | {edge_data.source_uid})
-            self.update_node(edge_data.target_uid, target_node_data)
-
-            # Add the edge to the edges collection
-            self._update_egde_coll(edge_uid=edge_uid,
-                                   target_uid=edge_data.target_uid,
-                                   source_uid=edge_data.source_uid,
-                                   description=edge_data.description,
-                                   directed=edge_data.directed)
-
-            if not edge_data.directed:  # If undirected, add the reverse edge as well
-                reverse_edge_uid = self._generate_edge_uid(
-                    edge_data.target_uid, edge_data.source_uid)
-
-                target_node_data.edges_to = list(
-                    set(target_node_data.edges_to) | {edge_data.source_uid})
-                self.update_node(edge_data.target_uid, target_node_data)
-
-                # Since it's undirected, also add source_uid to target_node_data.edges_from
-                source_node_data.edges_from = list(
-                    set(source_node_data.edges_from) | {edge_data.target_uid})
-                self.update_node(edge_data.source_uid, source_node_data)
-
-                # Add the reverse edge to the edges collection
-                self._update_egde_coll(edge_uid=reverse_edge_uid,
-                                       target_uid=edge_data.source_uid,
-                                       source_uid=edge_data.target_uid,
-                                       description=edge_data.description,
-                                       directed=edge_data.directed)
+            self.mdb_node_coll.bulk_write([
+                UpdateOne({"node_uid": node_uid},
+                          {"$addToSet": {field: {"$each": sorted(uids)}
+                                         for field, uids in delta.items() if uids},
+                           "$set": {"updated_at": time.time()}})
+                for node_uid, delta in self._adjacency_deltas([edge_data]).items()])
+
+            # Add the edge, and the reverse edge if undirected, to the edges collection
+            self.mdbe_edges_coll.bulk_write([
+                UpdateOne({"edge_uid": record["edge_uid"]}, {"$set": record}, upsert=True)
+                for record in self._edge_records(edge_data)])
 
         except ValueError as e:
             raise ValueError(
                 f"Error: Could not add edge from '{edge_data.source_uid}' to '{edge_data.target_uid}'. Details: {e}"
             ) from e
 
+    def add_edges(self, edges: Iterable[EdgeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many edges, merging the adjacency updates of each batch into one update per node.
+
+        Endpoint existence is checked with one $in lookup per batch. Node $addToSet
+        updates and edge upserts are sent in a single unordered bulk_write.
+        An edge is reported as failed if any write it depends on failed.
+        """
+        result = BatchWriteResult()
+
+        for chunk in batched(edges, batch_size):
+            endpoint_uids = {uid for e in chunk if isinstance(e, EdgeData)
+                             for uid in (e.source_uid, e.target_uid)}
+            existing_uids = {doc["node_uid"] for doc in self.mdb_node_coll.find(
+                {"node_uid": {"$in": list(endpoint_uids)}}, {"node_uid": 1})}
+            valid_edges = self._validate_bulk_edges(chunk, existing_uids, result)
+            if not valid_edges:
+                continue
+
+            node_ops, edge_ops = [], []
+            node_op_index: dict[str, int] = {}
+            for node_uid, delta in self._adjacency_deltas(valid_edges).items():
+                node_op_index[node_uid] = len(node_ops)
+                node_ops.append(UpdateOne(
+                    {"node_uid": node_uid},
+                    {"$addToSet": {field: {"$each": sorted(uids)}
+                                   for field, uids in delta.items() if uids},
+                     "$set": {"updated_at": time.time()}}))
+
+            edge_op_index: dict[str, list[int]] = {}
+            for edge_data in valid_edges:
+                edge_uid = self._generate_edge_uid(edge_data.source_uid, edge_data.target_uid)
+                for record in self._edge_records(edge_data):
+                    edge_op_index.setdefault(edge_uid, []).append(len(edge_ops))
+                    edge_ops.append(UpdateOne(
+                        {"edge_uid": record["edge_uid"]}, {"$set": record}, upsert=True))
+
+            node_errors = self._bulk_write_errors(self.mdb_node_coll, node_ops)
+            edge_errors = self._bulk_write_errors(self.mdbe_edges_coll, edge_ops)
+
+            for edge_data in valid_edges:
+                edge_uid = self._generate_edge_uid(edge_data.source_uid, edge_data.target_uid)
+                errors = [node_errors[node_op_index[uid]]
+                          for uid in (edge_data.source_uid, edge_data.target_uid)
+                          if node_op_index[uid] in node_errors]
+                errors += [edge_errors[i] for i in edge_op_index[edge_uid] if i in edge_errors]
+                if errors:
+                    result.failed[edge_uid] = (
+                        f"Error: Could not add edge from '{edge_data.source_uid}' to '{edge_data.target_uid}'. Details: {errors[0]}")
+                else:
+                    result.succeeded.append(edge_uid)
+
+        return result
+
+    def _commit_session(self, nodes: list[NodeData], updates: dict[str, NodeData],
+                        edges: list[EdgeData]) -> None:
+        """Commits the buffered writes of a KGSession in one transaction.
+
+        Every document is written once, with one bulk_write per collection. Transactions
+        require a replica set or sharded cluster, on a standalone mongod the bulk writes
+        are ordered and run without a transaction, so a failed commit can be partially applied.
+        """
+        created, updated, deltas, edge_records = self._coalesce_session(nodes, updates, edges)
+
+        node_ops = [InsertOne(record) for record in created]
+        node_ops += [UpdateOne({"node_uid": node_uid}, {"$set": record})
+                     for node_uid, record in updated.items()]
+        node_ops += [UpdateOne({"node_uid": node_uid},
+                               {"$addToSet": {field: {"$each": sorted(uids)}
+                                              for field, uids in delta.items() if uids},
+                                "$set": {"updated_at": time.time()}})
+                     for node_uid, delta in deltas.items()]
+        edge_ops = [UpdateOne({"edge_uid": record["edge_uid"]}, {"$set": record}, upsert=True)
+                    for record in edge_records]
+
+        def _write(session) -> None:
+            if node_ops:
+                self.mdb_node_coll.bulk_write(node_ops, session=session)
+            if edge_ops:
+                self.mdbe_edges_coll.bulk_write(edge_ops, session=session)
+
+        try:
+            if self._supports_transactions():
+                with self.mdb_client.start_session() as session:
+                    session.with_transaction(_write)
+            else:
+                _write(None)
+        except BulkWriteError as e:
+            if any(err.get("code") == 11000 for err in e.details.get("writeErrors", [])):  # duplicate key
+                raise ValueError(f"Error: Session commit failed, a node already exists. Details: {e}") from e
+            raise Exception(f"Error: Session commit failed. Details: {e}") from e
+
+    def _supports_transactions(self) -> bool:
+        """Checks once whether the deployment is a replica set or sharded cluster, which transactions require."""
+        if self._transactions is None:
+            hello = self.mdb_client.admin.command("hello")
+            self._transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+        return self._transactions
+
     def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
         """Retrieves an edge between two entities."""
         edge_uid = self._generate_edge_uid(source_uid, target_uid)
@@ -229,12 +483,25 @@ class MongoKG(NoSQLKnowledgeGraph):
         else:
             raise KeyError(f"Error: No edge found with edge_uid: {edge_uid}")
 
+    def get_edges(self, edges: List[tuple[str, str]], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many edges with one $in query on the edge_uid index per chunk_size edges."""
+        result = BatchReadResult()
+        edge_uids = [self._generate_edge_uid(source_uid, target_uid) for source_uid, target_uid in edges]
+
+        for chunk in batched(dict.fromkeys(edge_uids), chunk_size):
+            docs = {doc["edge_uid"]: doc for doc in self.mdbe_edges_coll.find(
+                {"edge_uid": {"$in": chunk}}, {"_id": 0})}
+            for edge_uid in chunk:
+                if edge_uid in docs:
+                    result.found[edge_uid] = EdgeData.__from_dict__(docs[edge_uid])
+                else:
+                    result.missing.append(edge_uid)
+        return result
+
     def update_edge(self, edge_data: EdgeData) -> None:
         """Updates an existing edge in the knowledge graph."""
 
-        # TODO: Consider moving to base
-
-        # 1. Validate input and check if the edge exists
+        # 1. Validate input
         if not isinstance(edge_data, EdgeData):
             raise TypeError(
                 f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
@@ -242,41 +509,27 @@ class MongoKG(NoSQLKnowledgeGraph):
         edge_uid = self._generate_edge_uid(
             edge_data.source_uid, edge_data.target_uid)
 
-        if not self.edge_exist(source_uid=edge_data.source_uid, target_uid=edge_data.target_uid):
-            raise KeyError(
-                f"Error: Edge with edge_uid '{edge_uid}' does not exist.")
-
-        # 2. Update the edge document in the EDGES collection
+        # 2. Update the edge document in the EDGES collection, fails if the edge does not exist
         try:
-            self._update_egde_coll(
-                edge_uid=edge_uid,
-                target_uid=edge_data.target_uid,
-                source_uid=edge_data.source_uid,
-                description=edge_data.description,
-                directed=edge_data.directed
-            )
+            update_result = self.mdbe_edges_coll.update_one(
+                {"edge_uid": edge_uid}, {"$set": self._edge_records(edge_data)[0]})
         except Exception as e:
             raise Exception(
                 f"Error updating edge in edges collection: {e}") from e
+        if update_result.matched_count == 0:
+            raise KeyError(
+                f"Error: Edge with edge_uid '{edge_uid}' does not exist.")
 
-        # 3. Update edge references in the NODES collection
+        # 3. Ensure edge references in the NODES collection
         try:
-            # 3a. Update source node
-            source_node_data = self.get_node(edge_data.source_uid)
-            # Ensure the target_uid is present in edges_to
-            if edge_data.target_uid not in source_node_data.edges_to:
-                source_node_data.edges_to = list(
-                    set(source_node_data.edges_to) | {edge_data.target_uid})
-                self.update_node(edge_data.source_uid, source_node_data)
-
-            # 3b. Update target node
-            target_node_data = self.get_node(edge_data.target_uid)
-            # Ensure the source_uid is present in edges_from
-            if edge_data.source_uid not in target_node_data.edges_from:
-                target_node_data.edges_from = list(
-                    set(target_node_data.edges_from) | {edge_data.source_uid})
-                self.update_node(edge_data.target_uid, target_node_data)
-
+            self.mdb_node_coll.bulk_write([
+                UpdateOne({"node_uid": edge_data.source_uid},
+                          {"$addToSet": {"edges_to": edge_data.target_uid},
+                           "$set": {"updated_at": time.time()}}),
+                UpdateOne({"node_uid": edge_data.target_uid},
+                          {"$addToSet": {"edges_from": edge_data.source_uid},
+                           "$set": {"updated_at": time.time()}}),
+            ])
         except Exception as e:
             raise Exception(
                 f"Error updating edge references in nodes: {e}") from e
@@ -286,126 +539,152 @@ class MongoKG(NoSQLKnowledgeGraph):
         delete_result = self.mdbe_edges_coll.delete_one({"edge_uid": edge_uid})
         if delete_result.deleted_count == 0:
             raise KeyError(
-                f"Error: No edge found with source_uid '{source_uid}' and target_uid '{target_uid}'")
+                f"Error: No edge found with edge_uid '{edge_uid}'")
 
     def remove_edge(self, source_uid: str, target_uid: str) -> None:
         """Removes an edge between two entities."""
 
-        # Get involved edge and node data
+        # Get involved edge data, only needed to know whether the edge is directed
         try:
             edge_data = self.get_edge(
                 source_uid=source_uid, target_uid=target_uid)
         except Exception as e:
             raise KeyError(f"Error getting edge: {e}") from e
 
-        try:
-            source_node_data = self.get_node(node_uid=source_uid)
-        except Exception as e:
-            raise KeyError(f"Error getting source node: {e}") from e
-
-        try:
-            target_node_data = self.get_node(node_uid=target_uid)
-        except Exception as e:
-            raise KeyError(f"Error getting target node: {e}") from e
-
-        # remove target_uid from from source -> target
-        try:
-            source_node_data.edges_to.remove(target_uid)
-            self.update_node(source_uid, source_node_data)
-        except ValueError as e:
-            raise ValueError(
-                f"Error: Target node not in source's edges_to: {e}") from e
-
-        # remove source_uid from target <- source
-        try:
-            target_node_data.edges_from.remove(source_uid)
-            self.update_node(target_uid, target_node_data)
-        except ValueError as e:
-            raise ValueError(
-                f"Error: Source node not in target's edges_to: {e}") from e
-
-        # Remove the edge from the edges collection
-        edge_uid = self._generate_edge_uid(source_uid, target_uid)
-        self._delete_from_edge_coll(edge_uid=edge_uid)
-
-        # remove the opposite direction if edge undirected
+        # remove source -> target from both adjacency lists,
+        # plus the opposite direction if the edge is undirected
+        source_pulls = {"edges_to": target_uid}
+        target_pulls = {"edges_from": source_uid}
+        removed_edges = [(source_uid, target_uid)]
         if not edge_data.directed:
-            # remove target_uid from source <- target
-            try:
-                source_node_data.edges_from.remove(target_uid)
-                self.update_node(source_uid, source_node_data)
-            except ValueError as e:
-                raise ValueError(
-                    f"Error: Target node not in source's edges_to: {e}") from e
+            source_pulls["edges_from"] = target_uid
+            target_pulls["edges_to"] = source_uid
+            removed_edges.append((target_uid, source_uid))
+        edge_uids = [self._generate_edge_uid(s, t) for s, t in removed_edges]
+
+        bulk_result = self.mdb_node_coll.bulk_write([
+            UpdateOne({"node_uid": source_uid},
+                      {"$pull": source_pulls, "$set": {"updated_at": time.time()}}),
+            UpdateOne({"node_uid": target_uid},
+                      {"$pull": target_pulls, "$set": {"updated_at": time.time()}}),
+        ])
+        if bulk_result.matched_count < 2:
+            raise KeyError(
+                f"Error: Source or target node of edge '{edge_uids[0]}' does not exist.")
 
-            # remove source_uid from target -> source
-            try:
-                target_node_data.edges_to.remove(source_uid)
-                self.update_node(target_uid, target_node_data)
-            except ValueError as e:
-                raise ValueError(
-                    f"Error: Source node not in target's edges_to: {e}") from e
-
-            # Remove the edge from the edges collection
-            reverse_edge_uid = self._generate_edge_uid(source_uid=target_uid,
-                                                       target_uid=source_uid)
-            self._delete_from_edge_coll(edge_uid=reverse_edge_uid)
-        else:
-            pass
+        # Remove the edge records from the edges collection and leave tombstones for refresh_networkx
+        self.mdbe_edges_coll.delete_many({"edge_uid": {"$in": edge_uids}})
+        self._write_tombstones(self._tombstone_records(edges=removed_edges))
 
-    def build_networkx(self) -> None:
+    def build_networkx(self, attributes: List[str] | None = None) -> None:
         """Builds the NetworkX representation of the full graph.
         https://networkx.org/documentation/stable/index.html
+
+        Only node_uid, node_type and the requested attributes are read with a
+        projection, edges only read source_uid and target_uid.
         """
+        node_fields = self._networkx_node_fields(attributes)
         graph = nx.Graph()  # Initialize an undirected NetworkX graph
 
         # 1. Add Nodes to the NetworkX Graph
-        for node in self.mdb_node_coll.find():
+        for node in self.mdb_node_coll.find({}, self._projection(node_fields)):
             graph.add_node(node['node_uid'], **node)
 
         # 2. Add Edges to the NetworkX Graph
-        for edge in self.mdbe_edges_coll.find():
+        for edge in self.mdbe_edges_coll.find({}, self._projection(["source_uid", "target_uid"])):
             source_uid = edge['source_uid']
             target_uid = edge['target_uid']
             graph.add_edge(source_uid, target_uid)
 
         self.networkx = graph
+        self.networkx_attributes = node_fields
+
+    @staticmethod
+    def _projection(fields: List[str]) -> dict:
+        """Returns a find projection including only the given fields."""
+        return {"_id": 0, **{field: 1 for field in fields}}
+
+    def _get_changes_since(self, since: float, node_fields: List[str]) -> GraphChanges:
+        """Reads the nodes, edges and tombstones with an updated_at watermark at or after since."""
+        changed = {"updated_at": {"$gte": since}}
+        changes = GraphChanges(
+            nodes=list(self.mdb_node_coll.find(changed, self._projection(node_fields))),
+            edges=[(edge["source_uid"], edge["target_uid"]) for edge in self.mdbe_edges_coll.find(
+                changed, self._projection(["source_uid", "target_uid"]))]
+        )
+        return self._add_tombstones(changes, self.mdb_tombstone_coll.find(changed))
+
+    def _scan_nodes(self, node_fields: List[str]) -> List[dict]:
+        """Reads the given fields of all nodes, including nodes written without an updated_at watermark."""
+        return list(self.mdb_node_coll.find({}, self._projection(node_fields)))
+
+    def _write_tombstones(self, tombstones: list[dict]) -> None:
+        """Upserts tombstone records into the tombstone collection."""
+        if tombstones:
+            self.mdb_tombstone_coll.bulk_write([
+                UpdateOne({"tombstone_uid": tombstone["tombstone_uid"]}, {"$set": tombstone}, upsert=True)
+                for tombstone in tombstones], ordered=False)
 
     def store_community(self, community: CommunityData) -> None:
         """Takes valid graph community data and upserts the database with it.
         https://www.nature.com/articles/s41598-019-41695-z
         """
-        pass
+        try:
+            self.mdb_comm_coll.replace_one({"title": community.title}, community.__to_dict__(), upsert=True)
+        except Exception as e:
+            raise Exception(f"Error storing community data: {e}") from e
 
     def _generate_edge_uid(self, source_uid: str, target_uid: str):
         return f"{source_uid}_to_{target_uid}"
 
-    def _update_egde_coll(self, edge_uid: str, source_uid: str,
-                          target_uid: str, description: str, directed: bool) -> None:
-        """Update edge record in the edges collection."""
-        edge_data_dict = {
-            "edge_uid": edge_uid,
-            "source_uid": source_uid,
-            "target_uid": target_uid,
-            "description": description,
-            "directed": directed
-        }
-        self.mdbe_edges_coll.update_one(
-            {"edge_uid": edge_uid}, {"$set": edge_data_dict}, upsert=True
-        )
-        return None
-
-    def get_nearest_neighbors(self, query_vec) -> List[str]:
-        """Implements nearest neighbor search based on nosql db index."""
-        pass
+    @staticmethod
+    def _bulk_write_errors(collection, operations: list) -> dict[int, str]:
+        """Runs an unordered bulk_write and returns the error message per failed operation index."""
+        if not operations:
+            return {}
+        try:
+            collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            return {err["index"]: err.get("errmsg", "") for err in e.details.get("writeErrors", [])}
+        return {}
+
+    def get_nearest_neighbors(self, query_vec, k: int = 10, distance: str | None = None,
+                              fields: List[str] | None = None,
+                              pre_filter: dict | None = None) -> List[NeighborData]:
+        """Nearest neighbor search through the local vector_index attached to the graph."""
+        return self._index_nearest_neighbors(query_vec, k=k, distance=distance, fields=fields,
+                                             pre_filter=pre_filter)
+
+    def _filter_node_uids(self, pre_filter: dict) -> List[str]:
+        """Reads the node_uids matching pre_filter through the node_type, document_id and community_id indexes."""
+        return [doc["node_uid"] for doc in self.mdb_node_coll.find(pre_filter, {"node_uid": 1, "_id": 0})]
+
+    def _get_node_fields(self, node_uids: List[str], fields: List[str]) -> dict[str, dict]:
+        """Reads only the requested fields of node_uids, with one $in query per 500 node_uids."""
+        projection = {"_id": 0, "node_uid": 1, **{field: 1 for field in fields}}
+        node_fields = {}
+        for chunk in batched(dict.fromkeys(node_uids), 500):
+            for doc in self.mdb_node_coll.find({"node_uid": {"$in": chunk}}, projection):
+                node_fields[doc["node_uid"]] = {field: doc.get(field) for field in fields}
+        return node_fields
 
     def get_community(self, community_id: str) -> CommunityData:
         """Retrieves the community report for a given community id."""
-        return
+        doc = self.mdb_comm_coll.find_one({"title": community_id}, {"_id": 0})
+        if doc is None:
+            raise KeyError(
+                f"Error: No community found with community_id: {community_id}")
+        return CommunityData.__from_dict__(doc)
 
     def list_communities(self) -> List[CommunityData]:
         """Lists all stored communities for the given network."""
-        return
+        return [CommunityData.__from_dict__(doc) for doc in self.mdb_comm_coll.find({}, {"_id": 0})]
+
+    def _community_records(self, min_rating: int | None) -> List[dict]:
+        """Reads the fields of community search only, filtering on the rating index."""
+        query = {} if min_rating is None else {"rating": {"$gte": min_rating}}
+        projection = {"_id": 0, "title": 1, "summary": 1, "rating": 1, "community_uid": 1, "community_embedding": 1}
+        return list(self.mdb_comm_coll.find(query, projection))
 
     def clean_zerodegree_nodes(self) -> None:
         """Removes all nodes with degree 0."""
@@ -437,6 +716,15 @@ class MongoKG(NoSQLKnowledgeGraph):
             # Drop the community collection
             self.mdb_comm_coll.drop()
 
+            # Drop the tombstones, the networkx representation has to be rebuilt from scratch
+            self.mdb_tombstone_coll.drop()
+            self.networkx_synced_at = None
+            self._clear_index()
+
+            # Dropping a collection drops its indexes as well
+            if self.create_indexes:
+                self.ensure_indexes()
+
         except Exception as e:
             raise Exception(f"Error flushing MongoDB collections: {e}") from e
 
@@ -1,63 +1,116 @@
 """Neo4j database operations"""
 
+import json
 import os
-from typing import List
+import time
+from collections import defaultdict
+from typing import Iterable, List
 
 import dotenv
 
-from neo4j import GraphDatabase
+from neo4j.exceptions import ConstraintError
 import networkx as nx  # type: ignore
 
-from base.operations import NoSQLKnowledgeGraph
-from datamodel.data_model import NodeData, EdgeData, CommunityData
+from base.operations import NoSQLKnowledgeGraph, batched
+from datamodel.data_model import NodeData, EdgeData, CommunityData, BatchWriteResult, BatchReadResult, GraphChanges, NeighborhoodData, NeighborData
+from databases.connections import ConnectionConfig, get_neo4j_driver
 
 
 class AuraKG(NoSQLKnowledgeGraph):
     """
     Base Class for storing and interacting with the KG and manages data model.
+
+    Every graph node carries the common :Entity label, backed by a uniqueness
+    constraint on node_uid, and its node_type as secondary label.
     """
 
     def __init__(self,
                  uri: str,
-                 auth: tuple[str, str]
+                 auth: tuple[str, str],
+                 create_schema: bool = True,
+                 connection_config: ConnectionConfig | None = None
                  ):
         super().__init__()
         self.uri = uri
         self.auth = auth
 
-        self.driver = GraphDatabase.driver(uri, auth=auth)
+        # driver shared per uri and auth, connectivity is verified once when it is created
+        self.driver = get_neo4j_driver(uri, auth, connection_config or ConnectionConfig())
+
+        if create_schema:
+            self.ensure_schema()
+
+    def _execute_query(self, query: str, **parameters):
+        """Runs a query with driver.execute_query.
+
+        execute_query runs the query in a managed transaction, which the driver retries
+        itself on transient failures such as a lost connection. Queries are not re-run
+        here, a write whose commit acknowledgement was lost would be applied twice.
+        """
+        return self.driver.execute_query(query, **parameters)
+
+    def ensure_schema(self) -> None:
+        """Creates the :Entity node_uid uniqueness constraint and the indexes the operations rely on.
+
+        Nodes created before the :Entity label was introduced are labeled first.
+        All statements are idempotent.
+        """
+        with self.driver.session() as session:
+            summary = session.run(
+                """
+                MATCH (n) WHERE n.node_uid IS NOT NULL AND NOT n:Entity
+                CALL { WITH n SET n:Entity } IN TRANSACTIONS OF 10000 ROWS
+                """
+            ).consume()
+        if summary.counters.labels_added:
+            print(f"Added :Entity label to {summary.counters.labels_added} existing nodes.")
+
+        for statement in [
+            "CREATE CONSTRAINT entity_node_uid IF NOT EXISTS FOR (n:Entity) REQUIRE n.node_uid IS UNIQUE",
+            "CREATE CONSTRAINT tombstone_uid IF NOT EXISTS FOR (t:Tombstone) REQUIRE t.tombstone_uid IS UNIQUE",
+            "CREATE INDEX entity_updated_at IF NOT EXISTS FOR (n:Entity) ON (n.updated_at)",
+            "CREATE INDEX tombstone_updated_at IF NOT EXISTS FOR (t:Tombstone) ON (t.updated_at)",
+            "CREATE CONSTRAINT community_title IF NOT EXISTS FOR (c:Community) REQUIRE c.title IS UNIQUE",
+        ]:
+            try:
+                self._execute_query(statement)
+            except Exception as e:
+                raise Exception(f"Error creating Neo4j schema with '{statement}': {e}") from e
 
     def add_node(self, node_uid: str, node_data: NodeData) -> None:
         """Adds an node to the knowledge graph."""
 
-        # with GraphDatabase.driver(self.uri, auth=self.auth) as driver:
-        # self.driver.verify_connectivity()
-        # print("Connection established.")
-
-        summary = self.driver.execute_query(
-            "CREATE (:" + node_data.node_type + " { "
-            "node_uid: $node_uid, "
-            "node_title: $node_title, "
-            "node_type: $node_type, "
-            "node_description: $node_description, "
-            "node_degree: $node_degree, "
-            "document_id: $document_id, "
-            "community_id: $community_id, "
-            "edges_to: $edges_to, "
-            "edges_from: $edges_from, "
-            "embedding: $embedding "
-            "})",
-            node_uid=node_data.node_uid,
-            node_title=node_data.node_title,
-            node_type=node_data.node_type,
-            node_description=node_data.node_description,
-            node_degree=node_data.node_degree,
-            document_id=node_data.document_id,
-            community_id=node_data.community_id,
-            edges_to=node_data.edges_to,
-            edges_from=node_data.edges_from,
-            embedding=node_data.embedding
-        ).summary
+        try:
+            summary = self._execute_query(
+                "CREATE (:Entity:" + node_data.node_type + " { "
+                "node_uid: $node_uid, "
+                "node_title: $node_title, "
+                "node_type: $node_type, "
+                "node_description: $node_description, "
+                "node_degree: $node_degree, "
+                "document_id: $document_id, "
+                "community_id: $community_id, "
+                "edges_to: $edges_to, "
+                "edges_from: $edges_from, "
+                "embedding: $embedding, "
+                "updated_at: $updated_at "
+                "})",
+                node_uid=node_data.node_uid,
+                node_title=node_data.node_title,
+                node_type=node_data.node_type,
+                node_description=node_data.node_description,
+                node_degree=node_data.node_degree,
+                document_id=node_data.document_id,
+                community_id=node_data.community_id,
+                edges_to=node_data.edges_to,
+                edges_from=node_data.edges_from,
+                embedding=self._node_record(node_data)["embedding"],
+                updated_at=time.time()
+            ).summary
+        except ConstraintError as e:
+            raise ValueError(
+                f"Error: Node with node_uid '{node_uid}' already exists.") from e
+        self._index_nodes([node_data])
 
         # print("Created {nodes_created} nodes with if {node_uid} in {time} ms.".format(
         #     nodes_created=summary.counters.nodes_created,
@@ -66,46 +119,135 @@ class AuraKG(NoSQLKnowledgeGraph):
         # ))
         return None
 
+    def add_nodes(self, nodes: Iterable[NodeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many nodes with one UNWIND ... CREATE query per node type and batch.
+
+        Rows whose node_uid already exists are skipped by the query and reported
+        as failed in the result.
+        """
+        result = BatchWriteResult()
+        seen_uids: set[str] = set()
+
+        for chunk in batched(nodes, batch_size):
+            valid_nodes = self._validate_bulk_nodes(chunk, seen_uids, result)
+
+            # labels cannot be parameterized, so rows are grouped by node_type
+            rows_by_type: dict[str, list[dict]] = defaultdict(list)
+            for node_data in valid_nodes:
+                rows_by_type[node_data.node_type].append(self._stamped(self._node_record(node_data)))
+
+            for node_type, rows in rows_by_type.items():
+                records, _, _ = self._execute_query(
+                    """
+                    UNWIND $rows AS row
+                    OPTIONAL MATCH (existing:Entity {node_uid: row.node_uid})
+                    WITH row, existing WHERE existing IS NULL
+                    CREATE (n:Entity:""" + node_type + """)
+                    SET n = row
+                    RETURN n.node_uid AS node_uid
+                    """,
+                    rows=rows
+                )
+                created_uids = {record["node_uid"] for record in records}
+                for row in rows:
+                    if row["node_uid"] in created_uids:
+                        result.succeeded.append(row["node_uid"])
+                    else:
+                        result.failed[row["node_uid"]] = f"Error: Node with node_uid '{row['node_uid']}' already exists."
+            self._index_nodes(n for n in valid_nodes if n.node_uid not in result.failed)
+
+        return result
+
     def get_node(self, node_uid: str) -> NodeData:
         """Retrieves a node from the knowledge graph."""
 
-        self.driver.verify_connectivity()
-
         # Use a parameter for node_uid in the Cypher query
-        records, summary, keys = self.driver.execute_query(
-             "MATCH (n {node_uid: $node_uid}) RETURN n",
+        records, summary, keys = self._execute_query(
+             "MATCH (n:Entity {node_uid: $node_uid}) RETURN n",
               node_uid=node_uid  # Pass node_uid as a parameter
              )
 
         if records:  # Check if any records were returned
-            record = records[0]  # Get the first record
-            node_data = record['n']
             # Convert Neo4j node properties to NodeData object
-            return NodeData(
-                # Assuming node_uid is a property
-                node_uid=node_data.get('node_uid'),
-                node_title=node_data.get('node_title'),
-                node_type=node_data.get('node_type'),
-                node_description=node_data.get('node_description'),
-                node_degree=node_data.get('node_degree'),
-                document_id=node_data.get('document_id'),
-                edges_to=node_data.get('edges_to', []),
-                edges_from=node_data.get('edges_from', []),
-                embedding=node_data.get('embedding', [])
-            )
+            return self._node_from_record(dict(records[0]['n']))
         else:
             raise KeyError(
                 f"Error: No node found with node_uid: {node_uid}")
 
+    def get_nodes(self, node_uids: List[str], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many nodes with one UNWIND query per chunk_size node_uids."""
+        result = BatchReadResult()
+
+        for chunk in batched(dict.fromkeys(node_uids), chunk_size):
+            records, _, _ = self._execute_query(
+                """
+                UNWIND $node_uids AS node_uid
+                MATCH (n:Entity {node_uid: node_uid})
+                RETURN n
+                """,
+                node_uids=chunk
+            )
+            nodes = {record["n"]["node_uid"]: record["n"] for record in records}
+            for node_uid in chunk:
+                if node_uid in nodes:
+                    result.found[node_uid] = self._node_from_record(dict(nodes[node_uid]))
+                else:
+                    result.missing.append(node_uid)
+        return result
+
+    def get_k_hop_neighborhood(self, node_uid: str, k: int, direction: str = "both",
+                               limit: int | None = None, return_uids: bool = False,
+                               relationship_types: List[str] | None = None) -> NeighborhoodData:
+        """Returns the nodes reachable from node_uid in 1 to k hops, counted per hop.
+
+        Runs as a single variable-length path query over the stored relationships.
+        Each node is counted at the length of its shortest path.
+
+        Args:
+            relationship_types (List[str] | None): follow only "DIRECTED" or "UNDIRECTED"
+                relationships, all relationships if None.
+        """
+        self._validate_traversal(k, direction, limit)
+        if relationship_types is not None and (
+                not relationship_types or not set(relationship_types) <= {"DIRECTED", "UNDIRECTED"}):
+            raise ValueError(
+                f"Error: relationship_types must be a non-empty subset of ['DIRECTED', 'UNDIRECTED'], not {relationship_types}")
+
+        # k and the relationship types are validated, labels and lengths cannot be parameterized
+        relationship = "[:" + "|".join(relationship_types) if relationship_types else "["
+        relationship += f"*1..{k}]"
+        pattern = {"out": f"-{relationship}->",
+                   "in": f"<-{relationship}-",
+                   "both": f"-{relationship}-"}[direction]
+
+        records, _, _ = self._execute_query(
+            """
+            MATCH (s:Entity {node_uid: $node_uid})
+            OPTIONAL MATCH p = (s)""" + pattern + """(n:Entity) WHERE n <> s
+            WITH n, min(length(p)) AS hop
+            ORDER BY hop, n.node_uid
+            """ + ("LIMIT $limit " if limit is not None else "") + """
+            RETURN hop, count(n) AS count""" + (", collect(n.node_uid) AS node_uids" if return_uids else "") + """
+            ORDER BY hop
+            """,
+            node_uid=node_uid,
+            limit=(limit or 0) + 1
+        )
+
+        if not records:
+            raise KeyError(f"Error: No node found with node_uid: {node_uid}")
+
+        # a start node without neighbors returns a single row without hop
+        hops = [dict(record) for record in records if record["hop"] is not None]
+        return self._neighborhood_from_hops(node_uid, hops, limit, return_uids)
+
     def update_node(self, node_uid: str, node_data: NodeData) -> None:
         """Updates an existing node in the knowledge graph."""
 
-        self.driver.verify_connectivity()
-
         # Use parameters for all properties in the Cypher query
-        summary = self.driver.execute_query(
+        summary = self._execute_query(
             """
-            MATCH (n { node_uid: $node_uid })
+            MATCH (n:Entity {node_uid: $node_uid })
             SET n.node_title = $node_title,
                 n.node_type = $node_type,
                 n.node_description = $node_description,
@@ -114,7 +256,8 @@ class AuraKG(NoSQLKnowledgeGraph):
                 n.community_id = $community_id,
                 n.edges_to = $edges_to,
                 n.edges_from = $edges_from,
-                n.embedding = $embedding
+                n.embedding = $embedding,
+                n.updated_at = $updated_at
             RETURN n
             """,
             node_uid=node_uid,
@@ -126,71 +269,87 @@ class AuraKG(NoSQLKnowledgeGraph):
             community_id=node_data.community_id,
             edges_to=node_data.edges_to,
             edges_from=node_data.edges_from,
-            embedding=node_data.embedding
+            embedding=self._node_record(node_data)["embedding"],
+            updated_at=time.time()
         ).summary
+        self._index_nodes([node_data])
 
     def _delete_from_edge_coll(self, edge_uid: str) -> None:
         """Method to delete record from edge collection of given kg store"""
         raise NotImplementedError("Not implemented for n4j because no collections used.")
 
     def remove_node(self, node_uid: str) -> None:
-        """Removes a node from the knowledge graph."""
+        """Removes a node from the knowledge graph and its uid from the adjacency lists of its neighbors."""
 
-        self.driver.verify_connectivity()
-
-        summary = self.driver.execute_query(
-            "MATCH (n {node_uid: $node_uid}) DETACH DELETE n",
-            node_uid=node_uid
+        summary = self._execute_query(
+            """
+            MATCH (n:Entity {node_uid: $node_uid})
+            OPTIONAL MATCH (n)--(m)
+            WITH n, collect(DISTINCT m) AS neighbors
+            FOREACH (m IN neighbors |
+                SET m.edges_to = [uid IN coalesce(m.edges_to, []) WHERE uid <> $node_uid],
+                    m.edges_from = [uid IN coalesce(m.edges_from, []) WHERE uid <> $node_uid],
+                    m.updated_at = $updated_at)
+            DETACH DELETE n
+            """,
+            node_uid=node_uid,
+            updated_at=time.time()
         ).summary
 
         if summary.counters.nodes_deleted == 0:
             raise KeyError(
                 f"Error: No node found with node_uid: {node_uid}")
+
+        # leave a tombstone for refresh_networkx
+        self._write_tombstones(self._tombstone_records(node_uids=[node_uid]))
+        self._unindex_nodes([node_uid])
         return None
 
     def add_edge(self, edge_data: EdgeData) -> None:
-        """Adds an edge (relationship) between two entities in the knowledge graph."""
-
-        # get source and target node data
-        source_node_data = self.get_node(edge_data.source_uid)
-        target_node_data = self.get_node(edge_data.target_uid)
+        """Adds an edge (relationship) between two entities in the knowledge graph.
 
-        # update source and target node data
-        source_node_data.edges_to = list(
-            set(source_node_data.edges_to) | {edge_data.target_uid})
-        self.update_node(edge_data.source_uid, source_node_data)
-        target_node_data.edges_from = list(
-            set(target_node_data.edges_from) | {edge_data.source_uid})
-        self.update_node(edge_data.target_uid, target_node_data)
-
-        self.driver.verify_connectivity()
+        The relationship and the adjacency lists of both nodes are written in a single
+        query, using Cypher list operations instead of rewriting the node properties.
+        """
 
         if edge_data.directed:
             query = """
-            MATCH (source:""" + source_node_data.node_type + """ {node_uid: $source_uid}), (target:""" + target_node_data.node_type + """ {node_uid: $target_uid})
-            CREATE (source)-[:DIRECTED {description: $description}]->(target)
+            MATCH (source:Entity {node_uid: $source_uid}), (target:Entity {node_uid: $target_uid})
+            SET source.edges_to = coalesce(source.edges_to, []) + [uid IN [$target_uid] WHERE NOT uid IN coalesce(source.edges_to, [])],
+                target.edges_from = coalesce(target.edges_from, []) + [uid IN [$source_uid] WHERE NOT uid IN coalesce(target.edges_from, [])],
+                source.updated_at = $updated_at,
+                target.updated_at = $updated_at
+            MERGE (source)-[r:DIRECTED]->(target)
+            SET r.description = $description, r.updated_at = $updated_at
             """
 
         elif not edge_data.directed:
+            # Since it's undirected, also add source_uid to target's edges_to and vice versa
             query = """
-            MATCH (source:""" + source_node_data.node_type + """ {node_uid: $source_uid}), (target:""" + target_node_data.node_type + """ {node_uid: $target_uid})
-            CREATE (source)-[:UNDIRECTED {description: $description}]->(target), (target)-[:UNDIRECTED {description: $description}]->(source)
+            MATCH (source:Entity {node_uid: $source_uid}), (target:Entity {node_uid: $target_uid})
+            SET source.edges_to = coalesce(source.edges_to, []) + [uid IN [$target_uid] WHERE NOT uid IN coalesce(source.edges_to, [])],
+                source.edges_from = coalesce(source.edges_from, []) + [uid IN [$target_uid] WHERE NOT uid IN coalesce(source.edges_from, [])],
+                target.edges_to = coalesce(target.edges_to, []) + [uid IN [$source_uid] WHERE NOT uid IN coalesce(target.edges_to, [])],
+                target.edges_from = coalesce(target.edges_from, []) + [uid IN [$source_uid] WHERE NOT uid IN coalesce(target.edges_from, [])],
+                source.updated_at = $updated_at,
+                target.updated_at = $updated_at
+            MERGE (source)-[r1:UNDIRECTED]->(target)
+            MERGE (target)-[r2:UNDIRECTED]->(source)
+            SET r1.description = $description, r2.description = $description,
+                r1.updated_at = $updated_at, r2.updated_at = $updated_at
             """
 
-            # Since it's undirected, also add source_uid to target_node_data.edges_from and vice versa
-            target_node_data.edges_to = list(
-                set(target_node_data.edges_to) | {edge_data.source_uid})
-            self.update_node(edge_data.target_uid, target_node_data)
-            source_node_data.edges_from = list(
-                set(source_node_data.edges_from) | {edge_data.target_uid})
-            self.update_node(edge_data.source_uid, source_node_data)
-
-        summary = self.driver.execute_query(
-            query,
+        records, summary, keys = self._execute_query(
+            query + "RETURN count(*) AS matched",
             source_uid=edge_data.source_uid,
             target_uid=edge_data.target_uid,
-            description=edge_data.description
-        ).summary
+            description=edge_data.description,
+            updated_at=time.time()
+        )
+
+        if not records or records[0]["matched"] == 0:
+            raise KeyError(
+                f"Error: Source node '{edge_data.source_uid}' or target node '{edge_data.target_uid}' does not exist.")
 
         print("#### Created {count} egdes {origin} -> {target} egdes in {time} ms.".format(
             count=str(summary.counters.relationships_created),
@@ -201,19 +360,135 @@ class AuraKG(NoSQLKnowledgeGraph):
 
         return None
 
-    def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
-        """Retrieves an edge between two entities."""
+    def add_edges(self, edges: Iterable[EdgeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many edges with UNWIND queries, one write transaction per batch.
+
+        The adjacency updates of a batch are merged into one row per node, so every
+        node's edges_to / edges_from lists are extended exactly once per batch.
+        Relationships are merged, so re-adding an existing edge updates its description.
+        """
+        result = BatchWriteResult()
+
+        for chunk in batched(edges, batch_size):
+            endpoint_uids = {uid for e in chunk if isinstance(e, EdgeData)
+                             for uid in (e.source_uid, e.target_uid)}
+            records, _, _ = self._execute_query(
+                """
+                UNWIND $node_uids AS node_uid
+                MATCH (n:Entity {node_uid: node_uid})
+                RETURN n.node_uid AS node_uid
+                """,
+                node_uids=list(endpoint_uids)
+            )
+            existing_uids = {record["node_uid"] for record in records}
+            valid_edges = self._validate_bulk_edges(chunk, existing_uids, result)
+            if not valid_edges:
+                continue
+
+            node_rows = [self._stamped({"node_uid": node_uid,
+                                        "edges_to": sorted(delta["edges_to"]),
+                                        "edges_from": sorted(delta["edges_from"])})
+                         for node_uid, delta in self._adjacency_deltas(valid_edges).items()]
+            edge_rows = [self._stamped({"source_uid": e.source_uid,
+                                        "target_uid": e.target_uid,
+                                        "description": e.description,
+                                        "directed": e.directed}) for e in valid_edges]
+
+            try:
+                with self.driver.session() as session:
+                    session.execute_write(self._write_edge_batch, node_rows, edge_rows)
+            except Exception as e:
+                for edge_data in valid_edges:
+                    result.failed[self._generate_edge_uid(edge_data.source_uid, edge_data.target_uid)] = (
+                        f"Error: Could not add edge from '{edge_data.source_uid}' to '{edge_data.target_uid}'. Details: {e}")
+            else:
+                result.succeeded.extend(self._generate_edge_uid(e.source_uid, e.target_uid)
+                                        for e in valid_edges)
+
+        return result
+
+    def _commit_session(self, nodes: list[NodeData], updates: dict[str, NodeData],
+                        edges: list[EdgeData]) -> None:
+        """Commits the buffered writes of a KGSession in one write transaction."""
+        created, updated, deltas, _ = self._coalesce_session(nodes, updates, edges)
+
+        # labels cannot be parameterized, so created nodes are grouped by node_type
+        created_by_type: dict[str, list[dict]] = defaultdict(list)
+        for record in created:
+            created_by_type[record["node_type"]].append(record)
+        node_rows = [self._stamped({"node_uid": node_uid,
+                                    "edges_to": sorted(delta["edges_to"]),
+                                    "edges_from": sorted(delta["edges_from"])})
+                     for node_uid, delta in deltas.items()]
+        edge_rows = [self._stamped({"source_uid": e.source_uid,
+                                    "target_uid": e.target_uid,
+                                    "description": e.description,
+                                    "directed": e.directed}) for e in edges]
+
+        def _write_session(tx) -> None:
+            for node_type, rows in created_by_type.items():
+                tx.run("UNWIND $rows AS row CREATE (n:Entity:" + node_type + ") SET n = row",
+                       rows=rows).consume()
+            tx.run(
+                """
+                UNWIND $rows AS row
+                MATCH (n:Entity {node_uid: row.node_uid})
+                SET n += row
+                """,
+                rows=list(updated.values())
+            ).consume()
+            self._write_edge_batch(tx, node_rows, edge_rows)
 
-        # get source and target node data
-        source_node_data = self.get_node(source_uid)
-        target_node_data = self.get_node(target_uid)
+        try:
+            with self.driver.session() as session:
+                session.execute_write(_write_session)
+        except ConstraintError as e:
+            raise ValueError(f"Error: Session commit failed, a node already exists. Details: {e}") from e
+
+    @staticmethod
+    def _write_edge_batch(tx, node_rows: list[dict], edge_rows: list[dict]) -> None:
+        """Transaction function extending node adjacency lists and merging relationships for a batch."""
+        tx.run(
+            """
+            UNWIND $rows AS row
+            MATCH (n:Entity {node_uid: row.node_uid})
+            WITH n, row, coalesce(n.edges_to, []) AS edges_to, coalesce(n.edges_from, []) AS edges_from
+            SET n.edges_to = edges_to + [uid IN row.edges_to WHERE NOT uid IN edges_to],
+                n.edges_from = edges_from + [uid IN row.edges_from WHERE NOT uid IN edges_from],
+                n.updated_at = row.updated_at
+            """,
+            rows=node_rows
+        ).consume()
+        tx.run(
+            """
+            UNWIND $rows AS row
+            WITH row WHERE row.directed
+            MATCH (source:Entity {node_uid: row.source_uid}), (target:Entity {node_uid: row.target_uid})
+            MERGE (source)-[r:DIRECTED]->(target)
+            SET r.description = row.description, r.updated_at = row.updated_at
+            """,
+            rows=edge_rows
+        ).consume()
+        tx.run(
+            """
+            UNWIND $rows AS row
+            WITH row WHERE NOT row.directed
+            MATCH (source:Entity {node_uid: row.source_uid}), (target:Entity {node_uid: row.target_uid})
+            MERGE (source)-[r1:UNDIRECTED]->(target)
+            MERGE (target)-[r2:UNDIRECTED]->(source)
+            SET r1.description = row.description, r2.description = row.description,
+                r1.updated_at = row.updated_at, r2.updated_at = row.updated_at
+            """,
+            rows=edge_rows
+        ).consume()
 
-        self.driver.verify_connectivity()
+    def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
+        """Retrieves an edge between two entities."""
 
         # Use parameters for source_uid and target_uid
-        records, summary, keys = self.driver.execute_query(
+        records, summary, keys = self._execute_query(
             """
-            MATCH (source:""" + source_node_data.node_type + """ {node_uid: $source_uid})-[r]->(target:""" + target_node_data.node_type + """ {node_uid: $target_uid}) 
+            MATCH (source:Entity {node_uid: $source_uid})-[r]->(target:Entity {node_uid: $target_uid})
             RETURN r
             """,
             source_uid=source_uid,
@@ -224,131 +499,201 @@ class AuraKG(NoSQLKnowledgeGraph):
             record = records[0][0]
             edge_type = record.type
             description = record.get('description')
-            return EdgeData(source_uid=source_uid, target_uid=target_uid, description=description, edge_uid=self._generate_edge_uid(source_uid, target_uid))
+            return EdgeData(source_uid=source_uid, target_uid=target_uid, description=description,
+                            directed=edge_type == "DIRECTED", edge_uid=self._generate_edge_uid(source_uid, target_uid))
         else:
             raise KeyError(
                 f"Error: No edge found between source_uid: '{source_uid}' and target_uid: '{target_uid}'")
 
-    def update_edge(self, edge_data: EdgeData) -> None:
-        """Updates an existing edge in the knowledge graph."""
+    def get_edges(self, edges: List[tuple[str, str]], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many edges with one UNWIND query per chunk_size edges."""
+        result = BatchReadResult()
 
-        # get source and target node data
-        source_node_data = self.get_node(edge_data.source_uid)
-        target_node_data = self.get_node(edge_data.target_uid)
+        for chunk in batched(dict.fromkeys(edges), chunk_size):
+            records, _, _ = self._execute_query(
+                """
+                UNWIND $pairs AS pair
+                MATCH (source:Entity {node_uid: pair[0]})-[r]->(target:Entity {node_uid: pair[1]})
+                RETURN pair[0] AS source_uid, pair[1] AS target_uid, type(r) AS edge_type,
+                       r.description AS description
+                """,
+                pairs=[list(pair) for pair in chunk]
+            )
+            for record in records:
+                edge_uid = self._generate_edge_uid(record["source_uid"], record["target_uid"])
+                result.found[edge_uid] = EdgeData(source_uid=record["source_uid"], target_uid=record["target_uid"],
+                                                  description=record["description"],
+                                                  directed=record["edge_type"] == "DIRECTED", edge_uid=edge_uid)
+            result.missing += [self._generate_edge_uid(source_uid, target_uid) for source_uid, target_uid in chunk
+                               if self._generate_edge_uid(source_uid, target_uid) not in result.found]
+        return result
 
-        self.driver.verify_connectivity()
+    def update_edge(self, edge_data: EdgeData) -> None:
+        """Updates an existing edge in the knowledge graph."""
 
         # Use parameters for all properties in the Cypher query
-        summary = self.driver.execute_query(
+        records, summary, keys = self._execute_query(
             """
-            MATCH (source:""" + source_node_data.node_type + """ {node_uid: $source_uid})-[r]->(target:""" + target_node_data.node_type + """ {node_uid: $target_uid})
-            SET r.description = $description
-            RETURN r
+            MATCH (source:Entity {node_uid: $source_uid})-[r]->(target:Entity {node_uid: $target_uid})
+            SET r.description = $description,
+                r.updated_at = $updated_at,
+                source.edges_to = coalesce(source.edges_to, []) + [uid IN [$target_uid] WHERE NOT uid IN coalesce(source.edges_to, [])],
+                target.edges_from = coalesce(target.edges_from, []) + [uid IN [$source_uid] WHERE NOT uid IN coalesce(target.edges_from, [])],
+                source.updated_at = $updated_at,
+                target.updated_at = $updated_at
+            RETURN count(r) AS updated
             """,
             source_uid=edge_data.source_uid,
             target_uid=edge_data.target_uid,
-            description=edge_data.description
-        ).summary
+            description=edge_data.description,
+            updated_at=time.time()
+        )
+
+        if not records or records[0]["updated"] == 0:
+            raise KeyError(
+                f"Error: No edge found between source_uid: '{edge_data.source_uid}' and target_uid: '{edge_data.target_uid}'")
         return None
 
     def remove_edge(self, source_uid: str, target_uid: str) -> None:
-        """Removes an edge between two entities."""
+        """Removes an edge between two entities.
 
-        try:
-            # Get source and target node data (this will raise KeyError if not found)
-            source_node_data = self.get_node(source_uid)
-            target_node_data = self.get_node(target_uid)
-
-            self.driver.verify_connectivity()
-
-            # Remove edge from source to target
-            summary = self.driver.execute_query(
-                """
-                MATCH (source:""" + source_node_data.node_type + """ {node_uid: $source_uid})-[r]->(target:""" + target_node_data.node_type + """ {node_uid: $target_uid})
-                DELETE r
-                """,
-                source_uid=source_uid,
-                target_uid=target_uid
-            ).summary
+        Undirected edges are removed in both directions. The relationship and the
+        adjacency lists of both nodes are updated in a single query.
+        """
 
-            # Optionally, you might want to check if the edge was actually deleted
-            if summary.counters.relationships_deleted == 0:
-                raise KeyError(
-                    f"Error: No edge found between source_uid: '{source_uid}' and target_uid: '{target_uid}'")
-        except KeyError:
-            empty_node = NodeData(
-                node_uid="",
-                node_title="",
-                node_type="",
-                node_description="",
-                node_degree=0,
-                document_id="",
-            )
-            source_node_data = empty_node
-            target_node_data = empty_node
+        records, summary, keys = self._execute_query(
+            """
+            MATCH (source:Entity {node_uid: $source_uid})-[r]->(target:Entity {node_uid: $target_uid})
+            WITH source, target, r, type(r) = 'UNDIRECTED' AS undirected
+            OPTIONAL MATCH (target)-[reverse:UNDIRECTED]->(source) WHERE undirected
+            DELETE r, reverse
+            SET source.edges_to = [uid IN coalesce(source.edges_to, []) WHERE uid <> $target_uid],
+                target.edges_from = [uid IN coalesce(target.edges_from, []) WHERE uid <> $source_uid],
+                source.edges_from = CASE WHEN undirected
+                    THEN [uid IN coalesce(source.edges_from, []) WHERE uid <> $target_uid]
+                    ELSE source.edges_from END,
+                target.edges_to = CASE WHEN undirected
+                    THEN [uid IN coalesce(target.edges_to, []) WHERE uid <> $source_uid]
+                    ELSE target.edges_to END,
+                source.updated_at = $updated_at,
+                target.updated_at = $updated_at
+            RETURN undirected
+            """,
+            source_uid=source_uid,
+            target_uid=target_uid,
+            updated_at=time.time()
+        )
 
-        # Update the node data to reflect the removed edge
-        try:
-            source_node_data.edges_to.remove(target_uid)
-            self.update_node(source_uid, source_node_data)
-        except ValueError:
-            pass  # Target node not in source's edges_to, likely due to a directed edge
+        if summary.counters.relationships_deleted == 0:
+            raise KeyError(
+                f"Error: No edge found between source_uid: '{source_uid}' and target_uid: '{target_uid}'")
 
-        try:
-            target_node_data.edges_from.remove(source_uid)
-            self.update_node(target_uid, target_node_data)
-        except ValueError:
-            pass  # Source node not in target's edges_from, likely due to a directed edge
+        # leave tombstones for refresh_networkx
+        removed_edges = [(source_uid, target_uid)]
+        if records[0]["undirected"]:
+            removed_edges.append((target_uid, source_uid))
+        self._write_tombstones(self._tombstone_records(edges=removed_edges))
         return None
 
-    def build_networkx(self) -> nx.Graph:
+    def build_networkx(self, attributes: List[str] | None = None) -> nx.Graph:
         """Builds the NetworkX representation of the full graph.
         https://networkx.org/documentation/stable/index.html
+
+        Only node_uid, node_type and the requested attributes are returned with a
+        map projection, relationships only return the node_uid of both ends.
         """
+        node_fields = self._networkx_node_fields(attributes)
         graph = nx.Graph()  # Initialize an undirected NetworkX graph
 
-        self.driver.verify_connectivity()
-
-        # 1. Fetch all nodes and their properties
-        records, summary, keys = self.driver.execute_query("MATCH (n) RETURN n")
+        # 1. Fetch all nodes with the projected properties
+        records, summary, keys = self._execute_query(
+            "MATCH (n:Entity) RETURN " + self._node_projection(node_fields) + " AS n")
 
             # Check if any records were returned
         if records:
             for record in records:
-                node = record["n"]
-                node_data = {
-                    "node_uid": node.get("node_uid"),
-                    "node_title": node.get("node_title"),
-                    "node_type": node.get("node_type"),
-                    "node_description": node.get("node_description"),
-                    "node_degree": node.get("node_degree"),
-                    "document_id": node.get("document_id"),
-                    "edges_to": node.get("edges_to", []),
-                    "edges_from": node.get("edges_from", []),
-                    "embedding": node.get("embedding", [])
-                }
-                graph.add_node(node.get("node_uid"), **node_data)
+                node_data = record["n"]
+                graph.add_node(node_data["node_uid"], **node_data)
 
             # 2. Fetch all relationships and add edges to the graph
-            records, summary, keys = self.driver.execute_query(
-                "MATCH (source)-[r]->(target) RETURN source, r, target")
+            records, summary, keys = self._execute_query(
+                """
+                MATCH (source:Entity)-[r]->(target:Entity)
+                RETURN source.node_uid AS source_uid, target.node_uid AS target_uid
+                """)
             for record in records:
-                source_uid = record["source"]["node_uid"]
-                target_uid = record["target"]["node_uid"]
-                # Add edge attributes if needed (e.g., 'description' from 'r')
-                graph.add_edge(source_uid, target_uid)
+                graph.add_edge(record["source_uid"], record["target_uid"])
         else:
             print(
                 "Warning: No nodes found in the database. Returning an empty NetworkX graph.")
 
         self.networkx = graph
+        self.networkx_attributes = node_fields
         return graph
 
+    @staticmethod
+    def _node_projection(node_fields: List[str]) -> str:
+        """Returns a Cypher map projection of node n, node_fields are validated NodeData field names."""
+        return "n {" + ", ".join(f".{field}" for field in node_fields) + "}"
+
+    def _get_changes_since(self, since: float, node_fields: List[str]) -> GraphChanges:
+        """Reads the nodes, relationships and tombstones with an updated_at watermark at or after since."""
+        node_records, _, _ = self._execute_query(
+            "MATCH (n:Entity) WHERE n.updated_at >= $since RETURN "
+            + self._node_projection(node_fields) + " AS n",
+            since=since
+        )
+        edge_records, _, _ = self._execute_query(
+            """
+            MATCH (source:Entity)-[r]->(target:Entity) WHERE r.updated_at >= $since
+            RETURN source.node_uid AS source_uid, target.node_uid AS target_uid
+            """,
+            since=since
+        )
+        tombstone_records, _, _ = self._execute_query(
+            "MATCH (t:Tombstone) WHERE t.updated_at >= $since RETURN t",
+            since=since
+        )
+        changes = GraphChanges(
+            nodes=[record["n"] for record in node_records],
+            edges=[(record["source_uid"], record["target_uid"]) for record in edge_records]
+        )
+        return self._add_tombstones(changes, (dict(record["t"]) for record in tombstone_records))
+
+    def _scan_nodes(self, node_fields: List[str]) -> List[dict]:
+        """Reads the given properties of all Entity nodes, including nodes written without an updated_at watermark."""
+        records, _, _ = self._execute_query(
+            "MATCH (n:Entity) RETURN " + self._node_projection(node_fields) + " AS n")
+        return [record["n"] for record in records]
+
+    def _write_tombstones(self, tombstones: list[dict]) -> None:
+        """Merges tombstone records as :Tombstone nodes, which are not labeled :Entity."""
+        self._execute_query(
+            """
+            UNWIND $rows AS row
+            MERGE (t:Tombstone {tombstone_uid: row.tombstone_uid})
+            SET t += row
+            """,
+            rows=tombstones
+        )
+
     def store_community(self, community: CommunityData) -> None:
         """Takes valid graph community data and upserts the database with it.
         https://www.nature.com/articles/s41598-019-41695-z
+        Communities are :Community nodes keyed by title, the findings are stored as JSON string.
         """
-        pass
+        community_dict = community.__to_dict__()
+        community_dict["findings"] = json.dumps(community.findings) if community.findings is not None else None
+        try:
+            self._execute_query(
+                """
+                MERGE (c:Community {title: $community.title})
+                SET c += $community
+                """,
+                community=community_dict
+            )
+        except Exception as e:
+            raise Exception(f"Error storing community data: {e}") from e
 
     def _generate_edge_uid(self, source_uid: str, target_uid: str) -> str:
         """Generates Edge uid for the network based on source and target nod uid"""
@@ -372,17 +717,75 @@ class AuraKG(NoSQLKnowledgeGraph):
         except KeyError:
             return False  # Node does not exist
 
-    def get_nearest_neighbors(self, query_vec) -> List[str]:
-        """Implements nearest neighbor search based on nosql db index."""
-        pass
+    def get_nearest_neighbors(self, query_vec, k: int = 10, distance: str | None = None,
+                              fields: List[str] | None = None,
+                              pre_filter: dict | None = None) -> List[NeighborData]:
+        """Nearest neighbor search through the local vector_index attached to the graph."""
+        return self._index_nearest_neighbors(query_vec, k=k, distance=distance, fields=fields,
+                                             pre_filter=pre_filter)
+
+    def _filter_node_uids(self, pre_filter: dict) -> List[str]:
+        """Reads the node_uids matching pre_filter with one query over the Entity nodes."""
+        # pre_filter keys are validated against NN_PRE_FILTER_FIELDS, values are parameters
+        conditions = " AND ".join(f"n.{field} = $filter.{field}" for field in pre_filter)
+        records, _, _ = self._execute_query(
+            f"MATCH (n:Entity) WHERE {conditions} RETURN n.node_uid AS node_uid",
+            filter=pre_filter
+        )
+        return [record["node_uid"] for record in records]
+
+    def _get_node_fields(self, node_uids: List[str], fields: List[str]) -> dict[str, dict]:
+        """Reads only the requested properties of node_uids, with one UNWIND query per 500 node_uids."""
+        # fields are validated NodeData field names, so they can form the map projection
+        projection = ", ".join(f".{field}" for field in fields)
+        node_fields = {}
+        for chunk in batched(dict.fromkeys(node_uids), 500):
+            records, _, _ = self._execute_query(
+                """
+                UNWIND $node_uids AS node_uid
+                MATCH (n:Entity {node_uid: node_uid})
+                RETURN n.node_uid AS node_uid, n {""" + projection + """} AS properties
+                """,
+                node_uids=chunk
+            )
+            for record in records:
+                node_fields[record["node_uid"]] = {field: record["properties"].get(field) for field in fields}
+        return node_fields
 
     def get_community(self, community_id: str) -> CommunityData:
         """Retrieves the community report for a given community id."""
-        pass
+        records, _, _ = self._execute_query(
+            "MATCH (c:Community {title: $title}) RETURN c",
+            title=community_id
+        )
+        if not records:
+            raise KeyError(
+                f"Error: No community found with community_id: {community_id}")
+        return self._community_from_properties(dict(records[0]["c"]))
 
     def list_communities(self) -> List[CommunityData]:
         """Lists all stored communities for the given network."""
-        pass
+        records, _, _ = self._execute_query("MATCH (c:Community) RETURN c")
+        return [self._community_from_properties(dict(record["c"])) for record in records]
+
+    @staticmethod
+    def _community_from_properties(properties: dict) -> CommunityData:
+        """Converts the properties of a :Community node to CommunityData."""
+        if properties.get("findings") is not None:
+            properties["findings"] = json.loads(properties["findings"])
+        return CommunityData.__from_dict__(properties)
+
+    def _community_records(self, min_rating: int | None) -> List[dict]:
+        """Reads the fields of community search only, with one query over the :Community nodes."""
+        records, _, _ = self._execute_query(
+            """
+            MATCH (c:Community)
+            WHERE $min_rating IS NULL OR c.rating >= $min_rating
+            RETURN c {.title, .summary, .rating, .community_uid, .community_embedding} AS community
+            """,
+            min_rating=min_rating
+        )
+        return [record["community"] for record in records]
 
     def clean_zerodegree_nodes(self) -> None:
         """Removes all nodes with degree 0."""
@@ -390,13 +793,15 @@ class AuraKG(NoSQLKnowledgeGraph):
 
     def flush_kg(self) -> None:
         """Method to wipe the complete datastore of the knowledge graph"""
-        self.driver.verify_connectivity()
-        summary = self.driver.execute_query(
+        summary = self._execute_query(
                 """
                 MATCH (n) 
                 DETACH DELETE n
                 """
             ).summary
+        # the networkx representation has to be rebuilt from scratch
+        self.networkx_synced_at = None
+        self._clear_index()
         return None
 
 
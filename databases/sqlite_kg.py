@@ -0,0 +1,617 @@
+"""SQLite database operations implementation"""
+
+from array import array
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List
+import dataclasses
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import networkx as nx  # type: ignore
+
+from datamodel.data_model import NodeData, EdgeData, CommunityData, BatchWriteResult, BatchReadResult, GraphChanges, NeighborData, NeighborBatchData
+from base.operations import NoSQLKnowledgeGraph, batched
+from base.vectors import nearest, nearest_batch
+
+
+# NodeData fields stored as columns of the nodes table, the adjacency lists are read from the edges table
+_NODE_COLUMNS = ["node_uid", "node_title", "node_type", "node_description", "node_degree",
+                 "document_id", "community_id", "embedding"]
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS nodes (
+        node_uid TEXT PRIMARY KEY,
+        node_title TEXT,
+        node_type TEXT,
+        node_description TEXT,
+        node_degree INTEGER,
+        document_id TEXT,
+        community_id INTEGER,
+        embedding BLOB,
+        updated_at REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS edges (
+        edge_uid TEXT PRIMARY KEY,
+        source_uid TEXT NOT NULL,
+        target_uid TEXT NOT NULL,
+        description TEXT,
+        directed INTEGER,
+        document_id TEXT,
+        updated_at REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS communities (
+        title TEXT PRIMARY KEY,
+        data TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS tombstones (
+        tombstone_uid TEXT PRIMARY KEY,
+        kind TEXT,
+        uid TEXT,
+        source_uid TEXT,
+        target_uid TEXT,
+        updated_at REAL
+    )""",
+    "CREATE INDEX IF NOT EXISTS nodes_node_type ON nodes (node_type)",
+    "CREATE INDEX IF NOT EXISTS nodes_document_id ON nodes (document_id)",
+    "CREATE INDEX IF NOT EXISTS nodes_community_id ON nodes (community_id)",
+    "CREATE INDEX IF NOT EXISTS nodes_updated_at ON nodes (updated_at)",
+    "CREATE INDEX IF NOT EXISTS edges_source_uid ON edges (source_uid, target_uid)",
+    "CREATE INDEX IF NOT EXISTS edges_target_uid ON edges (target_uid, source_uid)",
+    "CREATE INDEX IF NOT EXISTS edges_updated_at ON edges (updated_at)",
+    "CREATE INDEX IF NOT EXISTS tombstones_updated_at ON tombstones (updated_at)",
+]
+
+# maximum number of ? parameters per IN (...) clause
+_CHUNK_SIZE = 500
+
+
+def _encode_embedding(embedding: list[float]) -> bytes:
+    return array("d", embedding).tobytes()
+
+
+def _decode_embedding(blob: bytes | None) -> list[float]:
+    embedding = array("d")
+    embedding.frombytes(blob or b"")
+    return embedding.tolist()
+
+
+def _placeholders(values: list) -> str:
+    return ", ".join("?" * len(values))
+
+
+class SQLiteKG(NoSQLKnowledgeGraph):
+    """
+    SQLite database operations implementation class for single node deployments.
+
+    Nodes and edges are stored in indexed tables. The edges_to / edges_from adjacency
+    of a node is read from the edges table through its source_uid and target_uid
+    indexes, so update_node does not change the edges of a node.
+
+    The database runs in WAL mode: every thread uses its own connection, readers
+    do not block each other or the writer.
+    """
+
+    def __init__(self, database_path: str, timeout: float = 30.0) -> None:
+        """
+        Initializes the SQLiteKG object.
+
+        Args:
+            database_path (str): path of the SQLite database file, created if missing.
+            timeout (float): seconds to wait for the write lock of another connection.
+        """
+        super().__init__()
+        self.database_path = database_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self.ensure_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns the connection of the current thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # autocommit mode, transactions are started explicitly by _transaction
+            conn = sqlite3.connect(self.database_path, timeout=self.timeout,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Runs the block in a write transaction, nested blocks join the outer transaction.
+
+        Vector index updates of the writes in the transaction are applied once it committed.
+        """
+        conn = self._connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        self._local.after_commit = []
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+            after_commit, self._local.after_commit = self._local.after_commit, []
+        for callback, args in after_commit:
+            callback(*args)
+
+    def _index_nodes(self, nodes: Iterable[NodeData]) -> None:
+        """Upserts the embeddings of written nodes into the vector_index after the open transaction commits."""
+        nodes = list(nodes)
+        if getattr(self._local, "depth", 0):
+            self._local.after_commit.append((super()._index_nodes, (nodes,)))
+        else:
+            super()._index_nodes(nodes)
+
+    def _unindex_nodes(self, node_uids: Iterable[str]) -> None:
+        """Removes the embeddings of removed nodes from the vector_index after the open transaction commits."""
+        node_uids = list(node_uids)
+        if getattr(self._local, "depth", 0):
+            self._local.after_commit.append((super()._unindex_nodes, (node_uids,)))
+        else:
+            super()._unindex_nodes(node_uids)
+
+    def ensure_schema(self) -> None:
+        """Creates the tables and indexes if they do not exist."""
+        with self._transaction() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def close(self) -> None:
+        """Closes the connection of the current thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _node_row(node_data: NodeData) -> tuple:
+        """Returns the nodes table row of a node, stamped with its updated_at watermark."""
+        return (node_data.node_uid, node_data.node_title, node_data.node_type, node_data.node_description,
+                node_data.node_degree, node_data.document_id, node_data.community_id,
+                _encode_embedding(node_data.embedding), time.time())
+
+    def _select_nodes(self, fields: List[str], where: str = "", parameters: tuple = ()) -> list[dict]:
+        """Returns the requested NodeData fields of the nodes matching where.
+
+        edges_to and edges_from are read from the edges table if requested.
+        """
+        columns = list(dict.fromkeys(["node_uid"] + [f for f in fields if f in _NODE_COLUMNS]))
+        records = []
+        for row in self._connection().execute(
+                f"SELECT {', '.join(columns)} FROM nodes {where}", parameters):
+            record = dict(zip(columns, row))
+            if "embedding" in record:
+                record["embedding"] = _decode_embedding(record["embedding"])
+            records.append(record)
+
+        if "edges_to" in fields or "edges_from" in fields:
+            adjacency = self._adjacency([record["node_uid"] for record in records])
+            for record in records:
+                record["edges_to"], record["edges_from"] = adjacency[record["node_uid"]]
+        return [{field: record[field] for field in fields} for record in records]
+
+    def _adjacency(self, node_uids: List[str]) -> dict[str, tuple[list[str], list[str]]]:
+        """Returns (edges_to, edges_from) of node_uids, read through the edges table indexes."""
+        adjacency: dict[str, tuple[list[str], list[str]]] = {uid: ([], []) for uid in node_uids}
+        conn = self._connection()
+        for chunk in batched(list(adjacency), _CHUNK_SIZE):
+            for source_uid, target_uid in conn.execute(
+                    f"SELECT source_uid, target_uid FROM edges WHERE source_uid IN ({_placeholders(chunk)}) ORDER BY rowid",
+                    chunk):
+                adjacency[source_uid][0].append(target_uid)
+            for source_uid, target_uid in conn.execute(
+                    f"SELECT source_uid, target_uid FROM edges WHERE target_uid IN ({_placeholders(chunk)}) ORDER BY rowid",
+                    chunk):
+                adjacency[target_uid][1].append(source_uid)
+        return adjacency
+
+    def _existing_node_uids(self, node_uids: Iterable[str]) -> set[str]:
+        """Returns the node_uids that exist, with one query per 500 node_uids."""
+        existing = set()
+        for chunk in batched(dict.fromkeys(node_uids), _CHUNK_SIZE):
+            existing |= {row[0] for row in self._connection().execute(
+                f"SELECT node_uid FROM nodes WHERE node_uid IN ({_placeholders(chunk)})", chunk)}
+        return existing
+
+    def add_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Adds an node to the knowledge graph."""
+        if node_data.edges_to or node_data.edges_from:
+            raise ValueError(
+                f"""Error: NodeData cannot be initiated with edges_to or edges_from. Please add edges separately.""")
+
+        try:
+            with self._transaction() as conn:
+                conn.execute("INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._node_row(node_data))
+        except sqlite3.IntegrityError as e:
+            raise ValueError(
+                f"Error: Node with node_uid '{node_uid}' already exists.") from e
+        self._index_nodes([node_data])
+
+    def add_nodes(self, nodes: Iterable[NodeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many nodes with one executemany INSERT per batch, each batch in one transaction."""
+        result = BatchWriteResult()
+        seen_uids: set[str] = set()
+
+        for chunk in batched(nodes, batch_size):
+            valid_nodes = self._validate_bulk_nodes(chunk, seen_uids, result)
+            # the existence check runs under the write lock, so no node_uid is inserted in between
+            with self._transaction() as conn:
+                existing_uids = self._existing_node_uids(n.node_uid for n in valid_nodes)
+                new_nodes = []
+                for node_data in valid_nodes:
+                    if node_data.node_uid in existing_uids:
+                        result.failed[node_data.node_uid] = f"Error: Node with node_uid '{node_data.node_uid}' already exists."
+                    else:
+                        new_nodes.append(node_data)
+
+                conn.executemany("INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [self._node_row(node_data) for node_data in new_nodes])
+            result.succeeded.extend(node_data.node_uid for node_data in new_nodes)
+            self._index_nodes(new_nodes)
+
+        return result
+
+    def get_node(self, node_uid: str) -> NodeData:
+        """Retrieves an node from the knowledge graph."""
+        records = self._select_nodes(_NODE_COLUMNS + ["edges_to", "edges_from"],
+                                     "WHERE node_uid = ?", (node_uid,))
+        if records:
+            return NodeData.__from_dict__(records[0])
+        else:
+            raise KeyError(f"Error: No node found with node_uid: {node_uid}")
+
+    def get_nodes(self, node_uids: List[str], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many nodes with one query per chunk_size node_uids."""
+        result = BatchReadResult()
+
+        for chunk in batched(dict.fromkeys(node_uids), min(chunk_size, _CHUNK_SIZE)):
+            records = {record["node_uid"]: record for record in self._select_nodes(
+                _NODE_COLUMNS + ["edges_to", "edges_from"],
+                f"WHERE node_uid IN ({_placeholders(chunk)})", tuple(chunk))}
+            for node_uid in chunk:
+                if node_uid in records:
+                    result.found[node_uid] = NodeData.__from_dict__(records[node_uid])
+                else:
+                    result.missing.append(node_uid)
+        return result
+
+    def _get_adjacency(self, node_uids: List[str]) -> dict[str, tuple[list[str], list[str]]]:
+        """Reads the adjacency of the existing node_uids through the edges table indexes."""
+        return self._adjacency(list(self._existing_node_uids(node_uids)))
+
+    def update_node(self, node_uid: str, node_data: NodeData) -> None:
+        """Updates an existing node in the knowledge graph, the edges of the node are not changed."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE nodes SET node_title = ?, node_type = ?, node_description = ?, node_degree = ?,
+                    document_id = ?, community_id = ?, embedding = ?, updated_at = ?
+                WHERE node_uid = ?
+                """,
+                self._node_row(node_data)[1:] + (node_uid,))
+        if cursor.rowcount == 0:
+            raise KeyError(
+                f"Error: Node with node_uid '{node_uid}' does not exist.")
+        self._index_nodes([dataclasses.replace(node_data, node_uid=node_uid)])
+
+    def remove_node(self, node_uid: str) -> None:
+        """Removes a node and all edges to and from it."""
+        with self._transaction() as conn:
+            cursor = conn.execute("DELETE FROM nodes WHERE node_uid = ?", (node_uid,))
+            if cursor.rowcount == 0:
+                raise KeyError(f"Error: No node found with node_uid: {node_uid}")
+            conn.execute("DELETE FROM edges WHERE source_uid = ? OR target_uid = ?", (node_uid, node_uid))
+            # leave a tombstone for refresh_networkx
+            self._write_tombstones(self._tombstone_records(node_uids=[node_uid]))
+        self._unindex_nodes([node_uid])
+
+    def add_edge(self, edge_data: EdgeData) -> None:
+        """Adds an edge (relationship) between two entities in the knowledge graph."""
+
+        # Type checking for edge_data
+        if not isinstance(edge_data, EdgeData):
+            raise TypeError(
+                f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+
+        with self._transaction():
+            existing_uids = self._existing_node_uids([edge_data.source_uid, edge_data.target_uid])
+            for role, node_uid in (("Source", edge_data.source_uid), ("Target", edge_data.target_uid)):
+                if node_uid not in existing_uids:
+                    raise KeyError(
+                        f"Error: {role} node with node_uid '{node_uid}' does not exist.")
+            self._upsert_edges([edge_data])
+
+    def add_edges(self, edges: Iterable[EdgeData], batch_size: int = 500) -> BatchWriteResult:
+        """Adds many edges with one executemany upsert per batch, each batch in one transaction."""
+        result = BatchWriteResult()
+
+        for chunk in batched(edges, batch_size):
+            with self._transaction():
+                existing_uids = self._existing_node_uids(uid for e in chunk if isinstance(e, EdgeData)
+                                                         for uid in (e.source_uid, e.target_uid))
+                valid_edges = self._validate_bulk_edges(chunk, existing_uids, result)
+                self._upsert_edges(valid_edges)
+            result.succeeded.extend(self._generate_edge_uid(e.source_uid, e.target_uid)
+                                    for e in valid_edges)
+
+        return result
+
+    def _upsert_edges(self, edges: list[EdgeData]) -> None:
+        """Inserts or updates the edge records of edges, including the reverse records of undirected edges."""
+        self._connection().executemany(
+            """
+            INSERT INTO edges (edge_uid, source_uid, target_uid, description, directed, document_id, updated_at)
+            VALUES (:edge_uid, :source_uid, :target_uid, :description, :directed, :document_id, :updated_at)
+            ON CONFLICT (edge_uid) DO UPDATE SET
+                description = excluded.description,
+                directed = excluded.directed,
+                document_id = excluded.document_id,
+                updated_at = excluded.updated_at
+            """,
+            [{**record, "document_id": edge_data.document_id}
+             for edge_data in edges for record in self._edge_records(edge_data)])
+
+    def get_edge(self, source_uid: str, target_uid: str) -> EdgeData:
+        """Retrieves an edge between two entities."""
+        edge_uid = self._generate_edge_uid(source_uid, target_uid)
+        row = self._connection().execute(
+            "SELECT edge_uid, source_uid, target_uid, description, directed, document_id FROM edges WHERE edge_uid = ?",
+            (edge_uid,)).fetchone()
+
+        if row:
+            edge_data = EdgeData.__from_dict__(dict(zip(
+                ["edge_uid", "source_uid", "target_uid", "description", "directed", "document_id"], row)))
+            edge_data.directed = bool(edge_data.directed)
+            return edge_data
+        else:
+            raise KeyError(f"Error: No edge found with edge_uid: {edge_uid}")
+
+    def get_edges(self, edges: List[tuple[str, str]], chunk_size: int = 500) -> BatchReadResult:
+        """Retrieves many edges with one query per chunk_size edges."""
+        result = BatchReadResult()
+        edge_uids = [self._generate_edge_uid(source_uid, target_uid) for source_uid, target_uid in edges]
+        columns = ["edge_uid", "source_uid", "target_uid", "description", "directed", "document_id"]
+
+        for chunk in batched(dict.fromkeys(edge_uids), min(chunk_size, _CHUNK_SIZE)):
+            rows = {row[0]: row for row in self._connection().execute(
+                f"SELECT {', '.join(columns)} FROM edges WHERE edge_uid IN ({_placeholders(chunk)})", tuple(chunk))}
+            for edge_uid in chunk:
+                if edge_uid in rows:
+                    edge_data = EdgeData.__from_dict__(dict(zip(columns, rows[edge_uid])))
+                    edge_data.directed = bool(edge_data.directed)
+                    result.found[edge_uid] = edge_data
+                else:
+                    result.missing.append(edge_uid)
+        return result
+
+    def update_edge(self, edge_data: EdgeData) -> None:
+        """Updates an existing edge in the knowledge graph."""
+
+        if not isinstance(edge_data, EdgeData):
+            raise TypeError(
+                f"Error: edge_data must be of type EdgeData, not {type(edge_data)}")
+
+        record = self._edge_records(edge_data)[0]
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE edges SET description = ?, directed = ?, updated_at = ? WHERE edge_uid = ?",
+                (record["description"], record["directed"], record["updated_at"], record["edge_uid"]))
+        if cursor.rowcount == 0:
+            raise KeyError(
+                f"Error: Edge with edge_uid '{record['edge_uid']}' does not exist.")
+
+    def _delete_from_edge_coll(self, edge_uid: str) -> None:
+        """Method to delete record from edge collection of given kg store"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM edges WHERE edge_uid = ?", (edge_uid,))
+
+    def remove_edge(self, source_uid: str, target_uid: str) -> None:
+        """Removes an edge between two entities, undirected edges in both directions."""
+
+        # Get involved edge data, only needed to know whether the edge is directed
+        edge_data = self.get_edge(source_uid=source_uid, target_uid=target_uid)
+
+        removed_edges = [(source_uid, target_uid)]
+        if not edge_data.directed:
+            removed_edges.append((target_uid, source_uid))
+
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM edges WHERE edge_uid = ?",
+                             [(self._generate_edge_uid(s, t),) for s, t in removed_edges])
+            # leave tombstones for refresh_networkx
+            self._write_tombstones(self._tombstone_records(edges=removed_edges))
+
+    def _commit_session(self, nodes: list[NodeData], updates: dict[str, NodeData],
+                        edges: list[EdgeData]) -> None:
+        """Commits the buffered writes of a KGSession in one transaction."""
+        with self._transaction():
+            super()._commit_session(nodes, updates, edges)
+
+    def build_networkx(self, attributes: List[str] | None = None) -> None:
+        """Builds the NetworkX representation of the full graph.
+        https://networkx.org/documentation/stable/index.html
+
+        Only node_uid, node_type and the requested attributes are selected,
+        edges only read source_uid and target_uid.
+        """
+        node_fields = self._networkx_node_fields(attributes)
+        graph = nx.Graph()  # Initialize an undirected NetworkX graph
+
+        for node in self._select_nodes(node_fields):
+            graph.add_node(node["node_uid"], **node)
+        graph.add_edges_from(self._connection().execute("SELECT source_uid, target_uid FROM edges"))
+
+        self.networkx = graph
+        self.networkx_attributes = node_fields
+
+    def _get_changes_since(self, since: float, node_fields: List[str]) -> GraphChanges:
+        """Reads the nodes, edges and tombstones with an updated_at watermark at or after since."""
+        conn = self._connection()
+        changes = GraphChanges(
+            nodes=self._select_nodes(node_fields, "WHERE updated_at >= ?", (since,)),
+            edges=[tuple(row) for row in conn.execute(
+                "SELECT source_uid, target_uid FROM edges WHERE updated_at >= ?", (since,))]
+        )
+        columns = ["tombstone_uid", "kind", "uid", "source_uid", "target_uid", "updated_at"]
+        return self._add_tombstones(changes, (dict(zip(columns, row)) for row in conn.execute(
+            f"SELECT {', '.join(columns)} FROM tombstones WHERE updated_at >= ?", (since,))))
+
+    def _write_tombstones(self, tombstones: list[dict]) -> None:
+        """Upserts tombstone records into the tombstones table."""
+        with self._transaction() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO tombstones (tombstone_uid, kind, uid, source_uid, target_uid, updated_at)
+                VALUES (:tombstone_uid, :kind, :uid, :source_uid, :target_uid, :updated_at)
+                """,
+                [{"uid": None, "source_uid": None, "target_uid": None, **tombstone} for tombstone in tombstones])
+
+    def store_community(self, community: CommunityData) -> None:
+        """Takes valid graph community data and upserts the database with it.
+        https://www.nature.com/articles/s41598-019-41695-z
+        """
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO communities (title, data) VALUES (?, ?)",
+                         (community.title, json.dumps(community.__to_dict__())))
+
+    def _generate_edge_uid(self, source_uid: str, target_uid: str) -> str:
+        return f"{source_uid}_to_{target_uid}"
+
+    def get_nearest_neighbors(self, query_vec, k: int = 10, distance: str | None = None,
+                              fields: List[str] | None = None,
+                              pre_filter: dict | None = None) -> List[NeighborData]:
+        """Brute-force nearest neighbor search over the embeddings of the nodes matching pre_filter.
+
+        Nodes without an embedding of matching dimension are skipped.
+        Searches through the vector_index instead if one is attached.
+        """
+        if self.vector_index is not None:
+            return self._index_nearest_neighbors(query_vec, k=k, distance=distance, fields=fields,
+                                                 pre_filter=pre_filter)
+        distance = self._resolve_distance(distance)
+        self._validate_nn_query(k, distance, fields, pre_filter)
+        node_uids, matrix = self._embedding_matrix(len(query_vec), pre_filter)
+        return self._neighbors(nearest(node_uids, matrix, query_vec, k, distance), fields)
+
+    def get_nearest_neighbors_batch(self, queries: np.ndarray, k: int = 10, distance: str | None = None,
+                                    pre_filter: dict | None = None) -> NeighborBatchData:
+        """Brute-force nearest neighbor search for every row of queries with one blocked matrix product.
+
+        Searches through the vector_index instead if one is attached.
+        """
+        if self.vector_index is not None:
+            return super().get_nearest_neighbors_batch(queries, k=k, distance=distance, pre_filter=pre_filter)
+        distance = self._resolve_distance(distance)
+        self._validate_nn_query(k, distance, None, pre_filter)
+        queries = np.asarray(queries, dtype=np.float32)
+        node_uids, matrix = self._embedding_matrix(queries.shape[1], pre_filter)
+        uids, dists = nearest_batch(node_uids, matrix, queries, k, distance)
+        return NeighborBatchData(node_uids=uids, distances=dists)
+
+    def _embedding_matrix(self, dim: int, pre_filter: dict | None) -> tuple[List[str], np.ndarray]:
+        """Reads the node_uids and float32 embedding matrix of the nodes matching pre_filter with dim dimensional embeddings.
+
+        The embedding blobs are copied into the matrix directly, without decoding them to lists.
+        """
+        where, parameters = self._filter_clause(pre_filter or {})
+        node_uids, blobs = [], []
+        for node_uid, blob in self._connection().execute(
+                f"SELECT node_uid, embedding FROM nodes {where}", parameters):
+            if blob is not None and len(blob) == 8 * dim:
+                node_uids.append(node_uid)
+                blobs.append(blob)
+        matrix = np.frombuffer(b"".join(blobs), dtype=np.float64).reshape(len(blobs), dim).astype(np.float32)
+        return node_uids, matrix
+
+    @staticmethod
+    def _filter_clause(pre_filter: dict) -> tuple[str, tuple]:
+        """Returns the WHERE clause and parameters of the equality filters in pre_filter."""
+        if not pre_filter:
+            return "", ()
+        # pre_filter keys are validated against NN_PRE_FILTER_FIELDS, values are parameters
+        return ("WHERE " + " AND ".join(f"{field} = ?" for field in pre_filter),
+                tuple(pre_filter.values()))
+
+    def _scan_nodes(self, node_fields: List[str]) -> List[dict]:
+        """Reads the given fields of all nodes, including rows without an updated_at watermark."""
+        return self._select_nodes(node_fields)
+
+    def _filter_node_uids(self, pre_filter: dict) -> List[str]:
+        """Reads the node_uids matching pre_filter through the node_type, document_id and community_id indexes."""
+        where, parameters = self._filter_clause(pre_filter)
+        return [row[0] for row in self._connection().execute(f"SELECT node_uid FROM nodes {where}", parameters)]
+
+    def _get_node_fields(self, node_uids: List[str], fields: List[str]) -> dict[str, dict]:
+        """Reads only the requested fields of node_uids, with one query per 500 node_uids."""
+        node_fields = {}
+        for chunk in batched(dict.fromkeys(node_uids), _CHUNK_SIZE):
+            for record in self._select_nodes(["node_uid", *fields],
+                                             f"WHERE node_uid IN ({_placeholders(chunk)})", tuple(chunk)):
+                node_fields[record["node_uid"]] = {field: record[field] for field in fields}
+        return node_fields
+
+    def get_community(self, community_id: str) -> CommunityData:
+        """Retrieves the community report for a given community id."""
+        row = self._connection().execute(
+            "SELECT data FROM communities WHERE title = ?", (community_id,)).fetchone()
+        if row:
+            return CommunityData.__from_dict__(json.loads(row[0]))
+        else:
+            raise KeyError(
+                f"Error: No community found with community_id: {community_id}")
+
+    def list_communities(self) -> List[CommunityData]:
+        """Lists all stored communities for the given network."""
+        return [CommunityData.__from_dict__(json.loads(row[0]))
+                for row in self._connection().execute("SELECT data FROM communities ORDER BY rowid")]
+
+    def clean_zerodegree_nodes(self) -> None:
+        """Removes all nodes with degree 0."""
+        with self._transaction() as conn:
+            node_uids = [row[0] for row in conn.execute(
+                """
+                SELECT node_uid FROM nodes n
+                WHERE NOT EXISTS (SELECT 1 FROM edges WHERE source_uid = n.node_uid)
+                  AND NOT EXISTS (SELECT 1 FROM edges WHERE target_uid = n.node_uid)
+                """)]
+            conn.executemany("DELETE FROM nodes WHERE node_uid = ?", [(uid,) for uid in node_uids])
+            self._write_tombstones(self._tombstone_records(node_uids=node_uids))
+        self._unindex_nodes(node_uids)
+
+    def edge_exist(self, source_uid: str, target_uid: str) -> bool:
+        """Checks for edge existence and returns boolean"""
+        return self._connection().execute(
+            "SELECT 1 FROM edges WHERE edge_uid = ?",
+            (self._generate_edge_uid(source_uid, target_uid),)).fetchone() is not None
+
+    def node_exist(self, node_uid: str) -> bool:
+        """Checks for node existence and returns boolean"""
+        return self._connection().execute(
+            "SELECT 1 FROM nodes WHERE node_uid = ?", (node_uid,)).fetchone() is not None
+
+    def flush_kg(self) -> None:
+        """Method to wipe the complete datastore of the knowledge graph"""
+        with self._transaction() as conn:
+            for table in ["nodes", "edges", "communities", "tombstones"]:
+                conn.execute(f"DELETE FROM {table}")
+        # the networkx representation has to be rebuilt from scratch
+        self.networkx_synced_at = None
+        self._clear_index()
@@ -15,6 +15,18 @@ class EdgeData:
     edge_uid: str | None = None
     document_id: str | None = None
 
+    @classmethod
+    def __from_dict__(cls, data: dict):
+        """Creates an EdgeData instance from a stored dictionary, ignoring storage specific keys."""
+        return cls(
+            source_uid=data["source_uid"],
+            target_uid=data["target_uid"],
+            description=data["description"],
+            directed=data.get("directed", True),
+            edge_uid=data.get("edge_uid"),
+            document_id=data.get("document_id")
+        )
+
 
 @dataclass
 class NodeData:
@@ -30,6 +42,23 @@ class NodeData:
     edges_from: list[str] = field(default_factory=list)  # in case of directed graph
     embedding: list[float] = field(default_factory=list)  # text embedding for node
 
+    @classmethod
+    def __from_dict__(cls, data: dict):
+        """Creates a NodeData instance from a stored dictionary, ignoring storage specific keys."""
+        return cls(
+            node_uid=data["node_uid"],
+            node_title=data["node_title"],
+            node_type=data["node_type"],
+            node_description=data["node_description"],
+            node_degree=data.get("node_degree", 0),
+            document_id=data.get("document_id", ""),
+            community_id=data.get("community_id"),
+            edges_to=data.get("edges_to") or [],
+            edges_from=data.get("edges_from") or [],
+            # decoded embeddings are np.ndarray, which has no truth value
+            embedding=data["embedding"] if data.get("embedding") is not None else []
+        )
+
 
 @dataclass
 class CommunityData:
@@ -79,3 +108,79 @@ class NodeEmbeddings:
     """Node embeddings class definition."""
     nodes: list[str]
     embeddings: np.ndarray
+
+
+@dataclass
+class BatchWriteResult:
+    """Per-item outcome of a bulk write operation"""
+    succeeded: list[str] = field(default_factory=list) # uids written successfully
+    failed: dict[str, str] = field(default_factory=dict) # uid -> error message for rejected items
+
+
+@dataclass
+class BatchReadResult:
+    """Outcome of a batch lookup by uid"""
+    found: dict = field(default_factory=dict) # uid -> retrieved data object
+    missing: list[str] = field(default_factory=list) # requested uids that do not exist
+
+
+@dataclass
+class GraphChanges:
+    """Graph documents written or removed since a sync watermark"""
+    nodes: list[dict] = field(default_factory=list) # node attribute dicts of added or updated nodes
+    edges: list[tuple[str, str]] = field(default_factory=list) # (source_uid, target_uid) of added or updated edges
+    removed_nodes: list[str] = field(default_factory=list) # node_uids of removed nodes
+    removed_edges: list[tuple[str, str]] = field(default_factory=list) # (source_uid, target_uid) of removed edges
+
+
+@dataclass
+class NeighborhoodData:
+    """Nodes reachable from a start node within k hops"""
+    node_uid: str # uid of the start node
+    hop_counts: list[int] = field(default_factory=list) # number of nodes first reached at hop 1, 2, ...
+    hop_uids: list[list[str]] | None = None # node_uids first reached at hop 1, 2, ..., None if only counts were requested
+    truncated: bool = False # True if the traversal stopped at the result limit
+
+
+@dataclass
+class NeighborData:
+    """Node found by a nearest neighbor search"""
+    node_uid: str # uid of the neighbor node
+    distance: float # distance to the query vector, nearer is smaller
+    fields: dict = field(default_factory=dict) # NodeData fields requested by the search
+
+
+@dataclass
+class NeighborBatchData:
+    """Nearest neighbors of a batch of query vectors"""
+    node_uids: np.ndarray # (n_queries, k) object array of neighbor node_uids, nearest first, None where fewer than k were found
+    distances: np.ndarray # (n_queries, k) float32 distances, nearer is smaller, inf where fewer than k were found
+
+
+@dataclass
+class CommunityNeighborData:
+    """Community found by a community vector search"""
+    title: str # title of the community, the id passed to get_community
+    distance: float # distance to the query vector, nearer is smaller
+    summary: str | None = None # description of comm
+    rating: int | None = None
+    community_uid: str | None = None # community identifier
+
+
+@dataclass
+class ContextData:
+    """Subgraph retrieved around the nearest neighbors of a query vector"""
+    seeds: list[NeighborData] = field(default_factory=list) # nearest neighbors the expansion started from, nearest first
+    nodes: dict[str, NodeData] = field(default_factory=dict) # node_uid -> NodeData, seeds first, then by hop
+    edges: list[EdgeData] = field(default_factory=list) # edges between the retrieved nodes, one per undirected edge
+    hop_uids: list[list[str]] = field(default_factory=list) # node_uids first reached at hop 1, 2, ...
+    truncated: bool = False # True if the expansion stopped at max_nodes
+
+
+@dataclass
+class CacheStats:
+    """Counters of a read-through cache"""
+    hits: int = 0 # lookups answered from the cache
+    misses: int = 0 # lookups read from the database
+    evictions: int = 0 # entries dropped to stay within the size bounds or after expiring
+    invalidations: int = 0 # entries dropped because a write touched them